@@ -1,19 +1,34 @@
 from django.contrib import admin
 from django.contrib.admin import ModelAdmin
 from backend.forms import BillingAccountForm
-from backend.models import Address, Company, BillingPlan, BillingAccount, Preset, Title, Entry
+from backend.models import Address, Company, BillingPlan, BillingAccount, Budget, Preset, Title, Entry, JournalOutbox
+from backend.search import search_ids, terms
 
 class ReadOnly(ModelAdmin):
     def get_readonly_fields(self, request, obj=None):
         return super().get_readonly_fields(request, obj) + ("created_at", "updated_at")
 
+class IndexedSearch:
+    """
+    Busca do admin que soma ao resultado padrão de ``search_fields`` os objetos
+    encontrados pelo índice textual (backend.search), sem acento e por prefixo.
+    """
+    search_kind = None
+
+    def get_search_results(self, request, queryset, search_term):
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if terms(search_term):
+            results = results | queryset.filter(pk__in=search_ids(self.search_kind, search_term, queryset.db))
+        return results, may_have_duplicates
+
 
 class AddressAdmin(ReadOnly):
     list_display = ('street', 'city', 'state', 'zip_code')
     search_fields = ('street', 'city', 'state')
 
 
-class CompanyAdmin(ReadOnly):
+class CompanyAdmin(IndexedSearch, ReadOnly):
+    search_kind = 'company'
     list_display = ('fantasy_name', 'social_reason', 'cnpj', 'type_of',)
     search_fields = ('fantasy_name', 'social_reason', 'cnpj', 'type_of',)
     list_filter = ('fantasy_name',)
@@ -24,19 +39,28 @@ class BillingPlanAdmin(ReadOnly):
     list_filter=('name',)
 
 
-class BillingAccountAdmin(ReadOnly):
+class BillingAccountAdmin(IndexedSearch, ReadOnly):
+    search_kind = 'account'
     list_display=('name', 'billing_plan_id', 'account_type', 'parent', 'is_active')
-    search_fields=('name', 'billing_plan_id', 'account_type', 'parent', 'is_active', 'code')
-    list_filter=('name', 'account_type')
+    # FKs pelo nome: icontains direto na FK não é suportado
+    search_fields=('name', 'billing_plan__name', 'account_type', 'parent__name', 'code')
+    list_filter=('name', 'account_type', 'is_active')
     readonly_fields=('code',)
 
 class PresetAdmin(ReadOnly):
     list_display = ('name', 'description')
     search_fields = ('name',)
 
-class TitleAdmin(ReadOnly):
+class TitleAdmin(IndexedSearch, ReadOnly):
+    search_kind = 'title'
     list_display = ('description', 'amount', 'active', 'expiration_date')
     search_fields = ('description', 'expiration_date')
+    actions = ['rebuild_active_flags']
+
+    @admin.action(description='Recalcular status (ativo) dos títulos selecionados')
+    def rebuild_active_flags(self, request, queryset):
+        changed, _ = queryset.rebuild_active_flags()
+        self.message_user(request, f'{changed} título(s) com status atualizado.')
 
 class EntryAdmin(ReadOnly):
     list_display = ('description', 'title', 'amount', 'paid_at', 'payment_method', 'billing_account')
@@ -72,10 +96,23 @@ class EntryAdmin(ReadOnly):
     
     ordering = ('-paid_at',)
 
+class JournalOutboxAdmin(ReadOnly):
+    list_display = ('event', 'reference_id', 'company', 'status', 'attempts', 'available_at')
+    list_filter = ('status', 'event')
+    search_fields = ('reference_id',)
+
+class BudgetAdmin(ReadOnly):
+    list_display = ('company', 'account', 'month', 'amount')
+    list_filter = ('month',)
+    search_fields = ('account__name', 'account__code')
+    autocomplete_fields = ['account']
+
 admin.site.register(Address, AddressAdmin)
 admin.site.register(Company, CompanyAdmin)
 admin.site.register(BillingPlan, BillingPlanAdmin)
 admin.site.register(BillingAccount, BillingAccountAdmin)
 admin.site.register(Preset, PresetAdmin)
 admin.site.register(Title, TitleAdmin)
-admin.site.register(Entry, EntryAdmin)
\ No newline at end of file
+admin.site.register(Entry, EntryAdmin)
+admin.site.register(JournalOutbox, JournalOutboxAdmin)
+admin.site.register(Budget, BudgetAdmin)
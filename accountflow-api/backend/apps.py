@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class BackendConfig(AppConfig):
@@ -7,4 +8,6 @@ class BackendConfig(AppConfig):
     label = 'backend'
 
     def ready(self):
-        import backend.signals
\ No newline at end of file
+        import backend.signals
+        from backend.db import configure_sqlite
+        connection_created.connect(configure_sqlite, dispatch_uid='backend.configure_sqlite')
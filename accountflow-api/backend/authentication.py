@@ -0,0 +1,61 @@
+"""
+Autenticação por token com cache do usuário e das permissões.
+
+O par (usuário, token) resolvido fica no alias ``auth`` de ``settings.CACHES``
+com as permissões já carregadas (``_perm_cache`` do ModelBackend), então uma
+requisição autenticada não consulta ``authtoken_token``, ``auth_user`` nem as
+tabelas de permissões.
+
+Como em backend.cache, cada usuário tem uma versão no cache; a entrada do token
+só vale se foi gravada com a versão atual. Alterar o usuário, seus grupos ou
+permissões troca a versão (backend.signals); o logout remove a entrada do token.
+"""
+import hashlib
+import time
+
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+
+AUTH_CACHE_ALIAS = 'auth'
+
+
+def _cache():
+    return caches[AUTH_CACHE_ALIAS]
+
+def _token_key(key):
+    # A chave do token não vai em claro para o cache
+    return 'auth:token:' + hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+def _version_key(user_id):
+    return f'auth:user:{user_id}'
+
+def invalidate_user(*user_ids):
+    if user_ids:
+        _cache().set_many({_version_key(uid): time.time_ns() for uid in user_ids}, timeout=None)
+
+def invalidate_token(key):
+    _cache().delete(_token_key(key))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        cache = _cache()
+        cached = cache.get(_token_key(key))
+        if cached is not None:
+            user_id, version, user, token = cached
+            if cache.get(_version_key(user_id)) == version:
+                return user, token
+
+        user, token = super().authenticate_credentials(key)
+
+        version_key = _version_key(user.pk)
+        version = cache.get(version_key)
+        if version is None:
+            version = time.time_ns()
+            if not cache.add(version_key, version, timeout=None):
+                version = cache.get(version_key, version)
+
+        # Carrega as permissões antes de guardar: seguem junto com o usuário
+        user.get_all_permissions()
+        cache.set(_token_key(key), (user.pk, version, user, token))
+        return user, token
@@ -0,0 +1,223 @@
+"""
+Balanço patrimonial a partir do razão (JournalLine).
+
+Os saldos de uma data saem do AccountBalanceSnapshot mais recente até ela
+somado a uma única consulta agrupada por conta com os lançamentos posteriores;
+sem snapshot, a consulta cobre o razão inteiro. A hierarquia do plano de contas
+é carregada de uma vez e os saldos sobem para as contas pai em memória.
+
+A seção de cada conta (ativo, passivo, patrimônio líquido ou resultado) vem do
+nome da própria conta ou do ancestral mais próximo que a identifique. Receitas e
+despesas entram no patrimônio líquido como resultado do período.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+import re
+import unicodedata
+
+from django.db import transaction
+from django.db.models import Max, Sum
+
+from .models import AccountBalanceSnapshot, BillingAccount, JournalLine
+
+ZERO = Decimal('0.00')
+CENT = Decimal('0.01')
+
+# Ordem importa: a primeira seção com palavra-chave no nome vence
+SECTION_KEYWORDS = (
+    ('equity', ('patrimonio liquido', 'capital social', 'capital integralizado', 'reserva',
+                'lucros acumulados', 'prejuizos acumulados', 'lucros/prejuizos')),
+    ('liability', ('passivo', 'fornecedor', 'a pagar', 'pagamento', 'obrigac', 'emprestimo',
+                   'financiamento', 'a recolher')),
+    ('asset', ('ativo', 'caixa', 'banco', 'receb', 'clientes', 'estoque', 'imobilizado',
+               'aplicac', 'disponivel')),
+    ('result', ('receita', 'despesa', 'custo', 'resultado')),
+)
+
+_SECTION_PATTERNS = tuple(
+    (section, re.compile(r'\b(?:' + '|'.join(re.escape(k) for k in keywords) + ')'))
+    for section, keywords in SECTION_KEYWORDS
+)
+
+# Seções de natureza credora: saldo = créditos - débitos
+CREDIT_SECTIONS = {'liability', 'equity', 'result'}
+
+
+def _normalize(name):
+    text = unicodedata.normalize('NFKD', (name or '').lower())
+    return ''.join(c for c in text if not unicodedata.combining(c))
+
+def section_for_name(name):
+    name = _normalize(name)
+    for section, pattern in _SECTION_PATTERNS:
+        # Início de palavra: "administrativos" não é "ativo"
+        if pattern.search(name):
+            return section
+    return None
+
+# ------------------------------------------------------------
+# Saldos
+# ------------------------------------------------------------
+
+def latest_snapshot_date(company_id, as_of):
+    return (
+        AccountBalanceSnapshot.objects.for_company(company_id)
+        .filter(period_end__lte=as_of)
+        .aggregate(last=Max('period_end'))['last']
+    )
+
+def account_totals(company_id, as_of):
+    """
+    ``({conta: [débitos, créditos]}, data do snapshot usado ou None)`` acumulados
+    até ``as_of``.
+    """
+    snapshot_date = latest_snapshot_date(company_id, as_of)
+    totals = {}
+    if snapshot_date:
+        for row in AccountBalanceSnapshot.objects.for_company(company_id).filter(
+            period_end=snapshot_date
+        ).values_list('account_id', 'debit', 'credit'):
+            totals[row[0]] = [row[1], row[2]]
+
+    lines = JournalLine.objects.filter(journal__company_id=company_id, journal__date__lte=as_of)
+    if snapshot_date:
+        lines = lines.filter(journal__date__gt=snapshot_date)
+    for row in lines.order_by().values('account_id').annotate(debit=Sum('debit'), credit=Sum('credit')):
+        current = totals.setdefault(row['account_id'], [ZERO, ZERO])
+        current[0] += row['debit'] or ZERO
+        current[1] += row['credit'] or ZERO
+
+    return totals, snapshot_date
+
+# ------------------------------------------------------------
+# Snapshots
+# ------------------------------------------------------------
+
+def build_snapshot(company_id, period_end):
+    """Grava (substitui) o snapshot da empresa em ``period_end``; retorna o nº de contas."""
+    totals, _ = account_totals(company_id, period_end)
+    with transaction.atomic():
+        AccountBalanceSnapshot.objects.for_company(company_id).filter(period_end=period_end).delete()
+        AccountBalanceSnapshot.objects.bulk_create([
+            AccountBalanceSnapshot(
+                company_id=company_id, account_id=account_id, period_end=period_end,
+                debit=debit, credit=credit,
+            )
+            for account_id, (debit, credit) in totals.items()
+        ])
+    return len(totals)
+
+def discard_snapshots(company_id, since):
+    """Remove os snapshots que um lançamento datado em ``since`` deixa desatualizados."""
+    return AccountBalanceSnapshot.objects.for_company(company_id).filter(period_end__gte=since).delete()[0]
+
+def month_ends(until, months):
+    """Últimos dias dos ``months`` meses encerrados até ``until``, do mais antigo ao mais recente."""
+    ends = []
+    current = until.replace(day=1) - timedelta(days=1)
+    for _ in range(months):
+        ends.append(current)
+        current = current.replace(day=1) - timedelta(days=1)
+    return ends[::-1]
+
+# ------------------------------------------------------------
+# Balanço
+# ------------------------------------------------------------
+
+def _node(account, section):
+    return {
+        'uuid': account['uuid'], 'parent': account['parent_id'], 'code': account['code'],
+        'name': account['name'], 'account_type': account['account_type'], 'section': section,
+        'debit': ZERO, 'credit': ZERO, 'children': [],
+    }
+
+def _balance(node):
+    if node['section'] in CREDIT_SECTIONS:
+        return (node['credit'] - node['debit']).quantize(CENT)
+    return (node['debit'] - node['credit']).quantize(CENT)
+
+def _render(node):
+    return {
+        'code': node['code'],
+        'name': node['name'],
+        'account_type': node['account_type'],
+        'balance': str(_balance(node)),
+        'children': [_render(c) for c in sorted(node['children'], key=lambda c: c['code'])],
+    }
+
+def build_balance_sheet(company_id, as_of):
+    """
+    Balanço patrimonial da empresa em ``as_of`` (date).
+
+    Cada seção traz o total e a árvore de contas com movimento; a conta só soma
+    nos pais da mesma seção. ``difference`` (ativo - passivo - PL) é zero quando
+    todas as contas movimentadas foram classificadas.
+    """
+    totals, snapshot_date = account_totals(company_id, as_of)
+
+    plan_ids = BillingAccount.objects.filter(pk__in=list(totals)).values('billing_plan_id')
+    accounts = {
+        a['uuid']: a
+        for a in BillingAccount.objects.filter(billing_plan_id__in=plan_ids).values(
+            'uuid', 'parent_id', 'code', 'name', 'account_type'
+        )
+    }
+
+    sections = {}
+    def section_of(uuid):
+        if uuid not in sections:
+            account = accounts[uuid]
+            own = section_for_name(account['name'])
+            parent = account['parent_id']
+            sections[uuid] = own or (section_of(parent) if parent in accounts else 'unclassified')
+        return sections[uuid]
+
+    # Cada saldo sobe pela hierarquia enquanto o pai estiver na mesma seção
+    nodes = {}
+    for account_id, (debit, credit) in totals.items():
+        if debit == credit == ZERO or account_id not in accounts:
+            continue
+        section = section_of(account_id)
+        current = account_id
+        while current in accounts and section_of(current) == section:
+            node = nodes.get(current)
+            if node is None:
+                node = nodes[current] = _node(accounts[current], section)
+            node['debit'] += debit
+            node['credit'] += credit
+            current = accounts[current]['parent_id']
+
+    report = {name: {'total': ZERO, 'accounts': []} for name in ('asset', 'liability', 'equity', 'result', 'unclassified')}
+    roots = []
+    for node in nodes.values():
+        parent = nodes.get(node['parent'])
+        if parent is not None and parent['section'] == node['section']:
+            parent['children'].append(node)
+        else:
+            roots.append(node)
+    for node in roots:
+        report[node['section']]['accounts'].append(_render(node))
+        report[node['section']]['total'] += _balance(node)
+
+    for section in report.values():
+        section['accounts'].sort(key=lambda a: a['code'])
+
+    period_result = report['result']['total']
+    equity_total = report['equity']['total'] + period_result
+    difference = report['asset']['total'] - report['liability']['total'] - equity_total
+
+    return {
+        'company': str(company_id),
+        'as_of': as_of.isoformat() if isinstance(as_of, date) else as_of,
+        'snapshot': snapshot_date.isoformat() if snapshot_date else None,
+        'assets': {'total': str(report['asset']['total']), 'accounts': report['asset']['accounts']},
+        'liabilities': {'total': str(report['liability']['total']), 'accounts': report['liability']['accounts']},
+        'equity': {
+            'total': str(equity_total),
+            'accounts': report['equity']['accounts'],
+            'period_result': str(period_result),
+            'result_accounts': report['result']['accounts'],
+        },
+        'unclassified': {'total': str(report['unclassified']['total']), 'accounts': report['unclassified']['accounts']},
+        'difference': str(difference),
+    }
@@ -0,0 +1,237 @@
+"""
+Orçamento (Budget) por conta analítica e mês: importação em CSV e orçado x realizado.
+
+O relatório faz uma consulta agrupada por conta de cada lado (orçado em Budget,
+realizado em JournalLine ou Entry), junta os dois dicionários e sobe os valores
+para as contas sintéticas numa única passada em memória.
+"""
+from datetime import date
+from decimal import Decimal, InvalidOperation
+import csv
+import io
+import uuid
+
+from django.db import transaction
+from django.db.models import Sum
+
+from .models import BillingAccount, Budget, Entry, JournalLine
+
+BUDGET_CSV_COLUMNS = ('account', 'month', 'amount')
+BUDGET_BASES = ('accrual', 'cash')
+
+_CENT = Decimal('0.01')
+
+
+def _money(value):
+    return str((value or Decimal('0')).quantize(_CENT))
+
+# ------------------------------------------------------------
+# Importação
+# ------------------------------------------------------------
+
+def _parse_month(value):
+    parts = (value or '').strip().split('-')
+    if len(parts) not in (2, 3):
+        raise ValueError
+    return date(int(parts[0]), int(parts[1]), 1)
+
+def _parse_amount(value):
+    value = (value or '').strip()
+    if ',' in value:
+        # Formato brasileiro: 1.234,56
+        value = value.replace('.', '').replace(',', '.')
+    amount = Decimal(value).quantize(_CENT)
+    if amount < 0:
+        raise InvalidOperation
+    return amount
+
+def _as_uuid(value):
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        return None
+
+def _resolve_accounts(references, plan_id):
+    """{referência do CSV: (uuid, tipo)} para códigos do plano e UUIDs, em uma consulta."""
+    uuids = {ref: _as_uuid(ref) for ref in references}
+    queryset = BillingAccount.objects.none()
+    by_uuid = [u for u in uuids.values() if u]
+    if by_uuid:
+        queryset = BillingAccount.objects.filter(pk__in=by_uuid)
+    if plan_id:
+        codes = [ref for ref, u in uuids.items() if not u]
+        queryset = queryset | BillingAccount.objects.filter(billing_plan_id=plan_id, code__in=codes)
+
+    found = {}
+    for account_id, code, account_type, account_plan in queryset.values_list(
+        'uuid', 'code', 'account_type', 'billing_plan_id'
+    ):
+        found[str(account_id)] = (account_id, account_type)
+        if plan_id and str(account_plan) == str(plan_id):
+            found[code] = (account_id, account_type)
+    return {ref: found.get(ref) or found.get(str(uuids[ref])) for ref in references}
+
+def import_budget_csv(company_id, text, plan_id=None):
+    """
+    Importa o CSV (``account,month,amount``) de orçamento da empresa.
+
+    ``account`` é o UUID da conta ou, com ``plan_id``, o código no plano; ``month``
+    é YYYY-MM. Linhas já existentes (conta, mês) têm o valor substituído. Se alguma
+    linha for inválida nada é gravado. Retorna ``(gravadas, erros)``.
+    """
+    reader = csv.DictReader(io.StringIO(text.lstrip('\ufeff')))
+    missing = [c for c in BUDGET_CSV_COLUMNS if c not in (reader.fieldnames or [])]
+    if missing:
+        return 0, [{'line': 1, 'error': f"colunas ausentes: {', '.join(missing)}"}]
+
+    rows, errors = [], []
+    for line, row in enumerate(reader, start=2):
+        try:
+            month = _parse_month(row['month'])
+        except ValueError:
+            errors.append({'line': line, 'error': f"mês inválido: {row['month']!r}"})
+            continue
+        try:
+            amount = _parse_amount(row['amount'])
+        except (InvalidOperation, ValueError):
+            errors.append({'line': line, 'error': f"valor inválido: {row['amount']!r}"})
+            continue
+        rows.append((line, (row['account'] or '').strip(), month, amount))
+
+    accounts = _resolve_accounts({ref for _, ref, _, _ in rows}, plan_id)
+    budgets, seen = [], {}
+    for line, ref, month, amount in rows:
+        account = accounts.get(ref)
+        if account is None:
+            errors.append({'line': line, 'error': f"conta não encontrada: {ref!r}"})
+            continue
+        account_id, account_type = account
+        if account_type != BillingAccount.AccountType.ANALYTIC:
+            errors.append({'line': line, 'error': f"conta {ref!r} não é analítica"})
+            continue
+        if (account_id, month) in seen:
+            errors.append({'line': line, 'error': f"repete a linha {seen[(account_id, month)]}"})
+            continue
+        seen[(account_id, month)] = line
+        budgets.append(Budget(company_id=company_id, account_id=account_id, month=month, amount=amount))
+
+    if errors:
+        return 0, sorted(errors, key=lambda e: e['line'])
+
+    with transaction.atomic():
+        Budget.objects.bulk_create(
+            budgets, batch_size=1000, update_conflicts=True,
+            unique_fields=['company', 'account', 'month'], update_fields=['amount', 'updated_at'],
+        )
+        # bulk_create não dispara signals
+        from .cache import report_cache
+        transaction.on_commit(lambda: report_cache.invalidate_company(company_id))
+    return len(budgets), []
+
+# ------------------------------------------------------------
+# Orçado x realizado
+# ------------------------------------------------------------
+
+def planned_by_account(company_id, start, end):
+    return {
+        row['account_id']: row['planned']
+        for row in Budget.objects.for_company(company_id)
+        .filter(month__gte=start.replace(day=1), month__lte=end)
+        .order_by().values('account_id').annotate(planned=Sum('amount'))
+    }
+
+def actual_by_account(company_id, start, end, basis='accrual'):
+    """
+    Realizado por conta no período. ``accrual``: movimento líquido das linhas do
+    razão (em valor absoluto, pois a natureza da conta não é cadastrada);
+    ``cash``: baixas (Entry) pela conta financeira.
+    """
+    if basis == 'cash':
+        return {
+            row['billing_account_id']: row['total']
+            for row in Entry.objects.for_company(company_id)
+            .filter(paid_at__gte=start, paid_at__lte=end)
+            .order_by().values('billing_account_id').annotate(total=Sum('amount'))
+        }
+    return {
+        row['account_id']: abs((row['debit'] or 0) - (row['credit'] or 0))
+        for row in JournalLine.objects.filter(
+            journal__company_id=company_id, journal__date__gte=start, journal__date__lte=end
+        ).order_by().values('account_id').annotate(debit=Sum('debit'), credit=Sum('credit'))
+    }
+
+def _code_key(code):
+    return tuple(int(p) for p in (code or '').split('.') if p.isdigit())
+
+def build_budget_report(company_id, start, end, basis='accrual'):
+    """
+    Orçado x realizado da empresa entre ``start`` e ``end`` (date), por conta,
+    com as sintéticas somando as filhas.
+
+    O realizado só entra nas árvores (contas de primeiro nível) que têm alguma
+    conta orçada: despesas sem orçamento aparecem, contas de caixa e de controle
+    do outro lado dos lançamentos não.
+    """
+    planned = planned_by_account(company_id, start, end)
+    actual = actual_by_account(company_id, start, end, basis)
+
+    plan_ids = BillingAccount.objects.filter(pk__in=list(set(planned) | set(actual))).values('billing_plan_id')
+    accounts = {
+        a['uuid']: a
+        for a in BillingAccount.objects.filter(billing_plan_id__in=plan_ids).values(
+            'uuid', 'parent_id', 'code', 'name', 'account_type', 'billing_plan_id'
+        )
+    }
+
+    def path(account_id):
+        while account_id in accounts:
+            yield account_id
+            account_id = accounts[account_id]['parent_id']
+
+    roots = {}
+    for account_id in set(planned) | set(actual):
+        for ancestor in path(account_id):
+            roots[account_id] = ancestor
+    budgeted_roots = {roots[a] for a in planned if a in roots}
+    touched = [a for a in roots if roots[a] in budgeted_roots]
+
+    zero = Decimal('0')
+    totals = {}
+    for account_id in touched:
+        amounts = (planned.get(account_id) or zero, actual.get(account_id) or zero)
+        for ancestor in path(account_id):
+            node = totals.setdefault(ancestor, [zero, zero])
+            node[0] += amounts[0]
+            node[1] += amounts[1]
+
+    rows = []
+    for account_id, (account_planned, account_actual) in totals.items():
+        account = accounts[account_id]
+        rows.append({
+            'account': str(account_id),
+            'billing_plan': str(account['billing_plan_id']),
+            'code': account['code'],
+            'name': account['name'],
+            'account_type': account['account_type'],
+            'parent': str(account['parent_id']) if account['parent_id'] else None,
+            'planned': _money(account_planned),
+            'actual': _money(account_actual),
+            'variance': _money(account_actual - account_planned),
+            'percent': str((account_actual * 100 / account_planned).quantize(_CENT)) if account_planned else None,
+        })
+    rows.sort(key=lambda r: (r['billing_plan'], _code_key(r['code'])))
+
+    total_planned = sum((totals[r][0] for r in budgeted_roots), zero)
+    total_actual = sum((totals[r][1] for r in budgeted_roots), zero)
+    return {
+        'company': str(company_id),
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'basis': basis,
+        'totals': {
+            'planned': _money(total_planned),
+            'actual': _money(total_actual),
+            'variance': _money(total_actual - total_planned),
+        },
+        'accounts': rows,
+    }
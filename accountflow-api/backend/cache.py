@@ -0,0 +1,123 @@
+"""
+Cache das respostas de relatórios.
+
+Cada empresa possui uma "versão" guardada no próprio cache. A chave de um
+relatório inclui essa versão, então basta trocar a versão (ao salvar ou
+excluir Title, Entry ou JournalEntry) para que todos os relatórios da
+empresa deixem de ser encontrados, sem precisar varrer o cache.
+
+O alias usado é o ``reports`` de ``settings.CACHES``: um LocMemCache com
+``MAX_ENTRIES`` limitado. O LocMemCache mantém as chaves em ordem de uso,
+então a remoção quando o limite é atingido descarta as menos usadas (LRU).
+"""
+import hashlib
+import json
+import threading
+import time
+import uuid
+
+from django.core.cache import caches
+
+REPORT_CACHE_ALIAS = 'reports'
+
+_MISSING = object()
+
+
+class ReportCache:
+    def __init__(self, alias=REPORT_CACHE_ALIAS):
+        self.alias = alias
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    # --- Versionamento por empresa ---
+    @staticmethod
+    def company_key(company_id):
+        """Forma canônica do UUID: a mesma chave para maiúsculas, sem hífens ou objeto UUID."""
+        try:
+            return str(company_id if isinstance(company_id, uuid.UUID) else uuid.UUID(str(company_id)))
+        except ValueError:
+            return str(company_id)
+
+    def _version_key(self, company_id):
+        return f'report:version:{self.company_key(company_id)}'
+
+    def company_version(self, company_id):
+        key = self._version_key(company_id)
+        version = self.cache.get(key)
+        if version is None:
+            # Versões são baseadas no relógio para que uma versão removida
+            # pelo LRU nunca volte a coincidir com relatórios antigos.
+            version = time.time_ns()
+            if not self.cache.add(key, version, timeout=None):
+                version = self.cache.get(key, version)
+        return version
+
+    def invalidate_company(self, company_id):
+        if company_id:
+            self.cache.set(self._version_key(company_id), time.time_ns(), timeout=None)
+
+    # --- Leitura / escrita ---
+    def make_key(self, name, company_id, params):
+        digest = hashlib.sha1(
+            json.dumps(params, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+        return f'report:{name}:{self.company_key(company_id)}:{self.company_version(company_id)}:{digest}'
+
+    def get_or_build(self, name, company_id, params, builder):
+        """
+        Retorna ``(valor, hit)``. Em caso de miss, ``builder()`` é executado e
+        o resultado fica guardado até a próxima alteração da empresa.
+        """
+        key = self.make_key(name, company_id, params)
+        value = self.cache.get(key, _MISSING)
+        if value is not _MISSING:
+            self._count(hit=True)
+            return value, True
+
+        self._count(hit=False)
+        value = builder()
+        self.cache.set(key, value)
+        return value, False
+
+    async def aget_or_build(self, name, company_id, params, abuilder):
+        """Como ``get_or_build``, aguardando ``abuilder()`` no miss (LocMemCache não faz I/O)."""
+        key = self.make_key(name, company_id, params)
+        value = self.cache.get(key, _MISSING)
+        if value is not _MISSING:
+            self._count(hit=True)
+            return value, True
+
+        self._count(hit=False)
+        value = await abuilder()
+        self.cache.set(key, value)
+        return value, False
+
+    # --- Estatísticas ---
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': (self.hits / total) if total else 0.0,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+report_cache = ReportCache()
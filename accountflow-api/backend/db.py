@@ -0,0 +1,17 @@
+"""
+Ajustes aplicados às conexões de banco assim que são abertas.
+"""
+from django.conf import settings
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    Aplica as PRAGMAs de settings.SQLITE_PRAGMAS (WAL, synchronous, busy_timeout).
+    Em WAL leitores não bloqueiam o escritor, e synchronous=NORMAL só sincroniza
+    o disco nos checkpoints, o que é seguro nesse modo.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f'PRAGMA {name} = {value}')
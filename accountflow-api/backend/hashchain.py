@@ -0,0 +1,173 @@
+"""
+Cadeia de hashes dos lançamentos contábeis, por empresa.
+
+Cada JournalEntry guarda ``content_hash`` (SHA-256 do cabeçalho e das linhas)
+e ``chain_hash`` = SHA-256(hash anterior, sequência, content_hash). Alterar,
+remover ou reordenar um lançamento quebra todos os elos seguintes.
+
+``chain_entries`` encadeia lançamentos novos durante o ``post_journals``;
+``seal_company`` encadeia lançamentos antigos ainda sem hash; ``verify_chain``
+recalcula a cadeia em blocos, a partir do último JournalChainCheckpoint.
+"""
+from decimal import Decimal
+import hashlib
+import json
+import uuid
+
+from django.db import transaction
+
+from .models import Company, JournalChainCheckpoint, JournalEntry, JournalLine
+
+GENESIS_HASH = '0' * 64
+
+def _uuid(value):
+    return str(value if isinstance(value, uuid.UUID) else uuid.UUID(str(value)))
+
+def _amount(value):
+    return '{:.2f}'.format(Decimal(str(value)))
+
+def content_hash(entry, lines):
+    """SHA-256 do conteúdo do lançamento; a ordem das linhas não importa."""
+    payload = {
+        'uuid': _uuid(entry.pk),
+        'company': _uuid(entry.company_id),
+        'date': entry.date.isoformat(),
+        'description': entry.description or '',
+        'reference_type': entry.reference_type,
+        'reference_id': entry.reference_id,
+        'total_debits': _amount(entry.total_debits),
+        'total_credits': _amount(entry.total_credits),
+        'lines': sorted(
+            [_uuid(l.account_id), _amount(l.debit), _amount(l.credit), l.memo or '']
+            for l in lines
+        ),
+    }
+    raw = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+def link_hash(previous_hash, seq, entry_hash):
+    return hashlib.sha256(f'{previous_hash}:{seq}:{entry_hash}'.encode('ascii')).hexdigest()
+
+def chain_tail(company_id):
+    """(sequência, hash) do último elo da empresa, ou o gênese."""
+    last = (
+        JournalEntry.objects.for_company(company_id)
+        .filter(chain_seq__isnull=False)
+        .order_by('-chain_seq')
+        .values_list('chain_seq', 'chain_hash')
+        .first()
+    )
+    return last or (0, GENESIS_HASH)
+
+def lock_chains(company_ids):
+    """
+    Trava (SELECT ... FOR UPDATE, em ordem de pk) as empresas cujas cadeias serão
+    estendidas, até o fim da transação. Dois processos com lançamentos da mesma
+    empresa passam a ler o último elo um depois do outro. No SQLite não há
+    FOR UPDATE, mas o banco já aceita um único escritor por vez.
+    """
+    list(Company.objects.select_for_update().filter(pk__in=set(company_ids)).order_by('pk').values_list('pk', flat=True))
+
+def chain_entries(entries, lines):
+    """
+    Preenche os campos da cadeia em JournalEntry ainda não gravados.
+    Deve rodar na mesma transação do bulk_create. As empresas envolvidas são
+    travadas antes de ler o último elo, e a restrição única (company, chain_seq)
+    continua como última defesa.
+    """
+    lock_chains(entry.company_id for entry in entries)
+    lines_by_entry = {}
+    for line in lines:
+        lines_by_entry.setdefault(line.journal_id, []).append(line)
+
+    tails = {}
+    for entry in entries:
+        if entry.company_id not in tails:
+            tails[entry.company_id] = chain_tail(entry.company_id)
+        seq, previous = tails[entry.company_id]
+        seq += 1
+        entry.content_hash = content_hash(entry, lines_by_entry.get(entry.pk, []))
+        entry.chain_seq = seq
+        entry.chain_hash = link_hash(previous, seq, entry.content_hash)
+        tails[entry.company_id] = (seq, entry.chain_hash)
+
+def _lines_for(entry_ids):
+    by_entry = {}
+    for line in JournalLine.objects.filter(journal_id__in=entry_ids).only(
+        'journal_id', 'account_id', 'debit', 'credit', 'memo'
+    ):
+        by_entry.setdefault(line.journal_id, []).append(line)
+    return by_entry
+
+def seal_company(company_id, chunk_size=1000):
+    """Encadeia, em ordem de criação, os lançamentos da empresa ainda sem hash."""
+    sealed = 0
+    while True:
+        with transaction.atomic():
+            chunk = list(
+                JournalEntry.objects.for_company(company_id)
+                .select_for_update()
+                .filter(chain_seq__isnull=True)
+                .order_by('created_at', 'uuid')[:chunk_size]
+            )
+            if not chunk:
+                return sealed
+            chain_entries(chunk, [l for ls in _lines_for([e.pk for e in chunk]).values() for l in ls])
+            JournalEntry.objects.bulk_update(chunk, ['chain_seq', 'content_hash', 'chain_hash'])
+        sealed += len(chunk)
+
+def verify_chain(company_id, chunk_size=1000, full=False):
+    """
+    Recalcula a cadeia da empresa em blocos de ``chunk_size`` lançamentos.
+
+    Parte do checkpoint salvo (ou do gênese, com ``full=True``) e avança o
+    checkpoint a cada bloco íntegro. Retorna um dict com ``ok``, ``verified``,
+    ``last_seq`` e, em caso de falha, ``broken_at`` e ``error``.
+    """
+    checkpoint = None if full else JournalChainCheckpoint.objects.filter(company_id=company_id).first()
+    seq, previous = (checkpoint.chain_seq, checkpoint.chain_hash) if checkpoint else (0, GENESIS_HASH)
+    result = {
+        'company': company_id, 'ok': True, 'verified': 0, 'last_seq': seq,
+        'unchained': JournalEntry.objects.for_company(company_id).filter(chain_seq__isnull=True).count(),
+    }
+
+    # O elo do checkpoint precisa continuar existindo com o mesmo hash
+    if checkpoint and not JournalEntry.objects.for_company(company_id).filter(
+        chain_seq=checkpoint.chain_seq, chain_hash=checkpoint.chain_hash
+    ).exists():
+        result.update(ok=False, broken_at=checkpoint.chain_seq, error='checkpoint não confere com a cadeia')
+        return result
+
+    while True:
+        chunk = list(
+            JournalEntry.objects.for_company(company_id)
+            .filter(chain_seq__gt=seq)
+            .order_by('chain_seq')[:chunk_size]
+        )
+        if not chunk:
+            break
+        lines = _lines_for([e.pk for e in chunk])
+        for entry in chunk:
+            expected_seq = seq + 1
+            if entry.chain_seq != expected_seq:
+                error = f'sequência {expected_seq} ausente'
+            elif content_hash(entry, lines.get(entry.pk, [])) != entry.content_hash:
+                error = 'conteúdo alterado'
+            elif link_hash(previous, entry.chain_seq, entry.content_hash) != entry.chain_hash:
+                error = 'elo da cadeia inválido'
+            else:
+                seq, previous = entry.chain_seq, entry.chain_hash
+                result['verified'] += 1
+                continue
+            result.update(ok=False, broken_at=expected_seq, journal=str(entry.pk), error=error)
+            break
+
+        if result['verified']:
+            JournalChainCheckpoint.objects.update_or_create(
+                company_id=company_id, defaults={'chain_seq': seq, 'chain_hash': previous},
+            )
+        result['last_seq'] = seq
+        if not result['ok']:
+            break
+
+    return result
@@ -0,0 +1,152 @@
+"""
+Importação em lote de empresas com seus endereços.
+
+Cada linha traz os campos da empresa e do endereço. O CNPJ é comparado pelos
+dígitos (``Company.cnpj_key``) e o endereço pela chave normalizada
+(``Address.normalized_key``). Assim, variações de pontuação, acento ou caixa não
+geram duplicatas. Linhas válidas são gravadas em lotes. Linhas inválidas são
+devolvidas com os erros, sem impedir as demais.
+"""
+import csv
+import io
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Address, Company
+
+COMPANY_FIELDS = (
+    'cnpj', 'fantasy_name', 'social_reason', 'opening_date', 'cnae',
+    'type_of', 'email', 'phone', 'tax_regime',
+)
+ADDRESS_FIELDS = Address.KEY_FIELDS
+# Campos sobrescritos quando o CNPJ já existe (o CNPJ gravado é mantido)
+COMPANY_UPDATE_FIELDS = [f for f in COMPANY_FIELDS if f != 'cnpj'] + ['address', 'updated_at']
+
+CNPJ_DIGITS = 14
+
+
+def parse_company_csv(text):
+    """Linhas (dicts) do CSV com as colunas de COMPANY_FIELDS e ADDRESS_FIELDS."""
+    reader = csv.DictReader(io.StringIO(text.lstrip('\ufeff')))
+    return [{k.strip(): (v or '').strip() for k, v in row.items() if k} for row in reader]
+
+def _errors(exc):
+    return {field: [str(m) for m in messages] for field, messages in exc.message_dict.items()}
+
+def _validate(row):
+    """(Address, Company) não salvos da linha; ValidationError se inválida."""
+    if not isinstance(row, dict):
+        raise ValidationError({'row': ['esperado um objeto']})
+    address = Address(**{f: row.get(f) or ('' if f != 'complement' else None) for f in ADDRESS_FIELDS})
+    company = Company(**{f: row.get(f) or '' for f in COMPANY_FIELDS})
+    errors = {}
+    for instance, exclude in ((address, ['normalized_key']), (company, ['address', 'cnpj_key', 'logo'])):
+        try:
+            instance.full_clean(exclude=exclude, validate_unique=False, validate_constraints=False)
+        except ValidationError as exc:
+            errors.update(_errors(exc))
+    company.cnpj_key = Company.normalize_cnpj(company.cnpj)
+    if 'cnpj' not in errors and len(company.cnpj_key) != CNPJ_DIGITS:
+        errors['cnpj'] = [f'CNPJ deve ter {CNPJ_DIGITS} dígitos']
+    if errors:
+        raise ValidationError(errors)
+    address.normalized_key = Address.build_key(row)
+    return address, company
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def import_companies(rows, batch_size=500):
+    """
+    Cria ou atualiza as empresas de ``rows`` (dicts). Retorna um resultado por
+    linha, na ordem recebida: ``{'row', 'status', 'cnpj', 'company', 'address'}``
+    com ``status`` em created/updated/error (e ``errors`` nas inválidas).
+
+    Endereços iguais (pela chave normalizada) são reaproveitados. Um CNPJ repetido
+    no lote é rejeitado na segunda ocorrência.
+    """
+    outcomes, valid, seen = [], [], {}
+    for number, row in enumerate(rows, start=1):
+        outcome = {'row': number, 'status': 'error', 'cnpj': row.get('cnpj') if isinstance(row, dict) else None,
+                   'company': None, 'address': None}
+        outcomes.append(outcome)
+        try:
+            address, company = _validate(row)
+        except ValidationError as exc:
+            outcome['errors'] = _errors(exc)
+            continue
+        if company.cnpj_key in seen:
+            outcome['errors'] = {'cnpj': [f'CNPJ repete a linha {seen[company.cnpj_key]}']}
+            continue
+        seen[company.cnpj_key] = number
+        valid.append((outcome, address, company))
+
+    with transaction.atomic():
+        valid = _match_companies(valid, batch_size)
+        _attach_addresses(valid, batch_size)
+        Company.objects.bulk_create(
+            [company for _, _, company in valid], batch_size=batch_size, update_conflicts=True,
+            unique_fields=['cnpj_key'], update_fields=COMPANY_UPDATE_FIELDS,
+        )
+
+    imported = [company for _, _, company in valid]
+    if imported:
+        # bulk_create não dispara signals: índice de busca e cache dos relatórios
+        from .cache import report_cache
+        from .search import index_objects
+
+        index_objects('company', imported)
+        updated = [c.pk for o, _, c in valid if o['status'] == 'updated']
+        transaction.on_commit(lambda: [report_cache.invalidate_company(pk) for pk in updated])
+    return outcomes
+
+def _attach_addresses(valid, batch_size):
+    """Liga cada empresa a um endereço existente ou a um novo (um por chave)."""
+    keys = list({address.normalized_key for _, address, _ in valid})
+    existing = {}
+    for chunk in _chunks(keys, batch_size):
+        for key, pk in Address.objects.filter(normalized_key__in=chunk).order_by('created_at').values_list(
+            'normalized_key', 'uuid'
+        ):
+            existing.setdefault(key, pk)
+
+    new = {}
+    for outcome, address, company in valid:
+        if address.normalized_key in existing:
+            company.address_id = existing[address.normalized_key]
+            outcome['address'] = 'existing'
+        else:
+            company.address_id = new.setdefault(address.normalized_key, address).pk
+            outcome['address'] = 'created' if new[address.normalized_key] is address else 'existing'
+    Address.objects.bulk_create(new.values(), batch_size=batch_size)
+
+def _match_companies(valid, batch_size):
+    """Marca cada linha como created/updated pelo CNPJ; devolve as que seguem para gravação."""
+    keys = [company.cnpj_key for _, _, company in valid]
+    raw = [company.cnpj for _, _, company in valid]
+    existing = {}
+    for key_chunk, raw_chunk in zip(_chunks(keys, batch_size), _chunks(raw, batch_size)):
+        for pk, key, cnpj in Company.objects.filter(Q(cnpj_key__in=key_chunk) | Q(cnpj__in=raw_chunk)).values_list(
+            'uuid', 'cnpj_key', 'cnpj'
+        ):
+            if key:
+                existing[key] = (pk, key)
+            else:
+                existing.setdefault(Company.normalize_cnpj(cnpj), (pk, None))
+
+    matched = []
+    for outcome, address, company in valid:
+        match = existing.get(company.cnpj_key)
+        if match and match[1] is None:
+            # Cadastro antigo com o mesmo CNPJ, mas sem chave (duplicata anterior à chave)
+            outcome['errors'] = {'cnpj': ['CNPJ duplicado no cadastro; resolva a duplicata antes de importar']}
+            continue
+        if match:
+            company.uuid = match[0]
+        outcome['status'] = 'updated' if match else 'created'
+        outcome['company'] = str(company.uuid)
+        matched.append((outcome, address, company))
+    return matched
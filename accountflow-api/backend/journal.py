@@ -0,0 +1,363 @@
+"""
+Lançamentos contábeis (JournalEntry / JournalLine) gerados a partir de títulos e baixas.
+
+As funções ``*_posting`` apenas montam o lançamento (um dict com referência,
+empresa, data, descrição e linhas); ``post_journals`` grava vários de uma vez.
+Quem decide quando postar é o worker do outbox (backend.outbox) e os comandos
+de reconstrução.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+import logging
+
+from django.db import transaction
+from django.db.models import CharField, Exists, Func, OuterRef, UUIDField
+from django.utils import timezone
+
+from .balance import discard_snapshots
+from .hashchain import chain_entries
+from .models import BillingAccount, Entry, JournalEntry, JournalLine, Title
+
+logger = logging.getLogger(__name__)
+
+# Caminhos de select_related para montar lançamentos sem consultas extras
+PRESET_ACCOUNT_PATHS = (
+    'preset__payable_account__billing_plan',
+    'preset__receivable_account__billing_plan',
+    'preset__revenue_account',
+    'preset__expense_account',
+)
+
+# ------------------------------------------------------------
+# Utilidades
+# ------------------------------------------------------------
+
+def _dec(value):
+    return Decimal(str(value)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+def plan_from_preset(preset):
+    if not preset:
+        return None
+    pa = getattr(preset, 'payable_account', None)
+    ra = getattr(preset, 'receivable_account', None)
+    return pa.billing_plan if pa else (ra.billing_plan if ra else None)
+
+def resolve_control_accounts(plan, _cache=None):
+    """
+    Contas de controle (recebíveis, pagamentos) do plano.
+
+    Prefere os campos explícitos do plano e, na falta deles, procura por nomes
+    comuns ou pela primeira conta analítica sob as sintéticas de receitas/despesas.
+    ``_cache`` (dict opcional) evita repetir as consultas para o mesmo plano num lote.
+    """
+    if _cache is not None and plan.pk in _cache:
+        return _cache[plan.pk]
+
+    receivable_ctrl = getattr(plan, 'receivable_control_account', None)
+    payable_ctrl = getattr(plan, 'payable_control_account', None)
+
+    if not receivable_ctrl:
+        receivable_ctrl = _find_control_account(plan, 'receb', 'Receitas')
+    if not payable_ctrl:
+        payable_ctrl = _find_control_account(plan, 'pag', 'Despesas')
+
+    if _cache is not None:
+        _cache[plan.pk] = (receivable_ctrl, payable_ctrl)
+    return receivable_ctrl, payable_ctrl
+
+def _find_control_account(plan, name_hint, parent_hint):
+    account = BillingAccount.objects.filter(
+        billing_plan=plan,
+        account_type=BillingAccount.AccountType.ANALYTIC,
+        name__icontains=name_hint,
+    ).first()
+    if account:
+        return account
+    parent = BillingAccount.objects.filter(
+        billing_plan=plan,
+        account_type=BillingAccount.AccountType.SYNTHETIC,
+        name__icontains=parent_hint,
+    ).first()
+    if parent:
+        return BillingAccount.objects.filter(
+            billing_plan=plan,
+            parent=parent,
+            account_type=BillingAccount.AccountType.ANALYTIC,
+        ).first()
+    return None
+
+def _is_analytic(account):
+    return account.account_type == BillingAccount.AccountType.ANALYTIC
+
+# ------------------------------------------------------------
+# Montagem dos lançamentos
+# ------------------------------------------------------------
+
+def title_creation_posting(title, _cache=None):
+    preset = title.preset
+    plan = plan_from_preset(preset)
+    if not plan:
+        return None
+
+    receivable_ctrl, payable_ctrl = resolve_control_accounts(plan, _cache)
+
+    amount = _dec(title.amount)
+    date = timezone.localdate(title.created_at) if title.created_at else title.expiration_date
+    posting = {
+        'reference_type': JournalEntry.RefType.TITLE,
+        'reference_id': str(title.uuid),
+        'company_id': title.company_id,
+        'date': date,
+        'description': f'Título: {title.description} - criação',
+    }
+
+    if title.type_of == 'income' and receivable_ctrl:
+        revenue_acc = preset.revenue_account
+        if not revenue_acc:
+            logger.warning('Preset %s sem revenue_account; título %s criado sem lançamento.',
+                           preset.name, title.uuid)
+            return None
+        if not _is_analytic(receivable_ctrl):
+            logger.error('Conta de controle de recebíveis não analítica para plano %s.', plan.uuid)
+            return None
+        if not _is_analytic(revenue_acc):
+            logger.error('Conta de receita não analítica no preset %s.', preset.uuid)
+            return None
+        posting['lines'] = [
+            {'account': receivable_ctrl, 'debit': amount},
+            {'account': revenue_acc,     'credit': amount},
+        ]
+        return posting
+
+    if title.type_of == 'expense' and payable_ctrl:
+        expense_acc = preset.expense_account
+        if not expense_acc:
+            logger.warning('Preset %s sem expense_account; título %s criado sem lançamento.',
+                           preset.name, title.uuid)
+            return None
+        if not _is_analytic(payable_ctrl):
+            logger.error('Conta de controle de pagamentos não analítica para plano %s.', plan.uuid)
+            return None
+        if not _is_analytic(expense_acc):
+            logger.error('Conta de despesa não analítica no preset %s.', preset.uuid)
+            return None
+        posting['lines'] = [
+            {'account': expense_acc,  'debit': amount},
+            {'account': payable_ctrl, 'credit': amount},
+        ]
+        return posting
+
+    return None
+
+def entry_settlement_posting(entry, _cache=None):
+    title = entry.title
+    plan = plan_from_preset(title.preset)
+    if not plan or not entry.billing_account_id:
+        return None
+
+    receivable_ctrl, payable_ctrl = resolve_control_accounts(plan, _cache)
+
+    amount = _dec(entry.amount)
+    cash = entry.billing_account
+    posting = {
+        'reference_type': JournalEntry.RefType.TITLE_SETTLEMENT,
+        'reference_id': str(entry.uuid),
+        'company_id': title.company_id,
+        'date': entry.paid_at,
+        'description': f'Baixa do título {title.description}',
+    }
+
+    if title.type_of == 'income' and receivable_ctrl:
+        if not _is_analytic(receivable_ctrl):
+            logger.error('Conta de controle de recebíveis não analítica para plano %s.', plan.uuid)
+            return None
+        if not _is_analytic(cash):
+            logger.error('Conta financeira não analítica para entry %s.', entry.uuid)
+            return None
+        posting['lines'] = [
+            {'account': receivable_ctrl, 'credit': amount},
+            {'account': cash,            'debit' : amount},
+        ]
+        return posting
+
+    if title.type_of == 'expense' and payable_ctrl:
+        if not _is_analytic(payable_ctrl):
+            logger.error('Conta de controle de pagamentos não analítica para plano %s.', plan.uuid)
+            return None
+        if not _is_analytic(cash):
+            logger.error('Conta financeira não analítica para entry %s.', entry.uuid)
+            return None
+        posting['lines'] = [
+            {'account': payable_ctrl, 'debit': amount},
+            {'account': cash,         'credit': amount},
+        ]
+        return posting
+
+    return None
+
+def reversal_reference(entry_id):
+    return f'settle-rev:{entry_id}'
+
+def entry_reversal_posting(original, paid_at):
+    """
+    Estorno de uma baixa excluída, invertendo as linhas do lançamento original.
+    ``original`` deve vir com ``lines`` pré-carregadas.
+    """
+    lines = [
+        {
+            'account_id': l.account_id,
+            'debit'     : _dec(l.credit),
+            'credit'    : _dec(l.debit),
+            'memo'      : f'Estorno: {original.description}',
+        }
+        for l in original.lines.all()
+    ]
+    if not lines:
+        return None
+    return {
+        'reference_type': JournalEntry.RefType.TITLE_SETTLEMENT_REVERSAL,
+        'reference_id': reversal_reference(original.reference_id),
+        'company_id': original.company_id,
+        'date': paid_at,
+        'description': f'Estorno baixa: {original.description}',
+        'lines': lines,
+    }
+
+# ------------------------------------------------------------
+# Gravação
+# ------------------------------------------------------------
+
+def _validate(posting):
+    total_debits  = Decimal('0.00')
+    total_credits = Decimal('0.00')
+    for l in posting['lines']:
+        total_debits  += _dec(l.get('debit', 0))
+        total_credits += _dec(l.get('credit', 0))
+
+    # Validação contábil
+    if total_debits <= Decimal('0.00') or total_debits != total_credits:
+        raise ValueError("Lançamento inconsistente: débitos e créditos devem ser iguais e positivos.")
+    return total_debits, total_credits
+
+def post_journals(postings):
+    """
+    Grava os lançamentos em lote (bulk_create de entradas e linhas).
+
+    Referências já lançadas são ignoradas, o que torna a operação idempotente.
+    Retorna a lista de JournalEntry criados.
+    """
+    postings = [p for p in postings if p]
+    if not postings:
+        return []
+
+    with transaction.atomic():
+        # Impedir duplicação
+        existing = set(
+            JournalEntry.objects.filter(
+                reference_id__in=[p['reference_id'] for p in postings]
+            ).values_list('reference_type', 'reference_id')
+        )
+
+        entries, lines, seen = [], [], set()
+        for p in postings:
+            key = (p['reference_type'], p['reference_id'])
+            if key in existing or key in seen:
+                continue
+            seen.add(key)
+
+            total_debits, total_credits = _validate(p)
+            je = JournalEntry(
+                date=p['date'],
+                description=p.get('description') or '',
+                company_id=p['company_id'],
+                reference_type=p['reference_type'],
+                reference_id=p['reference_id'],
+                total_debits=total_debits,
+                total_credits=total_credits,
+            )
+            entries.append(je)
+            for l in p['lines']:
+                lines.append(JournalLine(
+                    journal=je,
+                    account_id=l['account'].pk if 'account' in l else l['account_id'],
+                    debit=_dec(l.get('debit', 0)),
+                    credit=_dec(l.get('credit', 0)),
+                    memo=l.get('memo', ''),
+                ))
+
+        chain_entries(entries, lines)
+        JournalEntry.objects.bulk_create(entries)
+        JournalLine.objects.bulk_create(lines)
+
+        # Lançamentos retroativos desatualizam os snapshots de saldo a partir da sua data
+        earliest = {}
+        for je in entries:
+            if je.company_id not in earliest or je.date < earliest[je.company_id]:
+                earliest[je.company_id] = je.date
+        for company_id, since in earliest.items():
+            discard_snapshots(company_id, since)
+
+        # bulk_create não dispara signals: invalida os relatórios das empresas afetadas
+        from .cache import report_cache
+        for company_id in {je.company_id for je in entries}:
+            transaction.on_commit(lambda cid=company_id: report_cache.invalidate_company(cid))
+
+    return entries
+
+# ------------------------------------------------------------
+# Reconstrução
+# ------------------------------------------------------------
+
+class UUIDAsReference(Func):
+    """
+    UUID no formato de ``reference_id`` (``str(uuid)``, com hífens). SQLite guarda
+    UUID como 32 dígitos hex; no Postgres basta o cast para texto.
+    """
+    output_field = CharField()
+
+    def as_sql(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.source_expressions[0])
+        if connection.features.has_native_uuid_field:
+            return f'CAST({sql} AS varchar)', params
+        parts = [f'SUBSTR({sql}, {start}, {length})' for start, length in ((1, 8), (9, 4), (13, 4), (17, 4), (21, 12))]
+        return '(' + " || '-' || ".join(parts) + ')', tuple(params) * len(parts)
+
+class ReferenceAsUUID(Func):
+    """Inverso de ``UUIDAsReference``: ``reference_id`` no formato gravado da chave UUID."""
+    output_field = UUIDField()
+
+    def as_sql(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.source_expressions[0])
+        if connection.features.has_native_uuid_field:
+            return f'CAST({sql} AS uuid)', params
+        return f"REPLACE({sql}, '-', '')", params
+
+def _journal_exists(reference_type):
+    # Só o lado externo é convertido: reference_id fica livre para o índice uniq_ref
+    return Exists(
+        JournalEntry.objects.filter(
+            reference_type=reference_type,
+            reference_id=UUIDAsReference(OuterRef('pk')),
+        )
+    )
+
+def titles_missing_journal():
+    """Títulos com preset que ainda não têm o lançamento de criação."""
+    return Title.objects.filter(preset__isnull=False).filter(~_journal_exists(JournalEntry.RefType.TITLE))
+
+def entries_missing_journal():
+    """Baixas com preset e conta financeira que ainda não têm o lançamento de baixa."""
+    return Entry.objects.filter(title__preset__isnull=False, billing_account__isnull=False).filter(
+        ~_journal_exists(JournalEntry.RefType.TITLE_SETTLEMENT)
+    )
+
+def rebuild_title_journals(pks):
+    titles = Title.objects.select_related(*PRESET_ACCOUNT_PATHS).filter(pk__in=pks)
+    plans = {}
+    return len(post_journals([title_creation_posting(t, plans) for t in titles]))
+
+def rebuild_entry_journals(pks):
+    entries = Entry.objects.select_related(
+        'billing_account', *(f'title__{path}' for path in PRESET_ACCOUNT_PATHS)
+    ).filter(pk__in=pks)
+    plans = {}
+    return len(post_journals([entry_settlement_posting(e, plans) for e in entries]))
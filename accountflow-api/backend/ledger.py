@@ -0,0 +1,104 @@
+"""
+Verificação das invariantes do razão (partidas dobradas).
+
+Cada verificação é uma única consulta agrupada que devolve apenas as linhas
+com problema, lidas em streaming (``iterator``). As empresas são verificadas
+em paralelo, uma por thread, cada uma com a sua conexão.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import DecimalField, Exists, F, OuterRef, Q, Sum, Value
+from django.db.models.functions import Coalesce, Concat
+
+from .journal import ReferenceAsUUID, entries_missing_journal, reversal_reference
+from .models import Company, Entry, JournalEntry
+
+_ZERO = Value(Decimal('0.00'), output_field=DecimalField(max_digits=14, decimal_places=2))
+
+def _with_line_sums(company_id):
+    return JournalEntry.objects.for_company(company_id).order_by().annotate(
+        line_debits=Coalesce(Sum('lines__debit'), _ZERO),
+        line_credits=Coalesce(Sum('lines__credit'), _ZERO),
+    )
+
+def totals_mismatch(company_id):
+    """Lançamentos cujos totais gravados diferem da soma das linhas."""
+    return _with_line_sums(company_id).filter(
+        ~Q(total_debits=F('line_debits')) | ~Q(total_credits=F('line_credits'))
+    ).values('uuid', 'reference_type', 'reference_id', 'total_debits', 'total_credits',
+             'line_debits', 'line_credits')
+
+def unbalanced(company_id):
+    """Lançamentos em que débitos e créditos das linhas não fecham."""
+    return _with_line_sums(company_id).exclude(line_debits=F('line_credits')).values(
+        'uuid', 'reference_type', 'reference_id', 'line_debits', 'line_credits'
+    )
+
+def entries_without_settlement(company_id):
+    """Baixas lançáveis sem o lançamento de baixa."""
+    return entries_missing_journal().filter(company_id=company_id).order_by().values(
+        'uuid', 'title_id', 'amount', 'paid_at'
+    )
+
+def deleted_without_reversal(company_id):
+    """Lançamentos de baixa cuja baixa foi excluída sem o estorno correspondente."""
+    entry_exists = Exists(
+        Entry.objects.filter(pk=ReferenceAsUUID(OuterRef('reference_id')))
+    )
+    reversal_exists = Exists(
+        JournalEntry.objects.filter(
+            reference_type__in=JournalEntry.REVERSAL_TYPES,
+            reference_id=Concat(Value(reversal_reference('')), OuterRef('reference_id')),
+        )
+    )
+    return JournalEntry.objects.for_company(company_id).order_by().filter(
+        reference_type=JournalEntry.RefType.TITLE_SETTLEMENT,
+    ).filter(~entry_exists, ~reversal_exists).values('uuid', 'reference_id', 'date', 'total_debits')
+
+CHECKS = {
+    'totals_mismatch': totals_mismatch,
+    'unbalanced': unbalanced,
+    'entries_without_settlement': entries_without_settlement,
+    'deleted_without_reversal': deleted_without_reversal,
+}
+
+def verify_company(company_id, limit=None):
+    """
+    Executa todas as verificações de uma empresa.
+    Retorna ``{check: {'count': n, 'rows': [...]}}``; ``limit`` restringe as
+    linhas guardadas, mas a contagem sempre percorre todo o resultado.
+    """
+    report = {}
+    for name, check in CHECKS.items():
+        rows, count = [], 0
+        for row in check(company_id).iterator(chunk_size=2000):
+            count += 1
+            if limit is None or len(rows) < limit:
+                rows.append(row)
+        report[name] = {'count': count, 'rows': rows}
+    return report
+
+def _verify_in_thread(company_id, limit):
+    try:
+        return company_id, verify_company(company_id, limit)
+    finally:
+        connection.close()
+
+def verify_ledger(company_ids=None, workers=4, limit=None):
+    """
+    Verifica as empresas informadas (ou todas) em paralelo.
+    Retorna ``{company_id: relatório}``.
+    """
+    if company_ids is None:
+        company_ids = list(Company.objects.values_list('pk', flat=True))
+
+    if workers <= 1 or len(company_ids) <= 1:
+        return {cid: verify_company(cid, limit) for cid in company_ids}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(pool.map(lambda cid: _verify_in_thread(cid, limit), company_ids))
+
+def is_clean(report):
+    return all(check['count'] == 0 for company in report.values() for check in company.values())
@@ -0,0 +1,95 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from decimal import Decimal
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, transaction
+
+from backend.models import Company, Title
+
+BENCH_DESCRIPTION = '__bench_db_writes__'
+
+
+class Command(BaseCommand):
+    help = "Measure write throughput of the configured database under concurrent writers"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=8, help='Concurrent writer threads')
+        parser.add_argument('--ops', type=int, default=200, help='Transactions per writer')
+        parser.add_argument('--rows', type=int, default=5, help='Titles inserted per transaction')
+        parser.add_argument('--company', help='Company UUID used for the rows (default: first company)')
+        parser.add_argument('--keep', action='store_true', help='Keep the inserted rows')
+
+    def handle(self, *args, **options):
+        company = (
+            Company.objects.filter(pk=options['company']).first() if options['company']
+            else Company.objects.order_by('created_at').first()
+        )
+        if not company:
+            raise CommandError("No company available; run seed_demo or pass --company")
+
+        settings_dict = connection.settings_dict
+        self.stdout.write(f"Database: {connection.vendor} {settings_dict['NAME']}")
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                journal_mode = cursor.fetchone()[0]
+                cursor.execute('PRAGMA synchronous')
+                synchronous = cursor.fetchone()[0]
+            self.stdout.write(f"journal_mode={journal_mode} synchronous={synchronous}")
+        else:
+            self.stdout.write(f"CONN_MAX_AGE={settings_dict['CONN_MAX_AGE']}")
+
+        latencies, errors = [], []
+        lock = threading.Lock()
+
+        def writer(n):
+            local_latencies, local_errors = [], 0
+            try:
+                for _ in range(options['ops']):
+                    started = time.perf_counter()
+                    try:
+                        with transaction.atomic():
+                            Title.objects.bulk_create([
+                                Title(
+                                    description=BENCH_DESCRIPTION, amount=Decimal('1.00'),
+                                    expiration_date=date.today(), company=company, type_of='income',
+                                )
+                                for _ in range(options['rows'])
+                            ])
+                    except OperationalError:
+                        local_errors += 1
+                    else:
+                        local_latencies.append(time.perf_counter() - started)
+            finally:
+                connection.close()
+            with lock:
+                latencies.extend(local_latencies)
+                errors.append(local_errors)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['writers']) as pool:
+            list(pool.map(writer, range(options['writers'])))
+        elapsed = time.perf_counter() - started
+
+        if not options['keep']:
+            Title.objects.filter(description=BENCH_DESCRIPTION, company=company).delete()
+
+        done = len(latencies)
+        self.stdout.write(
+            f"{options['writers']} writer(s): {done} transaction(s) in {elapsed:.2f}s "
+            f"= {done / elapsed:.1f} tx/s, {done * options['rows'] / elapsed:.1f} rows/s"
+        )
+        if latencies:
+            ordered = sorted(latencies)
+            p95 = ordered[max(int(len(ordered) * 0.95) - 1, 0)]
+            self.stdout.write(
+                f"latency ms: p50={statistics.median(ordered) * 1000:.1f} p95={p95 * 1000:.1f} "
+                f"max={ordered[-1] * 1000:.1f}"
+            )
+        failed = sum(errors)
+        if failed:
+            self.stdout.write(self.style.WARNING(f"{failed} transaction(s) failed with database errors"))
@@ -0,0 +1,36 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from backend.balance import build_snapshot, month_ends
+from backend.models import Company
+
+
+class Command(BaseCommand):
+    help = "Store per-account balance snapshots at month ends so balance sheets only scan later journal lines"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', action='append', dest='companies', help='Company UUID (repeatable; default: all)')
+        parser.add_argument('--months', type=int, default=1, help='Closed months to snapshot, oldest first')
+        parser.add_argument('--until', help='Reference date (YYYY-MM-DD); months ending before it are snapshotted (default: today)')
+
+    def handle(self, *args, **options):
+        until = parse_date(options['until']) if options['until'] else date.today()
+        if until is None:
+            raise CommandError("--until must be a date in YYYY-MM-DD format")
+        if options['months'] < 1:
+            raise CommandError("--months must be at least 1")
+
+        company_ids = options['companies'] or list(Company.objects.values_list('pk', flat=True))
+        periods = month_ends(until, options['months'])
+
+        for company_id in company_ids:
+            # Em ordem crescente: cada snapshot parte do anterior
+            for period_end in periods:
+                accounts = build_snapshot(company_id, period_end)
+                self.stdout.write(f"{company_id} @ {period_end}: {accounts} account(s)")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Balance snapshots stored for {len(company_ids)} company(ies), {len(periods)} period(s)"
+        ))
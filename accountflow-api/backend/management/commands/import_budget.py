@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.budget import import_budget_csv
+from backend.models import Company
+
+
+class Command(BaseCommand):
+    help = "Import monthly budget amounts (CSV columns: account, month, amount) for a company"
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path', help='CSV file; account is the account UUID or, with --plan, its code')
+        parser.add_argument('--company', required=True, help='Company UUID')
+        parser.add_argument('--plan', help='Billing plan UUID used to resolve account codes')
+
+    def handle(self, *args, **options):
+        if not Company.objects.filter(pk=options['company']).exists():
+            raise CommandError(f"Company {options['company']} not found")
+        try:
+            with open(options['csv_path'], encoding='utf-8-sig') as f:
+                text = f.read()
+        except OSError as exc:
+            raise CommandError(str(exc))
+
+        imported, errors = import_budget_csv(options['company'], text, options['plan'])
+        for error in errors:
+            self.stdout.write(self.style.ERROR(f"line {error['line']}: {error['error']}"))
+        if errors:
+            raise CommandError(f"{len(errors)} invalid row(s); nothing imported")
+        self.stdout.write(self.style.SUCCESS(f"{imported} budget row(s) imported"))
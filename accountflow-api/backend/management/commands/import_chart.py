@@ -0,0 +1,43 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.models import BillingPlan
+from backend.plans import ChartError, clone_plan, import_chart, tree_from_csv, tree_from_json
+
+
+class Command(BaseCommand):
+    help = "Create a billing plan from a chart-of-accounts file (CSV or JSON tree) or by cloning an existing plan"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', help='CSV (code, name, account_type[, is_active]) or JSON tree')
+        parser.add_argument('--name', help='Name of the new plan (required for imports)')
+        parser.add_argument('--description', help='Description of the new plan')
+        parser.add_argument('--clone', metavar='PLAN_UUID', help='Copy this plan instead of reading a file')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options['clone']:
+            source = BillingPlan.objects.filter(pk=options['clone']).first()
+            if source is None:
+                raise CommandError(f"Billing plan {options['clone']} not found")
+            plan, accounts = clone_plan(source, options['name'], options['description'])
+        else:
+            if not options['path'] or not options['name']:
+                raise CommandError("path and --name are required unless --clone is given")
+            try:
+                with open(options['path'], encoding='utf-8-sig') as f:
+                    text = f.read()
+                roots = tree_from_json(json.loads(text)) if options['path'].endswith('.json') else tree_from_csv(text)
+                plan, accounts = import_chart(options['name'], options['description'] or options['name'], roots)
+            except (OSError, ValueError) as exc:
+                raise CommandError(str(exc))
+            except ChartError as exc:
+                for error in exc.errors:
+                    self.stdout.write(self.style.ERROR(f"{error['ref']}: {error['error']}"))
+                raise CommandError(f"{len(exc.errors)} error(s); nothing imported")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Plan {plan.pk} created with {len(accounts)} account(s) in {time.perf_counter() - started:.2f}s"
+        ))
@@ -0,0 +1,33 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.importers import import_companies, parse_company_csv
+
+
+class Command(BaseCommand):
+    help = "Bulk import companies and their addresses from a CSV or JSON file (CNPJ-deduplicated upsert)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV with company and address columns, or a JSON list of objects')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows written per INSERT')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], encoding='utf-8-sig') as f:
+                text = f.read()
+        except OSError as exc:
+            raise CommandError(str(exc))
+        try:
+            rows = json.loads(text) if options['path'].endswith('.json') else parse_company_csv(text)
+        except ValueError as exc:
+            raise CommandError(f"Invalid JSON: {exc}")
+
+        results = import_companies(rows, options['batch_size'])
+        for result in results:
+            if result['status'] == 'error':
+                self.stdout.write(self.style.ERROR(f"row {result['row']} ({result['cnpj']}): {result['errors']}"))
+        counts = {key: sum(1 for r in results if r['status'] == key) for key in ('created', 'updated', 'error')}
+        self.stdout.write(self.style.SUCCESS(
+            f"{counts['created']} created, {counts['updated']} updated, {counts['error']} rejected"
+        ))
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from backend.outbox import default_worker_id, drain
+
+
+class Command(BaseCommand):
+    help = "Process pending journal outbox events and post their journal entries"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Events claimed per batch')
+        parser.add_argument('--max-attempts', type=int, default=5, help='Attempts before an event is marked as failed')
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new events instead of exiting when the queue is empty')
+        parser.add_argument('--sleep', type=float, default=2.0, help='Seconds to wait between polls in --loop mode')
+        parser.add_argument('--worker-id', default=None, help='Identifier recorded on claimed events (default: host:pid)')
+
+    def handle(self, *args, **options):
+        worker_id = options['worker_id'] or default_worker_id()
+        self.stdout.write(self.style.NOTICE(f"Journal outbox worker {worker_id} started"))
+
+        while True:
+            done, failed = drain(
+                batch_size=options['batch_size'],
+                max_attempts=options['max_attempts'],
+                worker_id=worker_id,
+            )
+            if done or failed:
+                self.stdout.write(f"Posted {done} event(s), {failed} failed")
+            if not options['loop']:
+                break
+            time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS("Journal outbox drained"))
@@ -0,0 +1,101 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+
+from backend.journal import (
+    entries_missing_journal, rebuild_entry_journals, rebuild_title_journals, titles_missing_journal,
+)
+
+_REBUILDERS = {
+    'title': rebuild_title_journals,
+    'entry': rebuild_entry_journals,
+}
+
+
+def _rebuild_company(steps):
+    """Lança, em sequência, os blocos (tipo, pks) de uma empresa; retorna os totais por tipo."""
+    posted = {'title': 0, 'entry': 0}
+    for kind, pks in steps:
+        posted[kind] += _REBUILDERS[kind](pks)
+    return posted
+
+
+def _rebuild_in_worker(steps):
+    # Executado nos processos filhos: cada um abre a própria conexão
+    try:
+        return _rebuild_company(steps)
+    finally:
+        connections.close_all()
+
+
+def _chunks(pks, size):
+    for i in range(0, len(pks), size):
+        yield pks[i:i + size]
+
+
+def plan_tasks(missing, chunk_size):
+    """
+    Uma tarefa por empresa, com os blocos de títulos e depois de baixas.
+    Cada cadeia de hashes (por empresa) fica num único processo, e os
+    processos nunca disputam o mesmo último elo.
+    """
+    by_company = {}
+    for kind, rows in missing.items():
+        for company_id, pk in rows:
+            by_company.setdefault(company_id, {}).setdefault(kind, []).append(pk)
+    return [
+        [(kind, chunk) for kind in ('title', 'entry') for chunk in _chunks(groups.get(kind, []), chunk_size)]
+        for groups in by_company.values()
+    ]
+
+
+class Command(BaseCommand):
+    help = "Post missing title_creation and title_settlement journal entries"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='Titles/entries posted per task')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes (1 runs inline)')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many journals are missing')
+
+    def handle(self, *args, **options):
+        # O anti-join é recalculado a cada execução: rodar de novo retoma de onde parou
+        missing = {
+            'title': list(titles_missing_journal().order_by('company_id', 'pk').values_list('company_id', 'pk')),
+            'entry': list(entries_missing_journal().order_by('company_id', 'pk').values_list('company_id', 'pk')),
+        }
+        self.stdout.write(
+            f"Missing journals: {len(missing['title'])} title(s), {len(missing['entry'])} entry(ies)"
+        )
+        if options['dry_run']:
+            return
+
+        tasks = plan_tasks(missing, options['chunk_size'])
+        posted = {'title': 0, 'entry': 0}
+
+        workers = options['workers']
+        if connection.vendor == 'sqlite' and workers > 1:
+            # SQLite aceita um único escritor por vez; processos paralelos só trariam "database is locked"
+            self.stdout.write(self.style.WARNING("SQLite allows a single writer; running with 1 worker"))
+            workers = 1
+
+        if workers <= 1 or len(tasks) <= 1:
+            results = map(_rebuild_company, tasks)
+        else:
+            # Conexões herdadas pelo fork não podem ser compartilhadas com os filhos
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_rebuild_in_worker, tasks))
+        for counts in results:
+            for kind, count in counts.items():
+                posted[kind] += count
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Posted {posted['title']} title journal(s) and {posted['entry']} entry journal(s)"
+        ))
+        skipped = len(missing['title']) + len(missing['entry']) - posted['title'] - posted['entry']
+        if skipped:
+            self.stdout.write(self.style.WARNING(
+                f"{skipped} record(s) could not be posted (check preset and control accounts)"
+            ))
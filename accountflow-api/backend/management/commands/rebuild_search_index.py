@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from backend.models import SearchDocument
+from backend.search import rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuild the search documents (and their FTS5/trigram index) for titles, companies and accounts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kind', action='append', dest='kinds', choices=SearchDocument.Kind.values,
+            help='Document kind to rebuild (repeatable; default: all)',
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Objects indexed per transaction')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        counts = rebuild(options['kinds'], options['chunk_size'])
+        for kind, count in counts.items():
+            self.stdout.write(f"{kind}: {count} document(s)")
+        self.stdout.write(self.style.SUCCESS(f"Search index rebuilt in {time.perf_counter() - started:.2f}s"))
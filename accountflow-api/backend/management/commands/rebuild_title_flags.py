@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from backend.models import Title
+
+
+class Command(BaseCommand):
+    help = "Recompute Title.active from the entries paid so far with a single set-based UPDATE"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', action='append', dest='companies', help='Company UUID (repeatable; default: all)')
+        parser.add_argument('--type', dest='type_of', choices=Title.TitleType.values, help='Only income or expense titles')
+
+    def handle(self, *args, **options):
+        titles = Title.objects.all()
+        if options['companies']:
+            titles = titles.filter(company_id__in=options['companies'])
+        if options['type_of']:
+            titles = titles.filter(type_of=options['type_of'])
+
+        changed, companies = titles.rebuild_active_flags()
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated active flag of {changed} title(s) in {len(companies)} company(ies)"
+        ))
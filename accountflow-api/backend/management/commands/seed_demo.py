@@ -284,7 +284,7 @@ class Command(BaseCommand):
 
         if force:
             # Delete entries then titles to avoid PROTECT constraints
-            Entry.objects.filter(title__company=company).delete()
+            Entry.objects.filter(company=company).delete()
             Title.objects.filter(company=company).delete()
             existing_titles = set()
         else:
@@ -346,4 +346,9 @@ class Command(BaseCommand):
             )
             created_entries += 1
 
+        # Lançamentos contábeis são gerados pelo outbox; drena a fila para o demo já sair completo
+        from backend.outbox import drain
+        posted, failed = drain()
+        self.stdout.write(f"Journal outbox: {posted} event(s) posted, {failed} failed")
+
         self.stdout.write(self.style.SUCCESS(f"Demo data seeded successfully. Titles/entries created: {created_entries}"))
\ No newline at end of file
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.hashchain import seal_company, verify_chain
+from backend.models import Company
+
+
+class Command(BaseCommand):
+    help = "Verify the per-company hash chain of journal entries, resuming from the last checkpoint"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', action='append', dest='companies', help='Company UUID (repeatable; default: all)')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Journal entries hashed per chunk')
+        parser.add_argument('--full', action='store_true', help='Ignore checkpoints and rehash the whole chain')
+        parser.add_argument('--seal', action='store_true', help='Chain journal entries that have no hash yet before verifying')
+
+    def handle(self, *args, **options):
+        company_ids = options['companies'] or list(Company.objects.values_list('pk', flat=True))
+        broken = 0
+
+        for company_id in company_ids:
+            if options['seal']:
+                sealed = seal_company(company_id, options['chunk_size'])
+                if sealed:
+                    self.stdout.write(f"{company_id}: sealed {sealed} journal entry(ies)")
+
+            result = verify_chain(company_id, options['chunk_size'], full=options['full'])
+            if result['ok']:
+                self.stdout.write(
+                    f"{company_id}: {result['verified']} verified, chain at #{result['last_seq']}"
+                    + (f", {result['unchained']} not chained" if result['unchained'] else '')
+                )
+            else:
+                broken += 1
+                self.stdout.write(self.style.ERROR(
+                    f"{company_id}: chain broken at #{result['broken_at']} ({result['error']})"
+                ))
+
+        if broken:
+            raise CommandError(f"Hash chain broken for {broken} company(ies)")
+        self.stdout.write(self.style.SUCCESS("Journal hash chain verified"))
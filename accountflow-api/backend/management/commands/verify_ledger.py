@@ -0,0 +1,29 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.ledger import is_clean, verify_ledger
+
+
+class Command(BaseCommand):
+    help = "Verify double-entry invariants of the journal for every company"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', action='append', dest='companies', help='Company UUID (repeatable; default: all)')
+        parser.add_argument('--workers', type=int, default=4, help='Companies verified in parallel')
+        parser.add_argument('--limit', type=int, default=20, help='Offending rows printed per check')
+
+    def handle(self, *args, **options):
+        report = verify_ledger(options['companies'], workers=options['workers'], limit=options['limit'])
+
+        for company_id, checks in report.items():
+            for name, result in checks.items():
+                if not result['count']:
+                    continue
+                self.stdout.write(self.style.WARNING(f"{company_id} {name}: {result['count']} row(s)"))
+                for row in result['rows']:
+                    self.stdout.write(f"  {json.dumps(row, default=str)}")
+
+        if not is_clean(report):
+            raise CommandError("Ledger verification failed")
+        self.stdout.write(self.style.SUCCESS(f"Ledger verified for {len(report)} company(ies)"))
@@ -0,0 +1,155 @@
+"""
+Middlewares da API.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+from .routers import activate_read_alias, deactivate_read_alias
+from .validation import validation_scope
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependência opcional
+    brotli = None
+
+
+def negotiate_encoding(accept_encoding):
+    """
+    Escolhe a codificação a partir do Accept-Encoding, respeitando os pesos (q).
+    Prefere br quando o brotli está instalado e o cliente aceita ambas.
+    """
+    weights = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+
+    candidates = ['br', 'gzip'] if brotli is not None else ['gzip']
+    best, best_q = None, 0.0
+    for name in candidates:
+        q = weights.get(name, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Compressão gzip/brotli negociada por requisição.
+
+    Respostas menores que ``RESPONSE_COMPRESSION_MIN_SIZE`` bytes seguem sem
+    compressão; o custo de compactar não compensa.
+    """
+    brotli_quality = 5
+
+    @property
+    def min_size(self):
+        return getattr(settings, 'RESPONSE_COMPRESSION_MIN_SIZE', 1024)
+
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+        if response.has_header('Content-Encoding'):
+            return response
+
+        encoding = negotiate_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding == 'gzip' or (encoding == 'br' and response.streaming and response.is_async):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if encoding != 'br':
+            return response
+
+        if response.streaming:
+            response.streaming_content = self._brotli_sequence(response.streaming_content)
+            del response.headers['Content-Length']
+        else:
+            compressed = brotli.compress(response.content, quality=self.brotli_quality)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(response.content))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
+
+    def _brotli_sequence(self, sequence):
+        compressor = brotli.Compressor(quality=self.brotli_quality)
+        for chunk in sequence:
+            data = compressor.process(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+
+
+class ReadReplicaMiddleware:
+    """
+    Envia as leituras de GET/HEAD das views com ``read_replica = True``
+    (listagens, exportações e relatórios) para settings.DATABASE_READ_ALIAS.
+    Funciona em WSGI e ASGI, sem forçar as views assíncronas para uma thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        try:
+            return self.get_response(request)
+        finally:
+            deactivate_read_alias()
+
+    async def __acall__(self, request):
+        try:
+            return await self.get_response(request)
+        finally:
+            deactivate_read_alias()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        alias = getattr(settings, 'DATABASE_READ_ALIAS', None)
+        view_class = getattr(view_func, 'view_class', None)
+        if alias and request.method in ('GET', 'HEAD') and getattr(view_class, 'read_replica', False):
+            activate_read_alias(alias)
+
+
+class ValidationContextMiddleware:
+    """
+    Abre um escopo de validação (backend.validation) por requisição, para que
+    serializers e ``Model.clean`` compartilhem as consultas das mesmas regras.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with validation_scope():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with validation_scope():
+            return await self.get_response(request)
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.22 on 2026-10-19 15:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0013_add_tax_regime_to_company'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='entry',
+            name='company',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='entries', to='backend.company'),
+        ),
+        migrations.AddIndex(
+            model_name='entry',
+            index=models.Index(fields=['company', 'paid_at'], name='backend_ent_company_d4e427_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='journalentry',
+            index=models.Index(fields=['company', 'date'], name='backend_jou_company_1b6656_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['company', 'type_of', 'expiration_date'], name='backend_tit_company_ac5337_idx'),
+        ),
+    ]
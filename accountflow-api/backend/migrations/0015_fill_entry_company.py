@@ -0,0 +1,28 @@
+# Generated by Django 4.2.22 on 2026-10-19 15:02
+
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def fill_entry_company(apps, schema_editor):
+    """
+    Copia a empresa do título para as baixas existentes.
+    """
+    Entry = apps.get_model('backend', 'Entry')
+    Title = apps.get_model('backend', 'Title')
+    Entry.objects.filter(company__isnull=True).update(
+        company_id=Subquery(Title.objects.filter(pk=OuterRef('title_id')).values('company_id')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+    # Separada do AddField e do NOT NULL: no PostgreSQL o ALTER TABLE na mesma
+    # transação do UPDATE falha com "pending trigger events" (FK deferida)
+
+    dependencies = [
+        ('backend', '0014_entry_company_tenant_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_entry_company, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.22 on 2026-10-19 15:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0015_fill_entry_company'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='entry',
+            name='company',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='entries', to='backend.company'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.22 on 2026-10-19 15:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0017_journaloutbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='journalentry',
+            name='chain_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='journalentry',
+            name='chain_seq',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='journalentry',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddConstraint(
+            model_name='journalentry',
+            constraint=models.UniqueConstraint(fields=('company', 'chain_seq'), name='uniq_company_chain_seq'),
+        ),
+        migrations.CreateModel(
+            name='JournalChainCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='updated at')),
+                ('chain_seq', models.PositiveBigIntegerField(default=0)),
+                ('chain_hash', models.CharField(max_length=64)),
+                ('company', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='journal_checkpoint', to='backend.company')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,113 @@
+# Generated by Django 4.2.22 on 2026-10-19 15:32
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+FTS_TABLE = 'backend_searchdocument_fts'
+
+SQLITE_FORWARD = [
+    f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        content, content='backend_searchdocument', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER backend_searchdocument_ai AFTER INSERT ON backend_searchdocument BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, content) VALUES (new.id, new.content);
+    END""",
+    f"""CREATE TRIGGER backend_searchdocument_ad AFTER DELETE ON backend_searchdocument BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content) VALUES ('delete', old.id, old.content);
+    END""",
+    f"""CREATE TRIGGER backend_searchdocument_au AFTER UPDATE OF content ON backend_searchdocument BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content) VALUES ('delete', old.id, old.content);
+        INSERT INTO {FTS_TABLE}(rowid, content) VALUES (new.id, new.content);
+    END""",
+]
+SQLITE_REVERSE = [
+    'DROP TRIGGER IF EXISTS backend_searchdocument_au',
+    'DROP TRIGGER IF EXISTS backend_searchdocument_ad',
+    'DROP TRIGGER IF EXISTS backend_searchdocument_ai',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+POSTGRES_FORWARD = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS backend_searchdocument_content_trgm '
+    'ON backend_searchdocument USING gin (content gin_trgm_ops)',
+]
+POSTGRES_REVERSE = [
+    'DROP INDEX IF EXISTS backend_searchdocument_content_trgm',
+]
+
+
+def _run(schema_editor, statements):
+    for sql in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+def create_search_index(apps, schema_editor):
+    _run(schema_editor, {'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD})
+
+def drop_search_index(apps, schema_editor):
+    _run(schema_editor, {'sqlite': SQLITE_REVERSE, 'postgresql': POSTGRES_REVERSE})
+
+
+def _normalize(text):
+    text = unicodedata.normalize('NFKD', (text or '').lower())
+    return ' '.join(''.join(c for c in text if not unicodedata.combining(c)).split())
+
+def populate(apps, schema_editor):
+    db = schema_editor.connection.alias
+    SearchDocument = apps.get_model('backend', 'SearchDocument')
+    Title = apps.get_model('backend', 'Title')
+    Company = apps.get_model('backend', 'Company')
+    BillingAccount = apps.get_model('backend', 'BillingAccount')
+
+    def documents():
+        for t in Title.objects.using(db).only('uuid', 'company_id', 'description').iterator():
+            yield SearchDocument(kind='title', object_id=str(t.pk), company_id=t.company_id,
+                                 label=t.description[:255], content=_normalize(t.description))
+        for c in Company.objects.using(db).iterator():
+            text = ' '.join([c.fantasy_name, c.social_reason, c.cnpj, re.sub(r'\D', '', c.cnpj)])
+            yield SearchDocument(kind='company', object_id=str(c.pk), company_id=c.pk,
+                                 label=c.fantasy_name[:255], content=_normalize(text))
+        for a in BillingAccount.objects.using(db).only('uuid', 'code', 'name').iterator():
+            yield SearchDocument(kind='account', object_id=str(a.pk), label=f'{a.code} - {a.name}'[:255],
+                                 content=_normalize(f'{a.code} {a.name}'))
+
+    batch = []
+    for document in documents():
+        batch.append(document)
+        if len(batch) >= 2000:
+            SearchDocument.objects.using(db).bulk_create(batch)
+            batch = []
+    SearchDocument.objects.using(db).bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0021_budget'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='updated at')),
+                ('kind', models.CharField(choices=[('title', 'Title'), ('company', 'Company'), ('account', 'Billing Account')], max_length=10)),
+                ('object_id', models.CharField(max_length=64)),
+                ('label', models.CharField(max_length=255)),
+                ('content', models.TextField()),
+                ('company', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='search_documents', to='backend.company')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='searchdocument',
+            constraint=models.UniqueConstraint(fields=('kind', 'object_id'), name='uniq_search_document'),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(populate, migrations.RunPython.noop),
+    ]
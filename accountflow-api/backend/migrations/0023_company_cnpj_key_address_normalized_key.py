@@ -0,0 +1,60 @@
+# Generated by Django 4.2.22 on 2026-10-19 16:10
+
+import hashlib
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+
+ADDRESS_KEY_FIELDS = ('zip_code', 'street', 'number', 'complement', 'neighborhood', 'city', 'state')
+
+
+def _address_key(address):
+    parts = []
+    for field in ADDRESS_KEY_FIELDS:
+        text = unicodedata.normalize('NFKD', str(getattr(address, field) or '').lower())
+        text = ''.join(c for c in text if not unicodedata.combining(c))
+        words = re.findall(r'\w+', text)
+        parts.append(''.join(words) if field == 'zip_code' else ' '.join(words))
+    return hashlib.sha1('|'.join(parts).encode()).hexdigest()
+
+def backfill_keys(apps, schema_editor):
+    db = schema_editor.connection.alias
+    Company = apps.get_model('backend', 'Company')
+    Address = apps.get_model('backend', 'Address')
+
+    # CNPJs já repetidos (com pontuação diferente) ficam sem chave na mais nova
+    seen, companies = set(), []
+    for company in Company.objects.using(db).order_by('created_at', 'uuid').only('uuid', 'cnpj'):
+        key = re.sub(r'\D', '', company.cnpj or '') or None
+        company.cnpj_key = key if key not in seen else None
+        seen.add(key)
+        companies.append(company)
+    Company.objects.using(db).bulk_update(companies, ['cnpj_key'], batch_size=1000)
+
+    addresses = list(Address.objects.using(db).all())
+    for address in addresses:
+        address.normalized_key = _address_key(address)
+    Address.objects.using(db).bulk_update(addresses, ['normalized_key'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0022_searchdocument'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='address',
+            name='normalized_key',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=40),
+        ),
+        migrations.AddField(
+            model_name='company',
+            name='cnpj_key',
+            field=models.CharField(blank=True, editable=False, max_length=14, null=True, unique=True),
+        ),
+        migrations.RunPython(backfill_keys, migrations.RunPython.noop),
+    ]
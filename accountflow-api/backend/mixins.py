@@ -1,14 +1,172 @@
+import hashlib
 import logging
 
-from django.db import models
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
 
 class ModelBasedMixin(models.Model):
     created_at = models.DateTimeField(verbose_name="created at", auto_now_add=True)
     updated_at = models.DateTimeField(verbose_name="updated at", auto_now=True)
 
+    def clean_fields(self, exclude=None):
+        # Só a consulta de existência das FKs já carregadas é dispensada;
+        # validate_unique/validate_constraints continuam vendo esses campos
+        from .validation import loaded_relations
+        loaded = loaded_relations(self)
+        if loaded:
+            exclude = set(exclude or ()) | set(loaded)
+        super().clean_fields(exclude=exclude)
+
     def save(self, *args, **kwargs):
         self.full_clean()
         super().save(*args, **kwargs)
 
     class Meta:
         abstract = True
+
+class ConditionalGetMixin:
+    """
+    GET condicional (ETag / Last-Modified) a partir do ``updated_at`` do ModelBasedMixin.
+
+    Listas enviam só o ETag, feito de MAX(updated_at), da contagem do queryset
+    filtrado (percebe exclusões) e da URL. Last-Modified não acompanharia
+    exclusões. Detalhes usam o ``updated_at`` do objeto nos dois cabeçalhos.
+    ``conditional_related`` lista FKs cujos dados aparecem na resposta (ex.: o
+    nome do plano); o ``updated_at`` delas também entra na comparação. Quando o
+    cliente já possui a versão atual, a view responde 304 sem serializar nada.
+    """
+    conditional_related = ()
+
+    def check_not_modified(self, request, queryset=None, obj=None):
+        if obj is not None:
+            related = [getattr(obj, name) for name in self.conditional_related]
+            stamps = [obj.updated_at] + [r.updated_at for r in related if r is not None]
+            last_modified = max(stamps)
+            fingerprint = '{}:{}:{}'.format(
+                obj._meta.label, obj.pk, ':'.join(stamp.isoformat() for stamp in stamps),
+            )
+        else:
+            aggregates = {'last_modified': Max('updated_at'), 'count': Count('pk')}
+            for name in self.conditional_related:
+                aggregates[f'{name}_modified'] = Max(f'{name}__updated_at')
+            stats = queryset.order_by().aggregate(**aggregates)
+            last_modified = None
+            fingerprint = '{}:{}:{}'.format(
+                queryset.model._meta.label,
+                ':'.join(value.isoformat() if hasattr(value, 'isoformat') else str(value) for value in stats.values()),
+                # Paginação e filtros mudam o corpo da resposta
+                request.get_full_path(),
+            )
+
+        etag = quote_etag(hashlib.md5(fingerprint.encode('utf-8')).hexdigest())
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        self._conditional_headers = (etag, timestamp)
+        return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        headers = getattr(self, '_conditional_headers', None)
+        if headers and request.method in ('GET', 'HEAD') and response.status_code in (200, 304):
+            etag, timestamp = headers
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+        return response
+
+
+class IdempotentReplay(APIException):
+    """Interrompe a requisição devolvendo uma resposta já pronta."""
+    def __init__(self, response):
+        self.response = response
+
+
+class IdempotencyMixin:
+    """
+    Suporte ao cabeçalho ``Idempotency-Key`` em POST.
+
+    A primeira requisição com a chave reserva um IdempotencyKey (por usuário)
+    e, ao terminar, guarda o status e o corpo da resposta. Repetições com a
+    mesma chave recebem a resposta guardada sem executar a view: nada de
+    validação, de novos Title/Entry nem de eventos de lançamento.
+    Chaves expiram após ``settings.IDEMPOTENCY_KEY_TTL``.
+    """
+    idempotency_header = 'HTTP_IDEMPOTENCY_KEY'
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._idempotency_record = None
+        key = request.META.get(self.idempotency_header)
+        if request.method != 'POST' or not key:
+            return
+
+        IdempotencyKey = apps.get_model('backend', 'IdempotencyKey')
+        if len(key) > IdempotencyKey._meta.get_field('key').max_length:
+            raise IdempotentReplay(Response(
+                {'detail': 'Idempotency-Key muito longa.'}, status=status.HTTP_400_BAD_REQUEST
+            ))
+
+        fingerprint = hashlib.sha256(
+            request.method.encode() + request.path.encode() + b'\n' + request._request.body
+        ).hexdigest()
+        now = timezone.now()
+        IdempotencyKey.objects.filter(user=request.user, key=key, expires_at__lte=now).delete()
+        try:
+            with transaction.atomic():
+                self._idempotency_record = IdempotencyKey.objects.create(
+                    user=request.user, key=key, request_hash=fingerprint,
+                    expires_at=now + settings.IDEMPOTENCY_KEY_TTL,
+                )
+            return
+        except (IntegrityError, ValidationError):
+            # full_clean já acusa a chave repetida; IntegrityError cobre a corrida
+            record = IdempotencyKey.objects.filter(user=request.user, key=key).first()
+
+        if record is None or record.request_hash != fingerprint:
+            raise IdempotentReplay(Response(
+                {'detail': 'Idempotency-Key já utilizada com outra requisição.'},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            ))
+        if record.status_code is None:
+            raise IdempotentReplay(Response(
+                {'detail': 'Requisição com esta Idempotency-Key ainda em processamento.'},
+                status=status.HTTP_409_CONFLICT,
+            ))
+        response = Response(record.response_body, status=record.status_code)
+        response['Idempotent-Replayed'] = 'true'
+        raise IdempotentReplay(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, IdempotentReplay):
+            return exc.response
+        try:
+            return super().handle_exception(exc)
+        except Exception:
+            # Exceção não tratada: finalize_response não roda, então a chave é liberada aqui
+            record, self._idempotency_record = getattr(self, '_idempotency_record', None), None
+            if record is not None:
+                record.delete()
+            raise
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        record = getattr(self, '_idempotency_record', None)
+        if record is not None:
+            self._idempotency_record = None
+            if response.status_code >= 500 or not hasattr(response, 'data'):
+                # Falha do servidor: libera a chave para uma nova tentativa
+                record.delete()
+            else:
+                type(record).objects.filter(pk=record.pk).update(
+                    status_code=response.status_code, response_body=response.data,
+                    updated_at=timezone.now(),
+                )
+        return response
@@ -1,11 +1,65 @@
+import hashlib
+import re
+import unicodedata
 import uuid
-from django.db import models
+from django.db import connections, models
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
 from django.core.exceptions import ValidationError
 from .mixins import ModelBasedMixin
 from django.db.models import Sum
 from decimal import Decimal
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+class TenantQuerySet(models.QuerySet):
+    """
+    QuerySet para modelos que carregam a empresa (tenant) diretamente.
+    Os índices compostos destes modelos começam por ``company``.
+    """
+    def for_company(self, company_id):
+        return self.filter(company_id=company_id)
+
+class TitleQuerySet(TenantQuerySet):
+    def rebuild_active_flags(self):
+        """
+        Recalcula ``active`` (total baixado < valor) dos títulos deste queryset
+        com um único ``UPDATE ... FROM`` sobre as somas agrupadas das baixas.
+        Só grava os títulos cujo flag muda; retorna ``(alterados, empresas)``.
+        """
+        connection = connections[self.db]
+        qn = connection.ops.quote_name
+        title_table = qn(self.model._meta.db_table)
+        entry_table = qn(Entry._meta.db_table)
+        subset_sql, subset_params = self.order_by().values('pk').query.sql_with_params()
+
+        sql = f"""
+            UPDATE {title_table}
+               SET active = (paid.total < {title_table}.amount),
+                   updated_at = %s
+              FROM (
+                    SELECT t.uuid AS title_id, COALESCE(SUM(e.amount), 0) AS total
+                      FROM {title_table} t
+                      LEFT JOIN {entry_table} e ON e.title_id = t.uuid
+                     WHERE t.uuid IN ({subset_sql})
+                     GROUP BY t.uuid
+                   ) paid
+             WHERE {title_table}.uuid = paid.title_id
+               AND {title_table}.active <> (paid.total < {title_table}.amount)
+            RETURNING {title_table}.company_id
+        """
+        from django.db import transaction
+        from .cache import report_cache
+
+        params = [connection.ops.adapt_datetimefield_value(timezone.now()), *subset_params]
+        with transaction.atomic(using=self.db), connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            companies = [uuid.UUID(str(row[0])) for row in cursor.fetchall()]
+            # O UPDATE direto não dispara signals
+            for company_id in set(companies):
+                transaction.on_commit(lambda cid=company_id: report_cache.invalidate_company(cid), using=self.db)
+        return len(companies), set(companies)
+
 class Address(ModelBasedMixin):
     uuid = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     zip_code = models.CharField(max_length=255)
@@ -15,6 +69,25 @@ class Address(ModelBasedMixin):
     neighborhood = models.CharField(max_length=255)
     city = models.CharField(max_length=255)
     state = models.CharField(max_length=255)
+    # Hash do endereço normalizado (sem acentos, caixa e pontuação), para deduplicar importações
+    normalized_key = models.CharField(max_length=40, db_index=True, editable=False, blank=True, default='')
+
+    KEY_FIELDS = ('zip_code', 'street', 'number', 'complement', 'neighborhood', 'city', 'state')
+
+    @classmethod
+    def build_key(cls, values):
+        """Chave de ``values`` (dict com KEY_FIELDS): iguais a menos de acentos, caixa e pontuação."""
+        parts = []
+        for field in cls.KEY_FIELDS:
+            text = unicodedata.normalize('NFKD', str(values.get(field) or '').lower())
+            text = ''.join(c for c in text if not unicodedata.combining(c))
+            words = re.findall(r'\w+', text)
+            parts.append(''.join(words) if field == 'zip_code' else ' '.join(words))
+        return hashlib.sha1('|'.join(parts).encode()).hexdigest()
+
+    def save(self, *args, **kwargs):
+        self.normalized_key = self.build_key(self.__dict__)
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.zip_code} - ({self.city}/{self.state})"
@@ -26,6 +99,8 @@ class Company(ModelBasedMixin):
 
     uuid = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     cnpj = models.CharField(max_length=20, unique=True)
+    # Só os dígitos do CNPJ: "12.345.678/0001-90" e "12345678000190" são a mesma empresa
+    cnpj_key = models.CharField(max_length=14, unique=True, null=True, blank=True, editable=False)
     fantasy_name = models.CharField(max_length=255)
     social_reason = models.CharField(max_length=255)
     opening_date = models.DateField()
@@ -37,6 +112,29 @@ class Company(ModelBasedMixin):
     phone = models.CharField(max_length=20)
     tax_regime = models.CharField(max_length=255)
 
+    @staticmethod
+    def normalize_cnpj(value):
+        return re.sub(r'\D', '', value or '')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_cnpj = instance.__dict__.get('cnpj')
+        return instance
+
+    def save(self, *args, **kwargs):
+        key = self.normalize_cnpj(self.cnpj) or None
+        legacy = (
+            not self._state.adding and self.cnpj_key is None
+            and self.cnpj == getattr(self, '_loaded_cnpj', None)
+        )
+        # Duplicata antiga deixada sem chave pela migration 0023: continua sem chave
+        # enquanto outra empresa tiver o mesmo CNPJ, para não travar a edição
+        if not legacy or not type(self).objects.filter(cnpj_key=key).exclude(pk=self.pk).exists():
+            self.cnpj_key = key
+        super().save(*args, **kwargs)
+        self._loaded_cnpj = self.cnpj
+
     def __str__(self):
         return f"{self.fantasy_name} - {self.cnpj} - {self.type_of}"
 
@@ -223,8 +321,7 @@ class Preset(ModelBasedMixin):
             raise ValidationError({'payable_account': 'Todas as contas do preset devem pertencer ao mesmo plano de contas.'})
 
     def save(self, *args, **kwargs):
-        # ✅ Sempre salva o nome das contas relacionadas
-        self.full_clean()
+        # ✅ Sempre salva o nome das contas relacionadas (full_clean fica no ModelBasedMixin)
         if self.payable_account:
             self.payable_account_name = self.payable_account.name
         if self.receivable_account:
@@ -261,10 +358,18 @@ class Title(ModelBasedMixin):
     type_of = models.CharField(max_length=10, choices=TitleType.choices)
     preset = models.ForeignKey(Preset, on_delete=models.PROTECT, null=True, blank=True)
 
-    def sync_active_flag(self):
+    objects = TitleQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['company', 'type_of', 'expiration_date']),
+        ]
+
+    def sync_active_flag(self, total_pago=None):
         from django.db import transaction
         with transaction.atomic():
-            total_pago = self.entries.aggregate(total=Sum('amount'))['total'] or Decimal('0')
+            if total_pago is None:
+                total_pago = self.entries.aggregate(total=Sum('amount'))['total'] or Decimal('0')
             ativo = total_pago < self.amount
             if self.active != ativo:
                 self.active = ativo
@@ -274,19 +379,19 @@ class Title(ModelBasedMixin):
         super().clean()
         
         if self.pk and self._state.adding is False:
-            from django.db.models import Sum
-            from decimal import Decimal
-            
+            from .validation import title_payments
+
             old = type(self).objects.only('amount').get(pk=self.pk)
             amount_changed = (self.amount != old.amount)
             
             if amount_changed:
-                if self.entries.exists():
+                # Mesma consulta do TitleSerializer.validate (compartilhada no escopo de validação)
+                count, total_paid = title_payments(self.pk)
+                if count:
                     raise ValidationError({
                         'amount': 'Não é permitido alterar o valor de um título que já possui baixas.'
                     })
                 
-                total_paid = self.entries.aggregate(total=Sum('amount'))['total'] or Decimal('0')
                 if total_paid > self.amount:
                     raise ValidationError({
                         'amount': f'Valor do título não pode ser menor que o total já baixado (R$ {total_paid}).'
@@ -308,11 +413,33 @@ class Title(ModelBasedMixin):
                     'preset': 'Todas as contas do preset devem pertencer ao mesmo plano de contas.'
                 })
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_company_id = instance.__dict__.get('company_id')
+        return instance
+
     def save(self, *args, **kwargs):
         from decimal import Decimal, ROUND_HALF_UP
         if self.amount:
             self.amount = Decimal(str(self.amount)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-        super().save(*args, **kwargs)
+        from django.db import transaction
+        adding = self._state.adding
+        # Empresa anterior, para os signals invalidarem também o cache dela numa troca
+        self._previous_company_id = None if adding else getattr(self, '_loaded_company_id', None)
+        if not adding and self._previous_company_id is None:
+            self._previous_company_id = (
+                type(self).objects.filter(pk=self.pk).values_list('company_id', flat=True).first()
+            )
+        # Atômico para que o evento do outbox (signals) seja gravado junto com o título
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # Mantém a empresa desnormalizada das baixas alinhada com o título
+            if not adding:
+                self.entries.exclude(company_id=self.company_id).update(
+                    company_id=self.company_id, updated_at=timezone.now()
+                )
+        self._loaded_company_id = self.company_id
 
     def __str__(self):
         return f"{self.description} - R$ {self.amount} ({self.get_type_of_display()})"
@@ -341,6 +468,10 @@ class Entry(ModelBasedMixin):
         blank=False,
         null=False,
     )
+    # Desnormalizado de title.company para filtrar por empresa sem join
+    company = models.ForeignKey(Company, on_delete=models.PROTECT, related_name='entries', editable=False)
+
+    objects = TenantQuerySet.as_manager()
 
     def clean(self):
         super().clean()
@@ -364,14 +495,10 @@ class Entry(ModelBasedMixin):
                 })
         
         if self.title and self.amount:
-            from django.db.models import Sum
-            from decimal import Decimal
-            
-            qs = Entry.objects.filter(title=self.title)
-            if self.pk:  
-                qs = qs.exclude(pk=self.pk)
-            
-            total_paid = qs.aggregate(total=Sum('amount'))['total'] or Decimal('0')
+            from .validation import paid_total
+
+            # Mesma consulta do EntrySerializer.validate (compartilhada no escopo de validação)
+            total_paid = paid_total(self.title_id, None if self._state.adding else self.pk)
             projected_total = total_paid + self.amount
             
             if projected_total > self.title.amount:
@@ -383,6 +510,7 @@ class Entry(ModelBasedMixin):
     class Meta:
         indexes = [
             models.Index(fields=['title', 'paid_at']),
+            models.Index(fields=['company', 'paid_at']),
         ]
         ordering = ['-paid_at', 'uuid']
 
@@ -390,25 +518,41 @@ class Entry(ModelBasedMixin):
         from decimal import Decimal, ROUND_HALF_UP
         if self.amount:
             self.amount = Decimal(str(self.amount)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        if self.title_id:
+            self.company_id = self.title.company_id
 
         old_title = None
-        if self.pk:
+        if not self._state.adding:
             try:
                 old_title = Entry.objects.only("title_id").get(pk=self.pk).title
             except Entry.DoesNotExist:
                 pass
 
-        super().save(*args, **kwargs)
-        if self.title:
-            if old_title and old_title != self.title:
-                old_title.sync_active_flag()
-            self.title.sync_active_flag()
+        from django.db import transaction
+        from .validation import cached_paid_total, forget_title
+        # Atômico para que o evento do outbox (signals) seja gravado junto com a baixa
+        with transaction.atomic():
+            adding = self._state.adding
+            super().save(*args, **kwargs)
+            if self.title:
+                if old_title and old_title != self.title:
+                    old_title.sync_active_flag()
+                    forget_title(old_title.pk)
+                # No escopo de validação, o total das outras baixas já foi lido pelo clean
+                others = cached_paid_total(self.title_id, None if adding else self.pk)
+                forget_title(self.title_id)
+                self.title.sync_active_flag(others + self.amount if others is not None else None)
 
     def delete(self, *args, **kwargs):  
+        from django.db import transaction
+        from .validation import forget_title
         title = self.title
-        super().delete(*args, **kwargs)
-        if title:
-            title.sync_active_flag()
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            if title:
+                forget_title(title.pk)
+                title.sync_active_flag()
+        return result
 
     def __str__(self):
         return f"Pagamento: {self.description or self.title.description} - R$ {self.amount}"
@@ -419,6 +563,10 @@ class JournalEntry(ModelBasedMixin):
         TITLE_SETTLEMENT = 'title_settlement', 'Title Settlement'
         TITLE_SETTLEMENT_REVERSAL = 'title_settlement_reverse', 'Title Settlement Reverse'
 
+    # Valor gravado pelos estornos anteriores ao outbox (signals síncronos)
+    LEGACY_SETTLEMENT_REVERSAL = 'title_settlement_reversal'
+    REVERSAL_TYPES = (RefType.TITLE_SETTLEMENT_REVERSAL, LEGACY_SETTLEMENT_REVERSAL)
+
     uuid = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     date = models.DateField()
     description = models.CharField(max_length=255, blank=True)
@@ -430,14 +578,23 @@ class JournalEntry(ModelBasedMixin):
     total_debits = models.DecimalField(max_digits=14, decimal_places=2, default=0)
     total_credits = models.DecimalField(max_digits=14, decimal_places=2, default=0)
 
+    # Cadeia de hashes por empresa (backend.hashchain)
+    chain_seq = models.PositiveBigIntegerField(null=True, blank=True, editable=False)
+    content_hash = models.CharField(max_length=64, blank=True, editable=False)
+    chain_hash = models.CharField(max_length=64, blank=True, editable=False)
+
+    objects = TenantQuerySet.as_manager()
+
     class Meta:
         indexes = [
             models.Index(fields=['reference_type', 'reference_id']),
-            models.Index(fields=['date'])
+            models.Index(fields=['date']),
+            models.Index(fields=['company', 'date']),
         ]
         ordering = ['-date']
         constraints = [
-            models.UniqueConstraint(fields=['reference_type', 'reference_id'], name='uniq_ref')
+            models.UniqueConstraint(fields=['reference_type', 'reference_id'], name='uniq_ref'),
+            models.UniqueConstraint(fields=['company', 'chain_seq'], name='uniq_company_chain_seq'),
         ]
 
 
@@ -464,3 +621,159 @@ class JournalLine(ModelBasedMixin):
 
         if self.account.account_type != BillingAccount.AccountType.ANALYTIC:
             raise ValidationError('Somente contas analíticas podem receber lançamentos.')
+
+class JournalOutbox(ModelBasedMixin):
+    """
+    Eventos de títulos e baixas aguardando lançamento contábil.
+
+    Gravados na mesma transação do Title/Entry; o comando process_journal_outbox
+    consome os eventos em lotes e gera os JournalEntry correspondentes.
+    """
+    class Event(models.TextChoices):
+        TITLE_CREATED = 'title_created', 'Title Created'
+        ENTRY_CREATED = 'entry_created', 'Entry Created'
+        ENTRY_DELETED = 'entry_deleted', 'Entry Deleted'
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        PROCESSING = 'processing', 'Processing'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+
+    event = models.CharField(max_length=20, choices=Event.choices)
+    reference_id = models.CharField(max_length=64)
+    company = models.ForeignKey('Company', on_delete=models.CASCADE, related_name='journal_outbox')
+    payload = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=255, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'available_at']),
+        ]
+        ordering = ['id']
+
+    def __str__(self):
+        return f"{self.event} {self.reference_id} ({self.status})"
+
+class JournalChainCheckpoint(ModelBasedMixin):
+    """
+    Último elo da cadeia de hashes já verificado para a empresa; a próxima
+    verificação parte daqui em vez de recalcular todo o razão.
+    """
+    company = models.OneToOneField('Company', on_delete=models.CASCADE, related_name='journal_checkpoint')
+    chain_seq = models.PositiveBigIntegerField(default=0)
+    chain_hash = models.CharField(max_length=64)
+
+    def __str__(self):
+        return f"{self.company_id} #{self.chain_seq}"
+
+class AccountBalanceSnapshot(ModelBasedMixin):
+    """
+    Débitos e créditos acumulados de uma conta na empresa até ``period_end``
+    (inclusive). O balanço parte do snapshot mais recente anterior à data
+    pedida e soma só os lançamentos posteriores (backend.balance).
+    """
+    company = models.ForeignKey('Company', on_delete=models.CASCADE, related_name='balance_snapshots')
+    account = models.ForeignKey('BillingAccount', on_delete=models.CASCADE, related_name='balance_snapshots')
+    period_end = models.DateField()
+    debit = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    credit = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    objects = TenantQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['company', 'period_end']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['company', 'account', 'period_end'], name='uniq_balance_snapshot'),
+        ]
+
+    def __str__(self):
+        return f"{self.company_id} {self.account_id} @ {self.period_end}"
+
+class Budget(ModelBasedMixin):
+    """
+    Valor orçado para uma conta analítica da empresa em um mês (``month`` é
+    sempre o primeiro dia). Comparado com o realizado em backend.budget.
+    """
+    company = models.ForeignKey('Company', on_delete=models.CASCADE, related_name='budgets')
+    account = models.ForeignKey('BillingAccount', on_delete=models.PROTECT, related_name='budgets')
+    month = models.DateField()
+    amount = models.DecimalField(max_digits=14, decimal_places=2, validators=[MinValueValidator(0)])
+
+    objects = TenantQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['company', 'month']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['company', 'account', 'month'], name='uniq_budget_account_month'),
+        ]
+        ordering = ['month']
+
+    def clean(self):
+        super().clean()
+        if self.account_id and self.account.account_type != BillingAccount.AccountType.ANALYTIC:
+            raise ValidationError({'account': 'Somente contas analíticas podem ser orçadas.'})
+
+    def save(self, *args, **kwargs):
+        if self.month:
+            self.month = self.month.replace(day=1)
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.account_id} {self.month:%Y-%m}: R$ {self.amount}"
+
+class SearchDocument(ModelBasedMixin):
+    """
+    Texto pesquisável (minúsculo e sem acentos) de um título, empresa ou conta.
+    Indexado por FTS5 no SQLite e por trigramas no PostgreSQL (backend.search).
+    """
+    class Kind(models.TextChoices):
+        TITLE = 'title', 'Title'
+        COMPANY = 'company', 'Company'
+        ACCOUNT = 'account', 'Billing Account'
+
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    object_id = models.CharField(max_length=64)
+    company = models.ForeignKey('Company', on_delete=models.CASCADE, null=True, blank=True, related_name='search_documents')
+    label = models.CharField(max_length=255)
+    content = models.TextField()
+
+    objects = TenantQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='uniq_search_document'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}: {self.label}"
+
+class IdempotencyKey(ModelBasedMixin):
+    """
+    Resposta guardada de um POST enviado com ``Idempotency-Key`` (IdempotencyMixin).
+    ``status_code`` nulo indica requisição ainda em processamento.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='idempotency_keys')
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='uniq_idempotency_user_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.key} ({self.status_code or 'pending'})"
@@ -0,0 +1,177 @@
+"""
+Consumo do JournalOutbox.
+
+Cada worker reserva um lote de eventos pendentes, monta os lançamentos e grava
+todos com ``post_journals``. Em PostgreSQL a reserva usa
+``SELECT ... FOR UPDATE SKIP LOCKED``, então vários processos podem drenar a
+fila ao mesmo tempo sem pegar o mesmo evento.
+"""
+from datetime import date, timedelta
+import logging
+import os
+import socket
+import uuid
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .journal import PRESET_ACCOUNT_PATHS, entry_reversal_posting, entry_settlement_posting, post_journals, title_creation_posting
+from .models import Entry, JournalEntry, JournalOutbox, Title
+
+logger = logging.getLogger(__name__)
+
+# Eventos presos em "processing" por mais tempo que isto voltam para a fila
+LOCK_TIMEOUT = timedelta(minutes=5)
+MAX_BACKOFF_SECONDS = 15 * 60
+
+def default_worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+def claim_batch(worker_id, batch_size=100):
+    now = timezone.now()
+    with transaction.atomic():
+        JournalOutbox.objects.filter(
+            status=JournalOutbox.Status.PROCESSING, locked_at__lt=now - LOCK_TIMEOUT
+        ).update(status=JournalOutbox.Status.PENDING, locked_by='', locked_at=None)
+
+        ids = list(
+            JournalOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status=JournalOutbox.Status.PENDING, available_at__lte=now)
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        # O filtro por status evita que dois workers (SQLite) reservem o mesmo evento
+        JournalOutbox.objects.filter(id__in=ids, status=JournalOutbox.Status.PENDING).update(
+            status=JournalOutbox.Status.PROCESSING,
+            locked_by=worker_id,
+            locked_at=now,
+            attempts=F('attempts') + 1,
+        )
+    return list(
+        JournalOutbox.objects.filter(id__in=ids, locked_by=worker_id, status=JournalOutbox.Status.PROCESSING)
+        .order_by('id')
+    )
+
+def build_postings(events):
+    """
+    Monta os lançamentos dos eventos, carregando títulos, baixas e lançamentos
+    originais com uma consulta por tipo de evento.
+    Retorna ``{event.id: posting | None}``.
+    """
+    by_type = {}
+    for event in events:
+        by_type.setdefault(event.event, []).append(event)
+
+    plans = {}
+    postings = {}
+
+    created = by_type.get(JournalOutbox.Event.TITLE_CREATED, [])
+    if created:
+        titles = Title.objects.select_related(*PRESET_ACCOUNT_PATHS).in_bulk(
+            [e.reference_id for e in created]
+        )
+        for event in created:
+            title = titles.get(_as_uuid(event.reference_id))
+            postings[event.id] = title_creation_posting(title, plans) if title else None
+
+    settled = by_type.get(JournalOutbox.Event.ENTRY_CREATED, [])
+    if settled:
+        entries = Entry.objects.select_related(
+            'billing_account', *(f'title__{path}' for path in PRESET_ACCOUNT_PATHS)
+        ).in_bulk([e.reference_id for e in settled])
+        for event in settled:
+            entry = entries.get(_as_uuid(event.reference_id))
+            # Baixa já excluída: nada a lançar (o estorno também não terá original)
+            postings[event.id] = entry_settlement_posting(entry, plans) if entry else None
+
+    deleted = by_type.get(JournalOutbox.Event.ENTRY_DELETED, [])
+    if deleted:
+        originals = {
+            je.reference_id: je
+            for je in JournalEntry.objects.filter(
+                reference_type=JournalEntry.RefType.TITLE_SETTLEMENT,
+                reference_id__in=[e.reference_id for e in deleted],
+            ).prefetch_related('lines')
+        }
+        for event in deleted:
+            original = originals.get(event.reference_id)
+            paid_at = event.payload.get('paid_at')
+            postings[event.id] = (
+                entry_reversal_posting(original, date.fromisoformat(paid_at) if paid_at else original.date)
+                if original else None
+            )
+
+    return postings
+
+def _as_uuid(value):
+    return uuid.UUID(value)
+
+def process_batch(events, max_attempts=5):
+    """
+    Lança os eventos do lote. Se a gravação em lote falhar, cada evento é
+    tentado isoladamente para que apenas os problemáticos voltem à fila.
+    Retorna ``(concluídos, falhas)``.
+    """
+    if not events:
+        return 0, 0
+
+    # Baixas criadas precisam ser lançadas antes dos estornos do mesmo lote
+    ordered = sorted(events, key=lambda e: (e.event == JournalOutbox.Event.ENTRY_DELETED, e.id))
+    try:
+        postings = build_postings(ordered)
+        post_journals([postings[e.id] for e in ordered])
+    except Exception:
+        logger.exception('Falha ao lançar lote do outbox; processando eventos individualmente.')
+    else:
+        _mark_done(ordered)
+        return len(ordered), 0
+
+    done, failed = 0, 0
+    for event in ordered:
+        try:
+            with transaction.atomic():
+                post_journals([build_postings([event])[event.id]])
+        except Exception as exc:
+            logger.exception('Falha ao lançar evento %s do outbox.', event.id)
+            _mark_failed(event, exc, max_attempts)
+            failed += 1
+        else:
+            _mark_done([event])
+            done += 1
+    return done, failed
+
+def _mark_done(events):
+    JournalOutbox.objects.filter(id__in=[e.id for e in events]).update(
+        status=JournalOutbox.Status.DONE, locked_by='', locked_at=None, last_error='',
+        updated_at=timezone.now(),
+    )
+
+def _mark_failed(event, exc, max_attempts):
+    # Nova tentativa com espera exponencial; após max_attempts o evento fica como failed
+    exhausted = event.attempts >= max_attempts
+    backoff = min(2 ** event.attempts, MAX_BACKOFF_SECONDS)
+    JournalOutbox.objects.filter(id=event.id).update(
+        status=JournalOutbox.Status.FAILED if exhausted else JournalOutbox.Status.PENDING,
+        available_at=timezone.now() + timedelta(seconds=backoff),
+        locked_by='', locked_at=None,
+        last_error=str(exc)[:2000],
+        updated_at=timezone.now(),
+    )
+
+def drain(batch_size=100, max_attempts=5, worker_id=None, max_batches=None):
+    """
+    Processa lotes até a fila de eventos disponíveis esvaziar.
+    Retorna ``(concluídos, falhas)``.
+    """
+    worker_id = worker_id or default_worker_id()
+    done_total, failed_total, batches = 0, 0, 0
+    while max_batches is None or batches < max_batches:
+        events = claim_batch(worker_id, batch_size)
+        if not events:
+            break
+        done, failed = process_batch(events, max_attempts)
+        done_total += done
+        failed_total += failed
+        batches += 1
+    return done_total, failed_total
@@ -0,0 +1,21 @@
+"""
+Parsers de corpo de requisição além dos padrões do DRF.
+"""
+import codecs
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class CSVTextParser(BaseParser):
+    """Corpo ``text/csv`` entregue como texto (``request.data``) para as importações."""
+    media_type = 'text/csv'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            decoded = codecs.getreader(encoding)(stream)
+            return decoded.read()
+        except UnicodeDecodeError as exc:
+            raise ParseError(f'CSV inválido: {exc}')
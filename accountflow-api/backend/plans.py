@@ -0,0 +1,207 @@
+"""
+Criação em lote de planos de contas: importação (árvore JSON ou CSV) e cópia de um plano.
+
+``BillingAccount.save`` valida, sobe a cadeia de pais para o nível e conta os
+irmãos para o código a cada conta. Aqui a árvore inteira é montada em memória.
+As regras de tipo e de ``MAX_LEVEL`` são validadas numa passada. Os códigos seguem
+a mesma regra do modelo (até o nível 3 o número do irmão, depois com três dígitos).
+A gravação é feita nível a nível com ``bulk_create``.
+"""
+import csv
+import io
+
+from django.db import transaction
+
+from .models import BillingAccount, BillingPlan
+
+ACCOUNT_TYPES = {
+    **{value: value for value in BillingAccount.AccountType.values},
+    **{label.lower(): value for value, label in BillingAccount.AccountType.choices},
+}
+
+
+class ChartError(Exception):
+    """Árvore inválida; ``errors`` lista ``{'ref', 'error'}``."""
+
+    def __init__(self, errors):
+        super().__init__(f'{len(errors)} conta(s) inválida(s)')
+        self.errors = errors
+
+# ------------------------------------------------------------
+# Leitura
+# ------------------------------------------------------------
+
+def _is_active(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() not in ('0', 'false', 'nao', 'não', 'n', 'no')
+
+def _node(ref, name, account_type, is_active=True):
+    return {
+        'ref': ref,
+        'name': (name or '').strip(),
+        'account_type': ACCOUNT_TYPES.get(str(account_type or '').strip().lower()),
+        'raw_type': account_type,
+        'is_active': _is_active(is_active),
+        'children': [],
+    }
+
+def tree_from_json(items, path=''):
+    """Nós a partir de ``[{name, account_type, is_active?, children?}, ...]``."""
+    if not isinstance(items, list):
+        raise ChartError([{'ref': path or 'raiz', 'error': 'esperada uma lista de contas'}])
+    nodes = []
+    for position, item in enumerate(items, start=1):
+        ref = f'{path}.{position}' if path else str(position)
+        if not isinstance(item, dict):
+            raise ChartError([{'ref': ref, 'error': 'esperado um objeto'}])
+        node = _node(ref, item.get('name'), item.get('account_type'), item.get('is_active', True))
+        if item.get('children') and ref.count('.') >= BillingAccount.MAX_LEVEL:
+            raise ChartError([{'ref': ref, 'error': f'A profundidade máxima permitida é de {BillingAccount.MAX_LEVEL} níveis.'}])
+        node['children'] = tree_from_json(item.get('children') or [], ref)
+        nodes.append(node)
+    return nodes
+
+def tree_from_csv(text):
+    """
+    Nós a partir do CSV ``code,name,account_type[,is_active]``. O código só indica
+    a hierarquia (pai = código sem o último segmento) e a ordem é a do arquivo;
+    os códigos gravados são recalculados.
+    """
+    reader = csv.DictReader(io.StringIO(text.lstrip('\ufeff')))
+    missing = [c for c in ('code', 'name', 'account_type') if c not in (reader.fieldnames or [])]
+    if missing:
+        raise ChartError([{'ref': 'linha 1', 'error': f"colunas ausentes: {', '.join(missing)}"}])
+
+    roots, by_code, errors = [], {}, []
+    for line, row in enumerate(reader, start=2):
+        code = (row['code'] or '').strip()
+        node = _node(f'linha {line}', row['name'], row['account_type'], row.get('is_active') or True)
+        if not code or code in by_code:
+            errors.append({'ref': node['ref'], 'error': f'código vazio ou repetido: {code!r}'})
+            continue
+        parent_code = code.rpartition('.')[0]
+        if parent_code and parent_code not in by_code:
+            errors.append({'ref': node['ref'], 'error': f'conta pai {parent_code!r} não aparece antes'})
+            continue
+        by_code[code] = node
+        (by_code[parent_code]['children'] if parent_code else roots).append(node)
+    if errors:
+        raise ChartError(errors)
+    return roots
+
+# ------------------------------------------------------------
+# Validação e montagem
+# ------------------------------------------------------------
+
+def _walk(nodes, parent=None, level=1):
+    for node in nodes:
+        yield node, parent, level
+        yield from _walk(node['children'], node, level + 1)
+
+def validate_tree(roots):
+    """Lista de erros das regras do modelo (tipo, pai, ``MAX_LEVEL``), em uma passada."""
+    errors = []
+    name_length = BillingAccount._meta.get_field('name').max_length
+    for node, parent, level in _walk(roots):
+        messages = []
+        if not node['name']:
+            messages.append('nome obrigatório')
+        elif len(node['name']) > name_length:
+            messages.append(f'nome com mais de {name_length} caracteres')
+        if node['account_type'] is None:
+            messages.append(f"tipo inválido: {node['raw_type']!r}")
+        if level > BillingAccount.MAX_LEVEL:
+            messages.append(f'A profundidade máxima permitida é de {BillingAccount.MAX_LEVEL} níveis.')
+        if node['account_type'] == BillingAccount.AccountType.ANALYTIC:
+            if parent is None:
+                messages.append('Conta analítica deve ter uma conta pai sintética.')
+            if node['children']:
+                messages.append('Conta analítica não pode possuir contas filhas.')
+        errors.extend({'ref': node['ref'], 'error': message} for message in messages)
+    if not roots:
+        errors.append({'ref': 'raiz', 'error': 'nenhuma conta informada'})
+    return errors
+
+def child_code(parent_code, position, level):
+    """Mesmo formato de ``BillingAccount.generate_account_code``."""
+    if parent_code is None:
+        return str(position)
+    suffix = str(position) if level <= 3 else str(position).zfill(3)
+    return f'{parent_code}.{suffix}'
+
+def build_accounts(plan, roots):
+    """Contas (não salvas) agrupadas por nível, com pai e código já resolvidos."""
+    levels = []
+
+    def visit(nodes, parent, level):
+        for position, node in enumerate(nodes, start=1):
+            account = BillingAccount(
+                billing_plan=plan, parent=parent, name=node['name'], account_type=node['account_type'],
+                is_active=node['is_active'], code=child_code(parent.code if parent else None, position, level),
+            )
+            account._level_cache = level
+            if len(levels) < level:
+                levels.append([])
+            levels[level - 1].append(account)
+            visit(node['children'], account, level + 1)
+
+    visit(roots, None, 1)
+    return levels
+
+def _insert(levels, batch_size):
+    for accounts in levels:
+        BillingAccount.objects.bulk_create(accounts, batch_size=batch_size)
+    created = [account for accounts in levels for account in accounts]
+    # bulk_create não dispara signals
+    from .search import index_objects
+    index_objects('account', created)
+    return created
+
+# ------------------------------------------------------------
+# Operações
+# ------------------------------------------------------------
+
+def import_chart(name, description, roots, batch_size=1000):
+    """Cria o plano ``name`` com a árvore ``roots``; ChartError se inválida. Retorna (plano, contas)."""
+    errors = validate_tree(roots)
+    if errors:
+        raise ChartError(errors)
+    with transaction.atomic():
+        plan = BillingPlan.objects.create(name=name, description=description)
+        return plan, _insert(build_accounts(plan, roots), batch_size)
+
+def clone_plan(source, name=None, description=None, batch_size=1000):
+    """
+    Cópia do plano ``source`` com todas as contas. Os códigos são mantidos para
+    que importações e orçamentos por código sirvam aos dois planos.
+    """
+    rows = list(
+        BillingAccount.objects.filter(billing_plan=source)
+        .values('uuid', 'parent_id', 'name', 'account_type', 'is_active', 'code')
+    )
+    children = {}
+    for row in rows:
+        children.setdefault(row['parent_id'], []).append(row)
+
+    with transaction.atomic():
+        plan = BillingPlan.objects.create(
+            name=name or f'{source.name} (cópia)', description=description or source.description,
+        )
+        levels, current, parents = [], [None], {None: None}
+        while True:
+            accounts, next_level = [], []
+            for old_parent in current:
+                for row in children.get(old_parent, []):
+                    account = BillingAccount(
+                        billing_plan=plan, parent=parents[old_parent], name=row['name'],
+                        account_type=row['account_type'], is_active=row['is_active'], code=row['code'],
+                    )
+                    parents[row['uuid']] = account
+                    accounts.append(account)
+                    next_level.append(row['uuid'])
+            if not accounts:
+                break
+            levels.append(accounts)
+            current = next_level
+        return plan, _insert(levels, batch_size)
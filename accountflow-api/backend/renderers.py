@@ -0,0 +1,58 @@
+"""
+Renderização JSON das respostas da API.
+
+Usa o orjson quando instalado; sem ele, cai no JSONRenderer padrão do DRF
+com um encoder equivalente. Decimal é sempre emitido como string (mesmo
+formato dos serializers), e UUID/date/datetime são codificados nativamente,
+então relatórios podem devolver os valores sem convertê-los um a um.
+"""
+import datetime
+import decimal
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+
+def _datetime_representation(value):
+    # Mesmo formato do encoder do DRF (UTC como "Z")
+    representation = value.isoformat()
+    if representation.endswith('+00:00'):
+        representation = representation[:-6] + 'Z'
+    return representation
+
+
+class DecimalAsStringEncoder(JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, decimal.Decimal):
+            return str(obj)
+        return super().default(obj)
+
+
+def _orjson_default(obj):
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if isinstance(obj, datetime.datetime):
+        return _datetime_representation(obj)
+    # Promises (textos traduzidos), QuerySets etc.
+    return DecimalAsStringEncoder().default(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+    encoder_class = DecimalAsStringEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        renderer_context = renderer_context or {}
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.get_indent(accepted_media_type, renderer_context):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=_orjson_default, option=option)
@@ -0,0 +1,716 @@
+"""
+Montagem dos relatórios financeiros.
+
+As funções deste módulo recebem apenas parâmetros simples e devolvem
+estruturas serializáveis, para que possam ser reaproveitadas pelas views
+e pelo cache de relatórios (backend.cache).
+"""
+from collections import OrderedDict
+from datetime import date, timedelta
+from decimal import Decimal
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Trunc, TruncMonth
+
+from .models import BillingAccount, Company, Entry, Title
+
+_CENT = Decimal('0.01')
+
+def _money(value):
+    return str((value or Decimal('0')).quantize(_CENT))
+
+
+def dre_queryset(company_id, start, end):
+    """Baixas (Entry) da empresa liquidadas no período (paid_at)."""
+    return (
+        Entry.objects.for_company(company_id)
+        .filter(paid_at__gte=start, paid_at__lte=end)
+    )
+
+# ------------------------------------------------------------
+# Componentes da DRE
+# ------------------------------------------------------------
+# Cada componente faz as próprias consultas e não depende dos demais, então
+# podem ser executados em paralelo (DREReportAsyncView).
+
+def dre_totals(company_id, start, end):
+    """Totais por tipo (income/expense)."""
+    totals_by_type = (
+        dre_queryset(company_id, start, end)
+        .values('title__type_of')
+        .annotate(total=Sum('amount'))
+    )
+    income_total = sum(x['total'] or 0 for x in totals_by_type if x['title__type_of'] == 'income')
+    expense_total = sum(x['total'] or 0 for x in totals_by_type if x['title__type_of'] == 'expense')
+    return income_total, expense_total
+
+def dre_details_by_day(company_id, start, end):
+    """
+    Detalhamento por dia (lista de entradas pagas com contexto)
+    Estrutura: { 'YYYY-MM-DD': [ { paid_at, type, amount, payment_method, account_code, account_name, top_level, title_desc } ] }
+    """
+    details = {}
+    for e in dre_queryset(company_id, start, end).values(
+        'paid_at',
+        'amount',
+        'payment_method',
+        'billing_account__code',
+        'billing_account__name',
+        'title__type_of',
+        'title__description',
+    ).order_by('paid_at'):
+        d = e['paid_at'].strftime('%Y-%m-%d')
+        if d not in details:
+            details[d] = []
+        code = e['billing_account__code'] or ''
+        top_level = code.split('.')[0] if code else ''
+        details[d].append({
+            'paid_at': d,
+            'type': e['title__type_of'],
+            'amount': '{:f}'.format(e['amount']),
+            'payment_method': e['payment_method'],
+            'account_code': code,
+            'account_name': e['billing_account__name'] or '',
+            'top_level': top_level,
+            'title_desc': e['title__description'] or '',
+        })
+    return details
+
+# Estrutura clássica DRE (heurística baseada em nomes/códigos de contas)
+# Identificação simples: variáveis (CMV/CMA, impostos, taxas), fixos (salários, aluguel, energia, internet, manutenção etc),
+# investimentos e amortizações por nomes de conta.
+EXPENSE_CLASS_KEYWORDS = (
+    ('custos_variaveis', [
+        'cmv', 'cma', 'custo de mercadoria', 'custo de matéria', 'simples', 'imposto', 'taxa', 'cartão', 'administracao de cartoes', 'administracao de cartões'
+    ]),
+    ('custos_fixos', [
+        'salário', 'salarios', 'encargo', 'pró-labore', 'pro-labore', 'contador', 'energia', 'água', 'agua', 'aluguel', 'juros', 'manutenção', 'segurança', 'telefone', 'internet', 'vale transporte'
+    ]),
+    ('investimentos', ['investimento', 'imobilizado', 'equipamento', 'veículo', 'veiculo']),
+    ('amortizacoes', ['amortização', 'amortizacao', 'depreciação', 'depreciacao']),
+)
+
+def expense_class(account_name, account_code):
+    """Classe da DRE clássica de uma despesa, pelo nome/código da conta."""
+    name = (account_name or '').lower()
+    code = (account_code or '').lower()
+    for key, keywords in EXPENSE_CLASS_KEYWORDS:
+        if any(k in name for k in keywords) or any(k in code for k in keywords):
+            return key
+    # Default: considera como fixo para não perder controle
+    return 'custos_fixos'
+
+def dre_expense_classes(company_id, start, end):
+    """Despesas do período somadas por classe da DRE clássica (``expense_class``)."""
+    classes = {'custos_variaveis': 0.0, 'custos_fixos': 0.0, 'investimentos': 0.0, 'amortizacoes': 0.0}
+
+    # Percorre entradas de despesas para classificar
+    for e in dre_queryset(company_id, start, end).values('amount', 'billing_account__name', 'billing_account__code', 'title__type_of'):
+        if e['title__type_of'] != 'expense':
+            continue
+        classes[expense_class(e['billing_account__name'], e['billing_account__code'])] += float(e['amount'] or 0)
+    return classes
+
+def dre_by_account(company_id, start, end):
+    """Quebra por conta (usa o primeiro nível do código, se existir)."""
+    breakdown = {}
+    for e in dre_queryset(company_id, start, end).values('billing_account__code', 'billing_account__name', 'title__type_of').annotate(total=Sum('amount')):
+        code = e['billing_account__code'] or 'N/A'
+        top_level = code.split('.')[0] if code else 'N/A'
+        key = f"{top_level}"
+        if key not in breakdown:
+            breakdown[key] = {
+                'code': top_level,
+                'name': e['billing_account__name'] if e['billing_account__name'] else 'Sem conta',
+                'income': '0',
+                'expense': '0',
+                'total': '0',
+            }
+        if e['title__type_of'] == 'income':
+            breakdown[key]['income'] = str((float(breakdown[key]['income']) if breakdown[key]['income'] else 0) + float(e['total'] or 0))
+        else:
+            breakdown[key]['expense'] = str((float(breakdown[key]['expense']) if breakdown[key]['expense'] else 0) + float(e['total'] or 0))
+        breakdown[key]['total'] = str(float(breakdown[key]['income']) - float(breakdown[key]['expense']))
+    return list(breakdown.values())
+
+def dre_monthly(company_id, start, end):
+    """Quebra por mês."""
+    monthly = (
+        dre_queryset(company_id, start, end)
+        .annotate(month=TruncMonth('paid_at'))
+        .values('month', 'title__type_of')
+        .annotate(total=Sum('amount'))
+        .order_by('month')
+    )
+    # Agrega em linhas mês a mês
+    agg = OrderedDict()
+    for row in monthly:
+        m = row['month'].strftime('%Y-%m') if row['month'] else 'unknown'
+        if m not in agg:
+            agg[m] = {'month': m, 'revenues': 0.0, 'expenses': 0.0, 'result': 0.0}
+        if row['title__type_of'] == 'income':
+            agg[m]['revenues'] += float(row['total'] or 0)
+        else:
+            agg[m]['expenses'] += float(row['total'] or 0)
+        agg[m]['result'] = agg[m]['revenues'] - agg[m]['expenses']
+    return [
+        {
+            'month': v['month'],
+            'revenues': str(v['revenues']),
+            'expenses': str(v['expenses']),
+            'result': str(v['result']),
+        }
+        for v in agg.values()
+    ]
+
+def dre_components(group=None):
+    """Componentes (nome, função) necessários para a DRE com o agrupamento pedido."""
+    components = [
+        ('totals', dre_totals),
+        ('details_by_day', dre_details_by_day),
+        ('expense_classes', dre_expense_classes),
+    ]
+    if group == 'account':
+        components.append(('by_account', dre_by_account))
+    if group == 'month':
+        components.append(('monthly', dre_monthly))
+    return components
+
+def assemble_dre(company_id, start, end, parts):
+    """Monta a resposta da DRE a partir dos resultados de ``dre_components``."""
+    income_total, expense_total = parts['totals']
+    result_total = (income_total or 0) - (expense_total or 0)
+
+    result = {
+        'company': str(company_id),
+        'start': start,
+        'end': end,
+        'totals': {
+            'revenues': str(income_total),
+            'expenses': str(expense_total),
+            'result': str(result_total),
+        },
+        'details_by_day': parts['details_by_day'],
+    }
+
+    classes = parts['expense_classes']
+    receita_total = float(income_total or 0)
+    margem_contribuicao = receita_total - classes['custos_variaveis']
+    resultado_operacional = margem_contribuicao - classes['custos_fixos']
+    resultado_final = resultado_operacional - classes['investimentos'] - classes['amortizacoes']
+
+    result['classic'] = {
+        'receita_total': str(receita_total),
+        'custos_variaveis': str(classes['custos_variaveis']),
+        'margem_contribuicao': str(margem_contribuicao),
+        'custos_fixos': str(classes['custos_fixos']),
+        'resultado_operacional_liquido': str(resultado_operacional),
+        'investimentos': str(classes['investimentos']),
+        'amortizacoes': str(classes['amortizacoes']),
+        'resultado_final': str(resultado_final),
+    }
+
+    if 'by_account' in parts:
+        result['by_account'] = parts['by_account']
+    if 'monthly' in parts:
+        result['monthly'] = parts['monthly']
+    return result
+
+def build_dre(company_id, start, end, group=None):
+    """
+    Demonstração do Resultado do Exercício (DRE) de uma empresa no período.
+
+    Base: entradas (Entry) liquidadas no período (paid_at), classificadas por Title.type_of (income/expense).
+    """
+    parts = {name: fn(company_id, start, end) for name, fn in dre_components(group)}
+    return assemble_dre(company_id, start, end, parts)
+
+async def abuild_dre(company_id, start, end, group=None):
+    """
+    Versão assíncrona de ``build_dre``: os componentes rodam ao mesmo tempo,
+    cada um em uma thread com a própria conexão.
+    """
+    components = dre_components(group)
+    results = await asyncio.gather(*(
+        sync_to_async(_run_closing_connection, thread_sensitive=False)(fn, company_id, start, end)
+        for _, fn in components
+    ))
+    parts = {name: value for (name, _), value in zip(components, results)}
+    return assemble_dre(company_id, start, end, parts)
+
+def _run_closing_connection(fn, *args):
+    try:
+        return fn(*args)
+    finally:
+        # Threads do executor não recebem request_finished: respeita CONN_MAX_AGE aqui
+        close_old_connections()
+
+# ------------------------------------------------------------
+# DRE comparativa
+# ------------------------------------------------------------
+# Vários períodos numa única consulta: uma soma condicional (SUM ... FILTER)
+# por período, agrupada por tipo e conta para permitir a DRE clássica.
+
+def shift_period(start, end, kind):
+    """
+    Período de comparação: ``previous`` (imediatamente anterior, em meses
+    inteiros quando o período os cobre) ou ``last_year`` (mesmas datas, um ano antes).
+    """
+    if kind == 'last_year':
+        return _years_before(start, 1), _years_before(end, 1)
+    if kind != 'previous':
+        raise ValueError(kind)
+    if start.day == 1 and (end + timedelta(days=1)).day == 1:
+        months = (end.year - start.year) * 12 + end.month - start.month + 1
+        new_start = _months_before(start, months)
+        return new_start, start - timedelta(days=1)
+    length = end - start + timedelta(days=1)
+    return start - length, start - timedelta(days=1)
+
+def _months_before(day, months):
+    index = day.year * 12 + day.month - 1 - months
+    return date(index // 12, index % 12 + 1, 1)
+
+def _years_before(day, years):
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:  # 29/02
+        return day.replace(year=day.year - years, day=28)
+
+def dre_comparison_rows(company_id, periods):
+    """Somas por tipo e conta, uma coluna ``p<i>`` por período (label, start, end)."""
+    in_any = Q()
+    sums = {}
+    for i, (_, start, end) in enumerate(periods):
+        in_period = Q(paid_at__gte=start, paid_at__lte=end)
+        in_any |= in_period
+        sums[f'p{i}'] = Sum('amount', filter=in_period)
+    return (
+        Entry.objects.for_company(company_id)
+        .filter(in_any)
+        .values('title__type_of', 'billing_account__code', 'billing_account__name')
+        .annotate(**sums)
+        .order_by()
+    )
+
+def _variation(current, other):
+    delta = current - other
+    return {
+        'delta': _money(delta),
+        'percent': str((delta * 100 / other).quantize(_CENT)) if other else None,
+    }
+
+def build_dre_comparison(company_id, periods):
+    """
+    DRE de vários períodos lado a lado; o primeiro é a base da comparação.
+
+    ``periods`` é uma lista de (label, start, end). Cada período traz totais e a
+    DRE clássica; ``comparisons`` traz, para cada outro período, a variação
+    absoluta e percentual da base em relação a ele.
+    """
+    zero = Decimal('0')
+    figures = [
+        {'revenues': zero, 'expenses': zero,
+         'classes': {key: zero for key, _ in EXPENSE_CLASS_KEYWORDS}}
+        for _ in periods
+    ]
+    for row in dre_comparison_rows(company_id, periods):
+        expense_key = None
+        if row['title__type_of'] == 'expense':
+            expense_key = expense_class(row['billing_account__name'], row['billing_account__code'])
+        for i, figure in enumerate(figures):
+            amount = row[f'p{i}'] or zero
+            if expense_key:
+                figure['expenses'] += amount
+                figure['classes'][expense_key] += amount
+            elif row['title__type_of'] == 'income':
+                figure['revenues'] += amount
+
+    metrics = []
+    for figure in figures:
+        classes = figure['classes']
+        contribution = figure['revenues'] - classes['custos_variaveis']
+        operating = contribution - classes['custos_fixos']
+        metrics.append({
+            'revenues': figure['revenues'],
+            'expenses': figure['expenses'],
+            'result': figure['revenues'] - figure['expenses'],
+            'custos_variaveis': classes['custos_variaveis'],
+            'margem_contribuicao': contribution,
+            'custos_fixos': classes['custos_fixos'],
+            'resultado_operacional_liquido': operating,
+            'investimentos': classes['investimentos'],
+            'amortizacoes': classes['amortizacoes'],
+            'resultado_final': operating - classes['investimentos'] - classes['amortizacoes'],
+        })
+
+    base_label = periods[0][0]
+    return {
+        'company': str(company_id),
+        'periods': [
+            {
+                'label': label, 'start': start.isoformat(), 'end': end.isoformat(),
+                'values': {name: _money(value) for name, value in values.items()},
+            }
+            for (label, start, end), values in zip(periods, metrics)
+        ],
+        'comparisons': [
+            {
+                'base': base_label,
+                'against': label,
+                'values': {name: _variation(metrics[0][name], value) for name, value in values.items()},
+            }
+            for (label, _, _), values in zip(periods[1:], metrics[1:])
+        ],
+    }
+
+# ------------------------------------------------------------
+# DFC — Demonstração dos Fluxos de Caixa (método direto)
+# ------------------------------------------------------------
+# Baixas de títulos de receita são entradas e de despesa, saídas. Tudo vem de
+# um único GROUP BY (período, tipo, forma de pagamento, conta) sobre Entry:
+# o Python só dobra as linhas agregadas, nunca as baixas.
+
+CASH_FLOW_GRANULARITIES = ('month', 'quarter', 'year')
+
+def _period_start(day, granularity):
+    if granularity == 'year':
+        return date(day.year, 1, 1)
+    if granularity == 'quarter':
+        return date(day.year, 3 * ((day.month - 1) // 3) + 1, 1)
+    return date(day.year, day.month, 1)
+
+def _next_period(day, granularity):
+    """Início do período seguinte; None depois do último ano representável (9999)."""
+    months = {'month': 1, 'quarter': 3, 'year': 12}[granularity]
+    index = day.year * 12 + day.month - 1 + months
+    if index // 12 > date.max.year:
+        return None
+    return date(index // 12, index % 12 + 1, 1)
+
+def _period_label(day, granularity):
+    if granularity == 'year':
+        return f'{day.year}'
+    if granularity == 'quarter':
+        return f'{day.year}-Q{(day.month - 1) // 3 + 1}'
+    return day.strftime('%Y-%m')
+
+def cash_flow_rows(company_id, start, end, granularity='month'):
+    """Somas das baixas por período, tipo, forma de pagamento e conta."""
+    return (
+        Entry.objects.for_company(company_id)
+        .filter(paid_at__gte=start, paid_at__lte=end)
+        .annotate(period=Trunc('paid_at', granularity))
+        .values('period', 'title__type_of', 'payment_method',
+                'billing_account__billing_plan_id', 'billing_account__code')
+        .annotate(total=Sum('amount'))
+        .order_by()
+    )
+
+def cash_flow_opening_balance(company_id, start):
+    """Saldo de caixa acumulado antes de ``start`` (entradas - saídas)."""
+    totals = Entry.objects.for_company(company_id).filter(paid_at__lt=start).aggregate(
+        inflows=Sum('amount', filter=Q(title__type_of='income')),
+        outflows=Sum('amount', filter=Q(title__type_of='expense')),
+    )
+    return (totals['inflows'] or Decimal('0')) - (totals['outflows'] or Decimal('0'))
+
+def _account_group_names(keys):
+    """Nome da conta de primeiro nível de cada (plano, código)."""
+    plans = {plan for plan, _ in keys}
+    codes = {code for _, code in keys}
+    return {
+        (a['billing_plan_id'], a['code']): a['name']
+        for a in BillingAccount.objects.filter(
+            billing_plan_id__in=plans, parent__isnull=True, code__in=codes
+        ).values('billing_plan_id', 'code', 'name')
+    }
+
+def build_cash_flow(company_id, start, end, granularity='month', cumulative=False):
+    """
+    DFC (método direto) da empresa entre ``start`` e ``end`` (date).
+
+    Cada período traz entradas, saídas e saldo líquido, com quebra por forma de
+    pagamento e por conta de primeiro nível; períodos sem baixas aparecem zerados.
+    Com ``cumulative``, inclui o saldo inicial e o saldo acumulado ao fim de cada período.
+    """
+    periods = OrderedDict()
+    current = _period_start(start, granularity)
+    while current is not None and current <= end:
+        periods[current] = {'inflows': Decimal('0'), 'outflows': Decimal('0'), 'methods': {}, 'groups': {}}
+        current = _next_period(current, granularity)
+
+    for row in cash_flow_rows(company_id, start, end, granularity):
+        period = periods[_period_start(row['period'], granularity)]
+        side = 'inflows' if row['title__type_of'] == 'income' else 'outflows'
+        amount = row['total'] or Decimal('0')
+        period[side] += amount
+
+        method = period['methods'].setdefault(row['payment_method'], {'inflows': Decimal('0'), 'outflows': Decimal('0')})
+        method[side] += amount
+
+        code = row['billing_account__code'] or ''
+        key = (row['billing_account__billing_plan_id'], code.split('.')[0])
+        group = period['groups'].setdefault(key, {'inflows': Decimal('0'), 'outflows': Decimal('0')})
+        group[side] += amount
+
+    names = _account_group_names({key for p in periods.values() for key in p['groups']})
+
+    balance = cash_flow_opening_balance(company_id, start) if cumulative else None
+    total_in = total_out = Decimal('0')
+    rows = []
+    for day, period in periods.items():
+        net = period['inflows'] - period['outflows']
+        total_in += period['inflows']
+        total_out += period['outflows']
+        row = {
+            'period': _period_label(day, granularity),
+            'inflows': _money(period['inflows']),
+            'outflows': _money(period['outflows']),
+            'net': _money(net),
+            'by_payment_method': {
+                method: {'inflows': _money(v['inflows']), 'outflows': _money(v['outflows'])}
+                for method, v in sorted(period['methods'].items())
+            },
+            'by_account_group': [
+                {
+                    'code': code,
+                    'name': names.get((plan, code), ''),
+                    'inflows': _money(v['inflows']),
+                    'outflows': _money(v['outflows']),
+                }
+                for (plan, code), v in sorted(period['groups'].items(), key=lambda item: (item[0][1], str(item[0][0])))
+            ],
+        }
+        if cumulative:
+            balance += net
+            row['closing_balance'] = _money(balance)
+        rows.append(row)
+
+    result = {
+        'company': str(company_id),
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'granularity': granularity,
+        'totals': {
+            'inflows': _money(total_in),
+            'outflows': _money(total_out),
+            'net': _money(total_in - total_out),
+        },
+        'periods': rows,
+    }
+    if cumulative:
+        result['opening_balance'] = _money(balance - (total_in - total_out))
+        result['closing_balance'] = _money(balance)
+    return result
+
+# ------------------------------------------------------------
+# Dashboard
+# ------------------------------------------------------------
+# Números da tela inicial numa resposta só: empresa, títulos em aberto e
+# vencidos, receitas/despesas do mês, tendência de 12 meses e principais contas.
+
+DASHBOARD_TOP_ACCOUNTS = 5
+
+def dashboard_open_titles(company_id, today):
+    """Em aberto e vencido (valor - baixado) por tipo, dos títulos ativos."""
+    totals = {
+        row['type_of']: row
+        for row in Title.objects.for_company(company_id).filter(active=True)
+        .values('type_of').order_by()
+        .annotate(
+            total=Sum('amount'),
+            overdue_total=Sum('amount', filter=Q(expiration_date__lt=today)),
+            count=Count('pk'),
+            overdue_count=Count('pk', filter=Q(expiration_date__lt=today)),
+        )
+    }
+    paid = {
+        row['title__type_of']: row
+        for row in Entry.objects.for_company(company_id).filter(title__active=True)
+        .values('title__type_of').order_by()
+        .annotate(
+            total=Sum('amount'),
+            overdue_total=Sum('amount', filter=Q(title__expiration_date__lt=today)),
+        )
+    }
+    zero = Decimal('0')
+    result = {}
+    for type_of, name in (('income', 'receivables'), ('expense', 'payables')):
+        titles = totals.get(type_of, {})
+        settled = paid.get(type_of, {})
+        result[name] = {
+            'open': _money((titles.get('total') or zero) - (settled.get('total') or zero)),
+            'open_count': titles.get('count', 0),
+            'overdue': _money((titles.get('overdue_total') or zero) - (settled.get('overdue_total') or zero)),
+            'overdue_count': titles.get('overdue_count', 0),
+        }
+    return result
+
+def dashboard_trend(company_id, first_month, today):
+    """Receitas e despesas liquidadas por mês, de ``first_month`` até ``today``."""
+    months = OrderedDict()
+    current = first_month
+    while current is not None and current <= today:
+        months[current] = {'revenues': Decimal('0'), 'expenses': Decimal('0')}
+        current = _next_period(current, 'month')
+
+    for row in (
+        Entry.objects.for_company(company_id)
+        .filter(paid_at__gte=first_month, paid_at__lte=today)
+        .annotate(month=TruncMonth('paid_at'))
+        .values('month', 'title__type_of').order_by()
+        .annotate(total=Sum('amount'))
+    ):
+        side = 'revenues' if row['title__type_of'] == 'income' else 'expenses'
+        months[_period_start(row['month'], 'month')][side] += row['total'] or Decimal('0')
+
+    return [
+        {
+            'month': day.strftime('%Y-%m'),
+            'revenues': _money(v['revenues']),
+            'expenses': _money(v['expenses']),
+            'result': _money(v['revenues'] - v['expenses']),
+        }
+        for day, v in months.items()
+    ]
+
+def dashboard_top_accounts(company_id, first_month, today, limit=DASHBOARD_TOP_ACCOUNTS):
+    """Contas com maior movimento liquidado no período, por tipo."""
+    rows = sorted(
+        Entry.objects.for_company(company_id)
+        .filter(paid_at__gte=first_month, paid_at__lte=today)
+        .values('title__type_of', 'billing_account_id', 'billing_account__code', 'billing_account__name')
+        .order_by()
+        .annotate(total=Sum('amount')),
+        key=lambda row: row['total'] or Decimal('0'),
+        reverse=True,
+    )
+    top = {'revenues': [], 'expenses': []}
+    for row in rows:
+        bucket = top['revenues' if row['title__type_of'] == 'income' else 'expenses']
+        if len(bucket) < limit:
+            bucket.append({
+                'account': str(row['billing_account_id']),
+                'code': row['billing_account__code'],
+                'name': row['billing_account__name'],
+                'total': _money(row['total']),
+            })
+    return top
+
+def build_dashboard(company_id, today):
+    """
+    Resumo da tela inicial da empresa em ``today`` (date); ``None`` se a empresa
+    não existir. A tendência e as principais contas cobrem os últimos 12 meses.
+    """
+    company = Company.objects.filter(pk=company_id).values('uuid', 'fantasy_name', 'cnpj').first()
+    if company is None:
+        return None
+
+    first_month = _months_before(today.replace(day=1), 11)
+    trend = dashboard_trend(company_id, first_month, today)
+    return {
+        'company': {'uuid': str(company['uuid']), 'fantasy_name': company['fantasy_name'], 'cnpj': company['cnpj']},
+        'date': today.isoformat(),
+        **dashboard_open_titles(company_id, today),
+        'current_month': trend[-1],
+        'trend': trend,
+        'top_accounts': dashboard_top_accounts(company_id, first_month, today),
+    }
+
+# ------------------------------------------------------------
+# Séries temporais
+# ------------------------------------------------------------
+# Receita, despesa e saldo por intervalo, agrupados no banco (Trunc). Com
+# ``max_points``, o intervalo sobe de granularidade (dia → semana → mês →
+# trimestre → ano) até caber; se ainda sobrar, intervalos vizinhos são somados.
+
+TIME_SERIES_BUCKETS = ('day', 'week', 'month', 'quarter', 'year')
+# Teto de pontos quando ``max_points`` não é informado
+TIME_SERIES_MAX_POINTS = 5000
+
+def _bucket_start(day, bucket):
+    if bucket == 'day':
+        return day
+    if bucket == 'week':
+        return day - timedelta(days=day.weekday())
+    return _period_start(day, bucket)
+
+def _bucket_next(day, bucket):
+    """Início do intervalo seguinte; None depois de 9999-12-31."""
+    if bucket in ('day', 'week'):
+        step = timedelta(days=1 if bucket == 'day' else 7)
+        return day + step if date.max - day >= step else None
+    return _next_period(day, bucket)
+
+def _bucket_count(start, end, bucket):
+    if bucket == 'day':
+        return (end - start).days + 1
+    if bucket == 'week':
+        return (_bucket_start(end, 'week') - _bucket_start(start, 'week')).days // 7 + 1
+    months = {'month': 1, 'quarter': 3, 'year': 12}[bucket]
+    first, last = _period_start(start, bucket), _period_start(end, bucket)
+    return ((last.year - first.year) * 12 + last.month - first.month) // months + 1
+
+def time_series_rows(company_id, start, end, bucket):
+    """Somas das baixas por intervalo e tipo (income/expense)."""
+    period = F('paid_at') if bucket == 'day' else Trunc('paid_at', bucket)
+    return (
+        Entry.objects.for_company(company_id)
+        .filter(paid_at__gte=start, paid_at__lte=end)
+        .annotate(bucket=period)
+        .values('bucket', 'title__type_of')
+        .annotate(total=Sum('amount'))
+        .order_by()
+    )
+
+def build_time_series(company_id, start, end, bucket='day', max_points=None):
+    """
+    Séries de receita, despesa e saldo da empresa entre ``start`` e ``end``.
+
+    Retorna listas paralelas (``labels`` com o início de cada intervalo); intervalos
+    sem baixas valem zero. ``bucket`` é a granularidade mínima pedida; a usada de
+    fato vem em ``bucket`` e o nº de intervalos somados por ponto em ``merged``.
+    Sem ``max_points``, vale ``TIME_SERIES_MAX_POINTS``.
+    """
+    max_points = max_points or TIME_SERIES_MAX_POINTS
+    effective = bucket
+    for candidate in TIME_SERIES_BUCKETS[TIME_SERIES_BUCKETS.index(bucket):]:
+        effective = candidate
+        if _bucket_count(start, end, candidate) <= max_points:
+            break
+
+    buckets = OrderedDict()
+    current = _bucket_start(start, effective)
+    while current is not None and current <= end:
+        buckets[current] = [Decimal('0'), Decimal('0')]
+        current = _bucket_next(current, effective)
+
+    for row in time_series_rows(company_id, start, end, effective):
+        values = buckets[_bucket_start(row['bucket'], effective)]
+        values[0 if row['title__type_of'] == 'income' else 1] += row['total'] or Decimal('0')
+
+    points = list(buckets.items())
+    merged = 1
+    if len(points) > max_points:
+        merged = -(-len(points) // max_points)
+        points = [
+            (chunk[0][0], [sum(v[0] for _, v in chunk), sum(v[1] for _, v in chunk)])
+            for chunk in (points[i:i + merged] for i in range(0, len(points), merged))
+        ]
+
+    return {
+        'company': str(company_id),
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'requested_bucket': bucket,
+        'bucket': effective,
+        'merged': merged,
+        'labels': [day.isoformat() for day, _ in points],
+        'revenue': [_money(v[0]) for _, v in points],
+        'expense': [_money(v[1]) for _, v in points],
+        'net': [_money(v[0] - v[1]) for _, v in points],
+    }
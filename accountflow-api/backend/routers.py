@@ -0,0 +1,44 @@
+"""
+Roteamento de leituras para o banco de leitura (réplica).
+
+O ReadReplicaMiddleware ativa o alias de leitura (settings.DATABASE_READ_ALIAS)
+apenas em GET/HEAD de views marcadas com ``read_replica = True``. Fora disso,
+e depois de qualquer escrita na mesma requisição (read-your-writes), todas as
+leituras voltam ao banco principal. Escritas sempre vão para o principal.
+"""
+from contextvars import ContextVar
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_read_alias = ContextVar('read_alias', default=None)
+
+def activate_read_alias(alias):
+    _read_alias.set(alias)
+
+def deactivate_read_alias():
+    # Threads WSGI reaproveitam o contexto entre requisições: sempre limpar
+    _read_alias.set(None)
+
+def current_read_alias():
+    alias = _read_alias.get()
+    # Dentro de uma transação a leitura precisa enxergar o que a transação já gravou
+    if not alias or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return DEFAULT_DB_ALIAS
+    return alias
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return current_read_alias()
+
+    def db_for_write(self, model, **hints):
+        # Após uma escrita, o restante da requisição lê do principal
+        if _read_alias.get():
+            _read_alias.set(None)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # A réplica recebe o schema por replicação, nunca por migrate
+        return db == DEFAULT_DB_ALIAS
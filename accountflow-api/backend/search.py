@@ -0,0 +1,205 @@
+"""
+Busca textual unificada sobre títulos, empresas e contas.
+
+Cada objeto tem um SearchDocument com o texto já normalizado (minúsculo e sem
+acentos), mantido pelos signals e por ``rebuild_search_index``. O índice depende
+do banco (migration 0022):
+
+- SQLite: tabela FTS5 ``backend_searchdocument_fts`` com conteúdo externo,
+  sincronizada por triggers; busca por prefixo de cada termo, ordenada por bm25.
+- PostgreSQL: índice GIN ``gin_trgm_ops`` (pg_trgm) sobre ``content``; cada termo
+  vira um ``LIKE`` atendido pelo índice, ordenado por similaridade.
+
+Em outros bancos a busca cai para ``LIKE`` sem índice.
+"""
+import re
+import unicodedata
+
+from django.db import connections, router, transaction
+from django.db.models.expressions import RawSQL
+
+from .models import BillingAccount, Company, SearchDocument, Title
+
+FTS_TABLE = 'backend_searchdocument_fts'
+
+_TERM = re.compile(r'\w+')
+
+
+def normalize(text):
+    """Minúsculo, sem acentos e com espaços simples."""
+    text = unicodedata.normalize('NFKD', (text or '').lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return ' '.join(text.split())
+
+def terms(query):
+    return _TERM.findall(normalize(query))
+
+# ------------------------------------------------------------
+# Documentos
+# ------------------------------------------------------------
+
+def _digits(value):
+    return re.sub(r'\D', '', value or '')
+
+def title_document(title):
+    return title.company_id, title.description, normalize(title.description)
+
+def company_document(company):
+    text = ' '.join([company.fantasy_name, company.social_reason, company.cnpj, _digits(company.cnpj)])
+    return company.pk, company.fantasy_name, normalize(text)
+
+def account_document(account):
+    return None, f'{account.code} - {account.name}', normalize(f'{account.code} {account.name}')
+
+DOCUMENT_SOURCES = {
+    SearchDocument.Kind.TITLE: (Title, title_document, ('uuid', 'company_id', 'description')),
+    SearchDocument.Kind.COMPANY: (Company, company_document, ('uuid', 'fantasy_name', 'social_reason', 'cnpj')),
+    SearchDocument.Kind.ACCOUNT: (BillingAccount, account_document, ('uuid', 'code', 'name')),
+}
+
+def kind_for(model):
+    for kind, (source, _, _) in DOCUMENT_SOURCES.items():
+        if issubclass(model, source):
+            return kind
+    return None
+
+def index_objects(kind, objects):
+    """Grava (ou atualiza) os documentos dos objetos; retorna quantos."""
+    _, build, _ = DOCUMENT_SOURCES[kind]
+    documents = []
+    for obj in objects:
+        company_id, label, content = build(obj)
+        documents.append(SearchDocument(
+            kind=kind, object_id=str(obj.pk), company_id=company_id, label=label[:255], content=content,
+        ))
+    if documents:
+        SearchDocument.objects.bulk_create(
+            documents, update_conflicts=True, unique_fields=['kind', 'object_id'],
+            update_fields=['company', 'label', 'content', 'updated_at'],
+        )
+    return len(documents)
+
+def remove_objects(kind, pks):
+    return SearchDocument.objects.filter(kind=kind, object_id__in=[str(pk) for pk in pks]).delete()[0]
+
+def rebuild(kinds=None, chunk_size=2000):
+    """Reindexa os tipos pedidos em blocos e remove documentos órfãos; retorna {tipo: total}."""
+    counts = {}
+    for kind in kinds or DOCUMENT_SOURCES:
+        model, _, fields = DOCUMENT_SOURCES[kind]
+        counts[kind] = 0
+        seen = set()
+        chunk = []
+        for obj in model.objects.only(*fields).order_by().iterator(chunk_size=chunk_size):
+            chunk.append(obj)
+            seen.add(str(obj.pk))
+            if len(chunk) >= chunk_size:
+                with transaction.atomic():
+                    counts[kind] += index_objects(kind, chunk)
+                chunk = []
+        with transaction.atomic():
+            counts[kind] += index_objects(kind, chunk)
+            stale = [
+                object_id for object_id in
+                SearchDocument.objects.filter(kind=kind).values_list('object_id', flat=True).iterator()
+                if object_id not in seen
+            ]
+            remove_objects(kind, stale)
+    return counts
+
+# ------------------------------------------------------------
+# Busca
+# ------------------------------------------------------------
+
+def _result(doc, rank):
+    return {
+        'kind': doc.kind,
+        'id': doc.object_id,
+        'label': doc.label,
+        'company': str(doc.company_id) if doc.company_id else None,
+        'rank': rank,
+    }
+
+def _filtered(queryset, company_id, kinds):
+    if company_id:
+        queryset = queryset.filter(company_id=company_id)
+    if kinds:
+        queryset = queryset.filter(kind__in=kinds)
+    return queryset
+
+def _search_sqlite(using, words, company_id, kinds, limit):
+    table = SearchDocument._meta.db_table
+    match = ' '.join(f'"{word}"*' for word in words)
+    where, params = [f'{FTS_TABLE} MATCH %s'], [match]
+    if company_id:
+        # UUID gravado como hex de 32 caracteres no SQLite
+        where.append('d.company_id = %s')
+        params.append(str(company_id).replace('-', ''))
+    if kinds:
+        where.append(f"d.kind IN ({', '.join(['%s'] * len(kinds))})")
+        params.extend(kinds)
+    sql = (
+        f'SELECT d.*, bm25({FTS_TABLE}) AS score FROM {FTS_TABLE} '
+        f'JOIN {table} d ON d.id = {FTS_TABLE}.rowid '
+        f"WHERE {' AND '.join(where)} ORDER BY score LIMIT %s"
+    )
+    return [
+        _result(doc, round(-doc.score, 4))
+        for doc in SearchDocument.objects.using(using).raw(sql, params + [limit])
+    ]
+
+def _search_postgresql(using, words, company_id, kinds, limit):
+    from django.contrib.postgres.search import TrigramWordSimilarity
+
+    queryset = _filtered(SearchDocument.objects.using(using), company_id, kinds)
+    for word in words:
+        queryset = queryset.filter(content__contains=word)
+    queryset = queryset.annotate(score=TrigramWordSimilarity(' '.join(words), 'content'))
+    return [_result(doc, round(doc.score, 4)) for doc in queryset.order_by('-score', 'label')[:limit]]
+
+def _search_fallback(using, words, company_id, kinds, limit):
+    queryset = _filtered(SearchDocument.objects.using(using), company_id, kinds)
+    for word in words:
+        queryset = queryset.filter(content__contains=word)
+    return [_result(doc, 0) for doc in queryset.order_by('label')[:limit]]
+
+def search(query, company_id=None, kinds=None, limit=20, using=None):
+    """
+    Documentos que contêm todos os termos de ``query`` (por prefixo no SQLite),
+    do mais ao menos relevante. ``kinds`` restringe a title/company/account.
+    """
+    words = terms(query)
+    if not words:
+        return []
+    using = using or router.db_for_read(SearchDocument)
+    vendor = connections[using].vendor
+    if vendor == 'sqlite':
+        return _search_sqlite(using, words, company_id, kinds, limit)
+    if vendor == 'postgresql':
+        return _search_postgresql(using, words, company_id, kinds, limit)
+    return _search_fallback(using, words, company_id, kinds, limit)
+
+def matching_documents(query, kinds=None, using=None):
+    """Documentos que contêm todos os termos de ``query``, sem ordem nem limite."""
+    using = using or router.db_for_read(SearchDocument)
+    queryset = _filtered(SearchDocument.objects.using(using), None, kinds)
+    words = terms(query)
+    if not words:
+        return queryset.none()
+    if connections[using].vendor == 'sqlite':
+        match = ' '.join(f'"{word}"*' for word in words)
+        return queryset.filter(id__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match]))
+    for word in words:
+        queryset = queryset.filter(content__contains=word)
+    return queryset
+
+def search_ids(kind, query, using=None):
+    """
+    Subconsulta com as chaves primárias do ``kind`` que casam com ``query``, para
+    ``pk__in`` no admin (sem limite, numa única consulta).
+    """
+    from .journal import ReferenceAsUUID
+
+    return matching_documents(query, [kind], using).annotate(
+        object_pk=ReferenceAsUUID('object_id')
+    ).values('object_pk')
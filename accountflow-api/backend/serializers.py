@@ -1,5 +1,10 @@
+import datetime
+import uuid
+
 from rest_framework import serializers
-from django.db.models import Sum
+from django.core.files.storage import default_storage
+from django.db.models import Case, Value, When
+from django.utils import timezone
 from decimal import Decimal
 from .models import (
     Address,
@@ -10,16 +15,29 @@ from .models import (
     Title,
     Entry
 )
+from .validation import PRESET_ACCOUNTS, PRESET_GRAPH, TITLE_GRAPH, paid_total, title_payments
 
 class AddressSerializer(serializers.ModelSerializer):
     class Meta:
         model = Address
-        fields = '__all__'
+        exclude = ['normalized_key']
 
 class CompanySerializer(serializers.ModelSerializer):
     class Meta:
         model = Company
-        fields = '__all__'
+        exclude = ['cnpj_key']
+
+    def validate_cnpj(self, value):
+        if self.instance is not None and value == self.instance.cnpj:
+            # CNPJ inalterado (inclui duplicatas antigas sem cnpj_key)
+            return value
+        # Mesmo CNPJ com outra pontuação também é duplicata
+        others = Company.objects.filter(cnpj_key=Company.normalize_cnpj(value))
+        if self.instance is not None:
+            others = others.exclude(pk=self.instance.pk)
+        if others.exists():
+            raise serializers.ValidationError("Já existe uma empresa com este CNPJ.")
+        return value
 
 class BillingPlanSerializer(serializers.ModelSerializer):
     class Meta:
@@ -36,8 +54,25 @@ class BillingAccountSerializer(serializers.ModelSerializer):
                 'is_active', 'parent', 'parent_name', 'billing_plan', 'billing_plan_name', 'level']
         read_only_fields = ['code', ]
 
-class PresetSerializer(serializers.ModelSerializer):
+class RelatedQuerysetMixin:
+    """
+    Troca o queryset dos campos de FK gerados pelo ModelSerializer (mantendo a
+    ordem dos campos), para carregar o grafo usado pelas validações de uma vez.
+    """
+    related_querysets = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        for name, queryset in self.related_querysets.items():
+            fields[name].queryset = queryset
+        return fields
+
+class PresetSerializer(RelatedQuerysetMixin, serializers.ModelSerializer):
     billing_plan = serializers.SerializerMethodField()
+    # Contas já com o plano, usado na validação e em get_billing_plan
+    related_querysets = {
+        account: BillingAccount.objects.select_related('billing_plan') for account in PRESET_ACCOUNTS
+    }
 
     class Meta:
         model = Preset
@@ -92,7 +127,10 @@ class PresetSerializer(serializers.ModelSerializer):
 
         return None
 
-class TitleSerializer(serializers.ModelSerializer):
+class TitleSerializer(RelatedQuerysetMixin, serializers.ModelSerializer):
+    # Contas e planos do preset numa consulta, reaproveitados pelo Title.clean
+    related_querysets = {'preset': Preset.objects.select_related(*PRESET_GRAPH)}
+
     class Meta:
         model = Title
         fields = '__all__'
@@ -127,12 +165,12 @@ class TitleSerializer(serializers.ModelSerializer):
             amount_changed = (new_amount != self.instance.amount)
             
             if amount_changed:
-                if self.instance.entries.exists():
+                count, total_paid = title_payments(self.instance.pk)
+                if count:
                     raise serializers.ValidationError({
                         'amount': 'Não é permitido alterar o valor de um título que já possui baixas.'
                     })
                 
-                total_paid = self.instance.entries.aggregate(total=Sum('amount'))['total'] or Decimal('0')
                 if total_paid > new_amount:
                     raise serializers.ValidationError({
                         'amount': f'Valor do título não pode ser menor que o total já baixado (R$ {total_paid}).'
@@ -140,7 +178,13 @@ class TitleSerializer(serializers.ModelSerializer):
         
         return data
 
-class EntrySerializer(serializers.ModelSerializer):
+class EntrySerializer(RelatedQuerysetMixin, serializers.ModelSerializer):
+    # Título com preset, contas e planos numa consulta, reaproveitados pelo Entry.clean
+    related_querysets = {
+        'title': Title.objects.select_related(*TITLE_GRAPH),
+        'billing_account': BillingAccount.objects.select_related('billing_plan'),
+    }
+
     class Meta:
         model = Entry
         fields = '__all__'
@@ -189,11 +233,7 @@ class EntrySerializer(serializers.ModelSerializer):
         if title is None or amount is None:
             return data
 
-        qs = Entry.objects.filter(title=title)
-        if self.instance:
-            qs = qs.exclude(pk=self.instance.pk)
-
-        total_paid = qs.aggregate(total=Sum('amount'))['total'] or Decimal('0')
+        total_paid = paid_total(title.pk, self.instance.pk if self.instance else None)
         projected_total = total_paid + amount
 
         if projected_total > title.amount:
@@ -202,4 +242,123 @@ class EntrySerializer(serializers.ModelSerializer):
                 'amount': f'Pagamento excede o valor do título. Restante: R$ {remaining}'
             })
 
-        return data
\ No newline at end of file
+        return data
+
+
+# ------------------------------------------------------------
+# Serializadores de leitura (listagens e exportações)
+# ------------------------------------------------------------
+
+def to_primitive(value):
+    if value is None or isinstance(value, (str, bool, int)):
+        return value
+    if isinstance(value, Decimal):
+        return '{:f}'.format(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, datetime.datetime):
+        # Mesmo formato do DateTimeField do DRF
+        value = timezone.localtime(value) if timezone.is_aware(value) else value
+        value = value.isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return value
+
+class ValuesReadSerializer:
+    """
+    Serializador somente leitura sobre ``QuerySet.values()``.
+
+    Produz a mesma representação dos ModelSerializers acima, mas sem instanciar
+    modelos nem campos do DRF. Aceita um subconjunto de campos (``?fields=a,b``);
+    nomes desconhecidos são ignorados.
+    """
+    fields = ()
+    # Campo exposto -> lookup do values() quando os nomes diferem
+    sources = {}
+    # Campo calculado -> lookups necessários; o valor vem de get_<campo>(row)
+    computed = {}
+    # Campo calculado no banco -> expressão passada ao values()
+    annotations = {}
+
+    def __init__(self, fields=None):
+        requested = [f.strip() for f in fields.split(',')] if fields else []
+        self.selected = [f for f in requested if f in self.fields] or list(self.fields)
+
+    def lookups(self):
+        lookups = []
+        for name in self.selected:
+            if name in self.computed:
+                lookups.extend(self.computed[name])
+            elif name not in self.annotations:
+                lookups.append(self.sources.get(name, name))
+        return list(dict.fromkeys(lookups))
+
+    def values(self, queryset):
+        annotations = {name: self.annotations[name] for name in self.selected if name in self.annotations}
+        return queryset.values(*self.lookups(), **annotations)
+
+    def to_representation(self, row):
+        data = {}
+        for name in self.selected:
+            if name in self.computed:
+                data[name] = getattr(self, f'get_{name}')(row)
+            else:
+                data[name] = to_primitive(row[self.sources.get(name, name)])
+        return data
+
+    def serialize(self, rows):
+        return [self.to_representation(row) for row in rows]
+
+class CompanyReadSerializer(ValuesReadSerializer):
+    fields = (
+        'uuid', 'created_at', 'updated_at', 'cnpj', 'fantasy_name', 'social_reason',
+        'opening_date', 'logo', 'cnae', 'type_of', 'email', 'phone', 'tax_regime', 'address',
+    )
+    computed = {'logo': ['logo']}
+
+    def get_logo(self, row):
+        return default_storage.url(row['logo']) if row['logo'] else None
+
+class BillingAccountReadSerializer(ValuesReadSerializer):
+    fields = (
+        'uuid', 'name', 'code', 'account_type', 'is_active', 'parent', 'parent_name',
+        'billing_plan', 'billing_plan_name', 'level',
+    )
+    sources = {'parent_name': 'parent__name', 'billing_plan_name': 'billing_plan__name'}
+    # Mesmo cálculo de BillingAccount.level: profundidade pela cadeia de pais
+    annotations = {
+        'level': Case(
+            *[
+                When(**{'__'.join(['parent'] * depth) + '__isnull': False}, then=Value(depth + 1))
+                for depth in range(BillingAccount.MAX_LEVEL - 1, 0, -1)
+            ],
+            default=Value(1),
+        ),
+    }
+
+class PresetReadSerializer(ValuesReadSerializer):
+    fields = (
+        'uuid', 'name', 'description', 'active',
+        'payable_account', 'receivable_account', 'revenue_account', 'expense_account',
+        'payable_account_name', 'receivable_account_name', 'revenue_account_name', 'expense_account_name',
+        'billing_plan',
+    )
+    computed = {'billing_plan': ['payable_account__billing_plan', 'receivable_account__billing_plan']}
+
+    def get_billing_plan(self, row):
+        plan = row['payable_account__billing_plan'] or row['receivable_account__billing_plan']
+        return str(plan) if plan else None
+
+class TitleReadSerializer(ValuesReadSerializer):
+    fields = (
+        'uuid', 'created_at', 'updated_at', 'description', 'amount', 'active', 'recorrence',
+        'expiration_date', 'recorrence_period', 'installments', 'fees_percentage_monthly',
+        'type_of', 'company', 'preset',
+    )
+
+class EntryReadSerializer(ValuesReadSerializer):
+    fields = (
+        'uuid', 'created_at', 'updated_at', 'description', 'amount', 'paid_at',
+        'payment_method', 'title', 'billing_account', 'company',
+    )
@@ -1,6 +1,5 @@
-from decimal import Decimal, ROUND_HALF_UP
 from django.db import transaction
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import m2m_changed, post_save, post_delete
 from django.dispatch import receiver
 from django.apps import apps
 import logging
@@ -8,324 +7,142 @@ import logging
 logger = logging.getLogger(__name__)
 
 # ------------------------------------------------------------
-# Utilidades
-# ------------------------------------------------------------
-
-def _dec(value):
-    return Decimal(str(value)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-
-def _plan_from_preset(preset):
-    if not preset:
-        return None
-    pa = getattr(preset, 'payable_account', None)
-    ra = getattr(preset, 'receivable_account', None)
-    return pa.billing_plan if pa else (ra.billing_plan if ra else None)
-
-# ------------------------------------------------------------
-# Criação de lançamentos contábeis
-# ------------------------------------------------------------
-
-def _create_journal(reference_type, reference_id, company, date, description, lines):
-    JournalEntry = apps.get_model('backend', 'JournalEntry')
-    JournalLine  = apps.get_model('backend', 'JournalLine')
-
-    with transaction.atomic():
-
-        # Impedir duplicação
-        if JournalEntry.objects.filter(reference_type=reference_type, reference_id=str(reference_id)).exists():
-            return
-
-        # ---------------------------
-        # Validação
-        # ---------------------------
-        total_debits  = Decimal('0.00')
-        total_credits = Decimal('0.00')
-
-        for l in lines:
-            debit  = _dec(l.get('debit', 0))
-            credit = _dec(l.get('credit', 0))
-            total_debits  += debit
-            total_credits += credit
-
-        # Validação contábil
-        if total_debits <= Decimal('0.00') or total_debits != total_credits:
-            raise ValueError("Lançamento inconsistente: débitos e créditos devem ser iguais e positivos.")
-
-        # ---------------------------
-        # Criar JournalEntry
-        # ---------------------------
-        je = JournalEntry.objects.create(
-            date=date,
-            description=description or '',
-            company=company,
-            reference_type=reference_type,
-            reference_id=str(reference_id)
-        )
-
-        # ---------------------------
-        # Criar JournalLines
-        # ---------------------------
-        for l in lines:
-            JournalLine.objects.create(
-                journal=je,
-                account=l['account'],
-                debit=_dec(l.get('debit', 0)),
-                credit=_dec(l.get('credit', 0)),
-                memo=l.get('memo', '')
-            )
-
-        je.total_debits  = total_debits
-        je.total_credits = total_credits
-        je.save(update_fields=['total_debits', 'total_credits'])
-
-# ------------------------------------------------------------
-# Signals — Title criado
+# Signals — Outbox de lançamentos contábeis
 # ------------------------------------------------------------
+# Os lançamentos não são mais gerados dentro da requisição: cada título ou
+# baixa grava um evento no JournalOutbox, na mesma transação do save, e o
+# comando process_journal_outbox gera os JournalEntry (backend.journal).
+
+def _enqueue(event, reference_id, company_id, payload=None):
+    JournalOutbox = apps.get_model('backend', 'JournalOutbox')
+    JournalOutbox.objects.create(
+        event=event,
+        reference_id=str(reference_id),
+        company_id=company_id,
+        payload=payload or {},
+    )
 
 @receiver(post_save, sender=apps.get_model('backend', 'Title'))
 def _on_title_created(sender, instance, created, **kwargs):
-    if not created:
+    if not created or not instance.preset_id:
         return
+    _enqueue('title_created', instance.uuid, instance.company_id)
 
-    Title  = instance
-    Preset = apps.get_model('backend', 'Preset')
-
-    preset = Preset.objects.filter(pk=Title.preset_id).first() if Title.preset_id else None
-    plan   = _plan_from_preset(preset)
-    if not plan:
+@receiver(post_save, sender=apps.get_model('backend', 'Entry'))
+def _on_entry_created(sender, instance, created, **kwargs):
+    if not created or not instance.title.preset_id:
         return
+    _enqueue('entry_created', instance.uuid, instance.company_id)
 
-    # Resolve control accounts safely: prefer explicit plan fields, but fall back to
-    # searching by common names or by finding analytic children under top-level
-    # synthetic accounts. This avoids AttributeError when BillingPlan model does
-    # not define these FK fields.
-    BillingAccount = apps.get_model('backend', 'BillingAccount')
-
-    receivable_ctrl = getattr(plan, 'receivable_control_account', None)
-    payable_ctrl = getattr(plan, 'payable_control_account', None)
+@receiver(post_delete, sender=apps.get_model('backend', 'Entry'))
+def _on_entry_deleted(sender, instance, **kwargs):
+    # O estorno é gerado a partir do lançamento original, se existir
+    _enqueue('entry_deleted', instance.uuid, instance.company_id, {
+        'paid_at': instance.paid_at.isoformat(),
+    })
 
-    if not receivable_ctrl:
-        receivable_ctrl = BillingAccount.objects.filter(
-            billing_plan=plan,
-            account_type=BillingAccount.AccountType.ANALYTIC,
-            name__icontains='receb'
-        ).first()
-    if not receivable_ctrl:
-        parent = BillingAccount.objects.filter(
-            billing_plan=plan,
-            account_type=BillingAccount.AccountType.SYNTHETIC,
-            name__icontains='Receitas'
-        ).first()
-        if parent:
-            receivable_ctrl = BillingAccount.objects.filter(
-                billing_plan=plan,
-                parent=parent,
-                account_type=BillingAccount.AccountType.ANALYTIC,
-            ).first()
+# ------------------------------------------------------------
+# Signals — Invalidação do cache de relatórios
+# ------------------------------------------------------------
 
-    if not payable_ctrl:
-        payable_ctrl = BillingAccount.objects.filter(
-            billing_plan=plan,
-            account_type=BillingAccount.AccountType.ANALYTIC,
-            name__icontains='pag'
-        ).first()
-    if not payable_ctrl:
-        parent = BillingAccount.objects.filter(
-            billing_plan=plan,
-            account_type=BillingAccount.AccountType.SYNTHETIC,
-            name__icontains='Despesas'
-        ).first()
-        if parent:
-            payable_ctrl = BillingAccount.objects.filter(
-                billing_plan=plan,
-                parent=parent,
-                account_type=BillingAccount.AccountType.ANALYTIC,
-            ).first()
+def _invalidate_reports(company_id):
+    from .cache import report_cache
+    transaction.on_commit(lambda: report_cache.invalidate_company(company_id))
 
-    amount  = _dec(Title.amount)
-    company = Title.company
-    date    = getattr(Title, 'created_at', None) or Title.expiration_date
-    desc    = f'Título: {Title.description} - criação'
+@receiver(post_save, sender=apps.get_model('backend', 'Title'))
+@receiver(post_delete, sender=apps.get_model('backend', 'Title'))
+@receiver(post_save, sender=apps.get_model('backend', 'JournalEntry'))
+@receiver(post_delete, sender=apps.get_model('backend', 'JournalEntry'))
+@receiver(post_save, sender=apps.get_model('backend', 'Budget'))
+@receiver(post_delete, sender=apps.get_model('backend', 'Budget'))
+def _on_company_data_changed(sender, instance, **kwargs):
+    _invalidate_reports(instance.company_id)
+    # Título movido para outra empresa: os relatórios da anterior também mudam
+    previous = getattr(instance, '_previous_company_id', None)
+    if previous is not None and previous != instance.company_id:
+        _invalidate_reports(previous)
 
-    BillingAccount = apps.get_model('backend', 'BillingAccount')
+@receiver(post_save, sender=apps.get_model('backend', 'Entry'))
+@receiver(post_delete, sender=apps.get_model('backend', 'Entry'))
+def _on_entry_changed(sender, instance, **kwargs):
+    _invalidate_reports(instance.company_id)
 
-    if Title.type_of == 'income' and receivable_ctrl:
-        revenue_acc = getattr(preset, 'revenue_account', None)
-        if not revenue_acc:
-            logger.warning('Preset %s sem revenue_account; título %s criado sem lançamento.',
-                           preset.name if preset else 'N/A', Title.uuid)
-            return
-        if receivable_ctrl.account_type != BillingAccount.AccountType.ANALYTIC:
-            logger.error('Conta de controle de recebíveis não analítica para plano %s.', plan.uuid)
-            return
-        if revenue_acc.account_type != BillingAccount.AccountType.ANALYTIC:
-            logger.error('Conta de receita não analítica no preset %s.', getattr(preset, 'uuid', 'N/A'))
-            return
-        try:
-            _create_journal(
-                'title_creation', Title.uuid, company, date, desc,
-                [
-                    {'account': receivable_ctrl, 'debit': amount},
-                    {'account': revenue_acc,     'credit': amount}
-                ]
-            )
-        except Exception:
-            logger.exception('Falha ao criar lançamento (title_creation) para título %s', Title.uuid)
+@receiver(post_save, sender=apps.get_model('backend', 'JournalEntry'))
+@receiver(post_delete, sender=apps.get_model('backend', 'JournalEntry'))
+def _on_journal_changed(sender, instance, **kwargs):
+    # Snapshots de saldo a partir da data do lançamento deixam de valer
+    from .balance import discard_snapshots
+    discard_snapshots(instance.company_id, instance.date)
 
-    elif Title.type_of == 'expense' and payable_ctrl:
-        expense_acc = getattr(preset, 'expense_account', None)
-        if not expense_acc:
-            logger.warning('Preset %s sem expense_account; título %s criado sem lançamento.',
-                           preset.name if preset else 'N/A', Title.uuid)
-            return
-        if payable_ctrl.account_type != BillingAccount.AccountType.ANALYTIC:
-            logger.error('Conta de controle de pagamentos não analítica para plano %s.', plan.uuid)
-            return
-        if expense_acc.account_type != BillingAccount.AccountType.ANALYTIC:
-            logger.error('Conta de despesa não analítica no preset %s.', getattr(preset, 'uuid', 'N/A'))
-            return
-        try:
-            _create_journal(
-                'title_creation', Title.uuid, company, date, desc,
-                [
-                    {'account': expense_acc,  'debit': amount},
-                    {'account': payable_ctrl, 'credit': amount}
-                ]
-            )
-        except Exception:
-            logger.exception('Falha ao criar lançamento (title_creation) para título %s', Title.uuid)
 # ------------------------------------------------------------
-# Signals — Entry criado (baixa)
+# Signals — Invalidação do cache de autenticação
 # ------------------------------------------------------------
 
-@receiver(post_save, sender=apps.get_model('backend', 'Entry'))
-def _on_entry_created(sender, instance, created, **kwargs):
-    if not created:
+def _invalidate_users(user_ids):
+    from .authentication import invalidate_user
+    user_ids = list(user_ids)
+    transaction.on_commit(lambda: invalidate_user(*user_ids))
+
+@receiver(post_save, sender=apps.get_model('auth', 'User'))
+@receiver(post_delete, sender=apps.get_model('auth', 'User'))
+def _on_user_changed(sender, instance, **kwargs):
+    _invalidate_users([instance.pk])
+
+@receiver(post_delete, sender=apps.get_model('authtoken', 'Token'))
+def _on_token_deleted(sender, instance, **kwargs):
+    from .authentication import invalidate_token
+    invalidate_token(instance.key)
+
+@receiver(m2m_changed, sender=apps.get_model('auth', 'User').groups.through)
+@receiver(m2m_changed, sender=apps.get_model('auth', 'User').user_permissions.through)
+def _on_user_m2m_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
         return
-
-    Entry  = instance
-    Title  = Entry.title
-    Preset = apps.get_model('backend', 'Preset')
-
-    preset = Preset.objects.filter(pk=Title.preset_id).first() if Title.preset_id else None
-    plan   = _plan_from_preset(preset)
-    if not plan or not Entry.billing_account:
+    if not reverse:
+        _invalidate_users([instance.pk])
+    elif action == 'pre_clear':
+        # group.user_set.clear() / permission.user_set.clear()
+        _invalidate_users(instance.user_set.values_list('pk', flat=True))
+    else:
+        _invalidate_users(pk_set)
+
+@receiver(m2m_changed, sender=apps.get_model('auth', 'Group').permissions.through)
+def _on_group_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
         return
+    User = apps.get_model('auth', 'User')
+    if not reverse:
+        users = User.objects.filter(groups=instance)
+    elif action == 'pre_clear':
+        users = User.objects.filter(groups__permissions=instance)
+    else:
+        users = User.objects.filter(groups__in=pk_set)
+    _invalidate_users(users.values_list('pk', flat=True).distinct())
 
-    # Resolve control accounts for this plan (same logic as above)
-    BillingAccount = apps.get_model('backend', 'BillingAccount')
-    receivable_ctrl = getattr(plan, 'receivable_control_account', None)
-    payable_ctrl = getattr(plan, 'payable_control_account', None)
-    if not receivable_ctrl:
-        receivable_ctrl = BillingAccount.objects.filter(
-            billing_plan=plan,
-            account_type=BillingAccount.AccountType.ANALYTIC,
-            name__icontains='receb'
-        ).first()
-    if not receivable_ctrl:
-        parent = BillingAccount.objects.filter(
-            billing_plan=plan,
-            account_type=BillingAccount.AccountType.SYNTHETIC,
-            name__icontains='Receitas'
-        ).first()
-        if parent:
-            receivable_ctrl = BillingAccount.objects.filter(
-                billing_plan=plan,
-                parent=parent,
-                account_type=BillingAccount.AccountType.ANALYTIC,
-            ).first()
-    if not payable_ctrl:
-        payable_ctrl = BillingAccount.objects.filter(
-            billing_plan=plan,
-            account_type=BillingAccount.AccountType.ANALYTIC,
-            name__icontains='pag'
-        ).first()
-    if not payable_ctrl:
-        parent = BillingAccount.objects.filter(
-            billing_plan=plan,
-            account_type=BillingAccount.AccountType.SYNTHETIC,
-            name__icontains='Despesas'
-        ).first()
-        if parent:
-            payable_ctrl = BillingAccount.objects.filter(
-                billing_plan=plan,
-                parent=parent,
-                account_type=BillingAccount.AccountType.ANALYTIC,
-            ).first()
-
-    amount  = _dec(Entry.amount)
-    company = Title.company
-    date    = Entry.paid_at
-    desc    = f'Baixa do título {Title.description}'
-    cash    = Entry.billing_account
-
-    if Title.type_of == 'income' and receivable_ctrl:
-        if receivable_ctrl.account_type != BillingAccount.AccountType.ANALYTIC:
-            logger.error('Conta de controle de recebíveis não analítica para plano %s.', plan.uuid)
-            return
-        if cash.account_type != BillingAccount.AccountType.ANALYTIC:
-            logger.error('Conta financeira não analítica para entry %s.', Entry.uuid)
-            return
-        try:
-            _create_journal(
-                'title_settlement', str(Entry.uuid), company, date, desc,
-                [
-                    {'account': receivable_ctrl, 'credit': amount},
-                    {'account': cash,            'debit' : amount}
-                ]
-            )
-        except Exception:
-            logger.exception('Falha ao criar lançamento (title_settlement) para entry %s', Entry.uuid)
-
-    elif Title.type_of == 'expense' and payable_ctrl:
-        if payable_ctrl.account_type != BillingAccount.AccountType.ANALYTIC:
-            logger.error('Conta de controle de pagamentos não analítica para plano %s.', plan.uuid)
-            return
-        if cash.account_type != BillingAccount.AccountType.ANALYTIC:
-            logger.error('Conta financeira não analítica para entry %s.', Entry.uuid)
-            return
-        try:
-            _create_journal(
-                'title_settlement', str(Entry.uuid), company, date, desc,
-                [
-                    {'account': payable_ctrl, 'debit': amount},
-                    {'account': cash,         'credit': amount}
-                ]
-            )
-        except Exception:
-            logger.exception('Falha ao criar lançamento (title_settlement) para entry %s', Entry.uuid)
 # ------------------------------------------------------------
-# Signals — Estorno ao deletar Entry
+# Signals — Índice de busca
 # ------------------------------------------------------------
+# Campos que entram no SearchDocument de cada modelo (backend.search); saves
+# com update_fields que não os tocam (ex.: flag active do título) são ignorados.
 
-@receiver(post_delete, sender=apps.get_model('backend', 'Entry'))
-def _on_entry_deleted(sender, instance, **kwargs):
-    JournalEntry = apps.get_model('backend', 'JournalEntry')
-    JournalLine  = apps.get_model('backend', 'JournalLine')
-
-    original = JournalEntry.objects.filter(
-        reference_type='title_settlement',
-        reference_id=str(instance.uuid)
-    ).first()
+_SEARCH_FIELDS = {
+    'Title': {'description', 'company'},
+    'Company': {'fantasy_name', 'social_reason', 'cnpj'},
+    'BillingAccount': {'name', 'code', 'parent'},
+}
 
-    if not original:
+@receiver(post_save, sender=apps.get_model('backend', 'Title'))
+@receiver(post_save, sender=apps.get_model('backend', 'Company'))
+@receiver(post_save, sender=apps.get_model('backend', 'BillingAccount'))
+def _on_searchable_saved(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or (update_fields and not set(update_fields) & _SEARCH_FIELDS[sender.__name__]):
         return
-
-    lines = []
-    for l in JournalLine.objects.filter(journal=original):
-        lines.append({
-            'account': l.account,
-            'debit'  : _dec(l.credit),
-            'credit' : _dec(l.debit),
-            'memo'   : f'Estorno: {original.description}'
-        })
-
-    if lines:
-        _create_journal(
-            'title_settlement_reversal',
-            f'settle-rev:{instance.uuid}',
-            original.company,
-            instance.paid_at,
-            f'Estorno baixa: {original.description}',
-            lines
-        )
+    from .search import index_objects, kind_for
+    index_objects(kind_for(sender), [instance])
+
+@receiver(post_delete, sender=apps.get_model('backend', 'Title'))
+@receiver(post_delete, sender=apps.get_model('backend', 'Company'))
+@receiver(post_delete, sender=apps.get_model('backend', 'BillingAccount'))
+def _on_searchable_deleted(sender, instance, **kwargs):
+    from .search import kind_for, remove_objects
+    remove_objects(kind_for(sender), [instance.pk])
@@ -0,0 +1,66 @@
+from django.contrib.auth.models import User
+from backend.models import Address, Company, BillingPlan, BillingAccount, Preset, Title, Entry
+from datetime import date
+from decimal import Decimal
+
+SYNTHETIC, ANALYTIC = BillingAccount.AccountType.SYNTHETIC, BillingAccount.AccountType.ANALYTIC
+
+class LedgerFixture:
+    """
+    Dados base compartilhados pelos testes: usuário, empresa, plano de contas,
+    preset, títulos e baixas. Cada teste monta apenas o que usa.
+    """
+
+    def authenticate(self):
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'admin')
+        self.client.force_authenticate(self.user)
+
+    def create_address(self, **fields):
+        values = {
+            'zip_code': "85900000", 'street': "Rua Exemplo", 'number': "123",
+            'neighborhood': "Centro", 'city': "Toledo", 'state': "PR",
+        }
+        values.update(fields)
+        return Address.objects.create(**values)
+
+    def create_company(self, address=None, **fields):
+        values = {
+            'cnpj': "12345678000199", 'fantasy_name': "Beleza Rara", 'social_reason': "Beleza Rara LTDA",
+            'opening_date': date(2024, 1, 1), 'cnae': "6201-5/01", 'type_of': "Client",
+            'email': "contato@belezarara.com", 'phone': "44999887766", 'tax_regime': "simples_nacional",
+        }
+        values.update(fields)
+        return Company.objects.create(address=address or self.create_address(), **values)
+
+    def create_account(self, name, parent=None, account_type=ANALYTIC, plan=None):
+        return BillingAccount.objects.create(
+            name=name, billing_plan=plan or self.plan, parent=parent, account_type=account_type
+        )
+
+    def create_ledger(self, root="Receitas", cash="Caixa", **company):
+        """
+        Empresa, plano com uma conta sintética raiz e uma analítica de caixa.
+        """
+        self.company = self.create_company(**company)
+        self.plan = BillingPlan.objects.create(name="Plano", description="Plano de testes")
+        self.root = self.create_account(root, account_type=SYNTHETIC)
+        self.cash = self.create_account(cash, self.root)
+
+    def create_preset(self, **accounts):
+        accounts.setdefault('payable_account', self.cash)
+        accounts.setdefault('receivable_account', self.cash)
+        return Preset.objects.create(name=accounts.pop('name', "Padrão"), description="Preset", **accounts)
+
+    def create_title(self, amount, type_of='income', description="Venda", expiration_date=date(2025, 1, 10),
+                     company=None, preset=None):
+        return Title.objects.create(
+            description=description, amount=Decimal(amount), expiration_date=expiration_date,
+            company=company or self.company, type_of=type_of, preset=preset,
+        )
+
+    def create_entry(self, title, amount, paid_at=date(2025, 1, 10), payment_method='pix', account=None,
+                     description="Baixa"):
+        return Entry.objects.create(
+            title=title, description=description, amount=Decimal(amount),
+            paid_at=paid_at, payment_method=payment_method, billing_account=account or self.cash,
+        )
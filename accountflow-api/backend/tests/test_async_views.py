@@ -0,0 +1,62 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import TransactionTestCase
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from backend.reports import build_dre
+from backend.tests.fixtures import LedgerFixture
+from decimal import Decimal
+import json
+
+class AsyncReportViewTests(LedgerFixture, TransactionTestCase):
+    def setUp(self):
+        """
+        Payload de configuração de teste
+        """
+        caches['reports'].clear()
+        caches['auth'].clear()
+        user = User.objects.create_superuser('admin', 'admin@example.com', 'admin')
+        self.auth = {'headers': {'Authorization': f'Token {Token.objects.create(user=user).key}'}}
+
+        self.create_ledger()
+        for type_of, amount in [('income', '100.00'), ('expense', '30.00')]:
+            self.create_entry(self.create_title(amount, type_of, description="Título"), amount)
+        self.params = {
+            'company': str(self.company.pk), 'start': '2025-01-01', 'end': '2025-01-31', 'group': 'month',
+        }
+
+    async def test_async_dre_matches_sync_build(self):
+        """
+        Critério: a DRE assíncrona devolve o mesmo conteúdo da versão síncrona.
+        """
+        response = await self.async_client.get(reverse('dre-report-async'), self.params, **self.auth)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        body = json.loads(response.content)
+        expected = await sync_to_async(build_dre)(self.company.pk, self.params['start'], self.params['end'], 'month')
+        self.assertEqual(Decimal(body['totals']['result']), Decimal('70.00'))
+        self.assertEqual(body['totals'], expected['totals'])
+        self.assertEqual(body['monthly'], expected['monthly'])
+        self.assertEqual(body['classic'], expected['classic'])
+
+        params = {**self.params, 'company': 'bad'}
+        response = await self.async_client.get(reverse('dre-report-async'), params, **self.auth)
+        self.assertEqual(response.status_code, 400)
+
+    async def test_async_export_and_authentication(self):
+        """
+        Critério: a exportação assíncrona exige token e respeita os filtros.
+        """
+        url = reverse('title-export-async')
+        self.assertEqual((await self.async_client.get(url)).status_code, 401)
+
+        response = await self.async_client.get(url, {'company': str(self.company.pk)}, **self.auth)
+        content = b''.join([chunk async for chunk in response.streaming_content]).decode()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(content.strip().splitlines()), 3)
+
+        response = await self.async_client.get(url, {'company': 'bad'}, **self.auth)
+        self.assertEqual(response.status_code, 400)
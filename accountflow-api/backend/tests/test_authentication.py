@@ -0,0 +1,65 @@
+from django.contrib.auth.models import Permission, User
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+class CachedTokenAuthenticationTests(APITestCase):
+    def setUp(self):
+        """
+        Payload de configuração de teste
+        """
+        caches['auth'].clear()
+        self.user = User.objects.create_user('operador', 'operador@example.com', 'senha')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.url = reverse('company-list')
+
+    def _get(self):
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        return response, [q['sql'] for q in queries.captured_queries]
+
+    def _post(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(self.url, {}, format='json')
+
+    def test_second_request_skips_token_and_permission_queries(self):
+        """
+        Critério: a partir da segunda requisição usuário e permissões vêm do cache.
+        """
+        self.user.user_permissions.add(Permission.objects.get(codename='view_company'))
+        first, first_sql = self._get()
+        second, second_sql = self._get()
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertTrue(any('authtoken_token' in sql for sql in first_sql))
+        self.assertFalse(any('authtoken_token' in sql or 'auth_permission' in sql for sql in second_sql))
+        self.assertEqual(len(first_sql) - len(second_sql), 3)
+
+    def test_permission_change_invalidates_cache(self):
+        """
+        Critério: remover uma permissão vale já na requisição seguinte.
+        """
+        permission = Permission.objects.get(codename='add_company')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.user_permissions.add(permission)
+        self.assertEqual(self._post().status_code, status.HTTP_400_BAD_REQUEST)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.user_permissions.remove(permission)
+        self.assertEqual(self._post().status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_logout_invalidates_token(self):
+        """
+        Critério: depois do logout o token em cache deixa de autenticar.
+        """
+        self.user.user_permissions.add(Permission.objects.get(codename='view_company'))
+        self.assertEqual(self._get()[0].status_code, status.HTTP_200_OK)
+
+        self.assertEqual(self.client.post(reverse('logout')).status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self._get()[0].status_code, status.HTTP_401_UNAUTHORIZED)
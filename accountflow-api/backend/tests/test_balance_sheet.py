@@ -0,0 +1,99 @@
+from django.core.cache import caches
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from backend.balance import build_balance_sheet, build_snapshot
+from backend.models import AccountBalanceSnapshot
+from backend.outbox import drain
+from backend.tests.fixtures import SYNTHETIC, LedgerFixture
+from datetime import date
+from decimal import Decimal
+
+class BalanceSheetTests(LedgerFixture, APITestCase):
+    def setUp(self):
+        """
+        Payload de configuração de teste
+        """
+        caches['reports'].clear()
+        self.authenticate()
+
+        self.create_ledger(root="Ativo")
+        receivable = self.create_account("Recebíveis", self.root)
+        payable = self.create_account("Pagamentos a Fornecedores", self.create_account("Passivo", account_type=SYNTHETIC))
+        revenue = self.create_account("Serviços", self.create_account("Receitas", account_type=SYNTHETIC))
+        expense = self.create_account("Aluguel", self.create_account("Despesas", account_type=SYNTHETIC))
+
+        preset = self.create_preset(
+            receivable_account=receivable, payable_account=payable, revenue_account=revenue, expense_account=expense,
+        )
+        self.sale = self.create_title('100.00', preset=preset)
+        rent = self.create_title('30.00', 'expense', "Aluguel", date(2025, 1, 15), preset=preset)
+        self.create_entry(self.sale, '40.00', date(2025, 1, 10))
+        self.create_entry(rent, '30.00', date(2025, 1, 15))
+        drain()
+
+        self.url = reverse('balance-sheet')
+
+    def test_balance_sheet_rolls_accounts_into_sections(self):
+        """
+        Critério: os saldos sobem pela hierarquia e o balanço fecha (ativo = passivo + PL).
+        """
+        response = self.client.get(self.url, {'company': str(self.company.uuid)})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        assets = response.data['assets']
+        self.assertEqual(Decimal(assets['total']), Decimal('70.00'))
+        self.assertEqual([a['name'] for a in assets['accounts']], ['Ativo'])
+        self.assertEqual(
+            {c['name']: Decimal(c['balance']) for c in assets['accounts'][0]['children']},
+            {'Caixa': Decimal('10.00'), 'Recebíveis': Decimal('60.00')},
+        )
+        self.assertEqual(Decimal(response.data['liabilities']['total']), Decimal('0.00'))
+        self.assertEqual(Decimal(response.data['equity']['period_result']), Decimal('70.00'))
+        self.assertEqual(Decimal(response.data['difference']), Decimal('0.00'))
+
+    def test_snapshot_replaces_the_ledger_scan_before_its_date(self):
+        """
+        Critério: com snapshot, o balanço parte dele e o resultado não muda.
+        """
+        full = build_balance_sheet(self.company.uuid, date.today())
+        build_snapshot(self.company.uuid, date(2025, 1, 31))
+
+        from_snapshot = build_balance_sheet(self.company.uuid, date.today())
+
+        self.assertIsNone(full.pop('snapshot'))
+        self.assertEqual(from_snapshot.pop('snapshot'), '2025-01-31')
+        self.assertEqual(from_snapshot, full)
+
+    def test_backdated_journal_discards_later_snapshots(self):
+        """
+        Critério: um lançamento anterior ao snapshot o invalida.
+        """
+        build_snapshot(self.company.uuid, date(2025, 1, 31))
+        self.assertTrue(AccountBalanceSnapshot.objects.for_company(self.company.uuid).exists())
+
+        self.create_entry(self.sale, '10.00', date(2025, 1, 20))
+        drain()
+
+        self.assertFalse(AccountBalanceSnapshot.objects.for_company(self.company.uuid).exists())
+        response = self.client.get(self.url, {'company': str(self.company.uuid)})
+        self.assertEqual(Decimal(response.data['assets']['total']), Decimal('70.00'))
+        self.assertIsNone(response.data['snapshot'])
+
+    def test_invalid_date_is_rejected(self):
+        """
+        Critério: as_of fora do formato retorna 400.
+        """
+        response = self.client.get(self.url, {'company': str(self.company.uuid), 'as_of': '31/01/2025'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_malformed_company_is_rejected(self):
+        """
+        Critério: company que não é UUID retorna 400, nesta e nas demais views de relatório.
+        """
+        for name in ('balance-sheet', 'dre-report', 'dashboard', 'ledger-check', 'search'):
+            response = self.client.get(
+                reverse(name), {'company': 'bad', 'start': '2025-01-01', 'end': '2025-01-31', 'q': 'x'}
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, name)
+            self.assertEqual(response.data['detail'], 'company deve ser um UUID')
@@ -0,0 +1,93 @@
+from django.core.cache import caches
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from backend.models import Budget
+from backend.outbox import drain
+from backend.tests.fixtures import SYNTHETIC, LedgerFixture
+from datetime import date
+from decimal import Decimal
+
+class BudgetTests(LedgerFixture, APITestCase):
+    def setUp(self):
+        """
+        Payload de configuração de teste
+        """
+        caches['reports'].clear()
+        self.authenticate()
+
+        self.create_ledger(root="Despesas", cash="Aluguel")
+        marketing = self.create_account("Marketing", self.root)
+        payable = self.create_account("Fornecedores a pagar", self.create_account("Passivo", account_type=SYNTHETIC))
+
+        self.today = date.today()
+        for account, amount in ((self.cash, '120.00'), (marketing, '30.00')):
+            preset = self.create_preset(
+                name=account.name, payable_account=payable, receivable_account=payable, expense_account=account,
+            )
+            self.create_title(amount, 'expense', account.name, self.today, preset=preset)
+        drain()
+
+        self.import_url = reverse('budget-import') + f'?company={self.company.uuid}&billing_plan={self.plan.uuid}'
+        self.report_url = reverse('budget-report')
+
+    def _import(self, csv_text):
+        return self.client.generic('POST', self.import_url, csv_text.encode('utf-8'), content_type='text/csv')
+
+    def test_csv_import_upserts_by_account_and_month(self):
+        """
+        Critério: o CSV grava o orçado por conta e mês; reimportar substitui o valor.
+        """
+        month = f'{self.today:%Y-%m}'
+        first = self._import(f'account,month,amount\n1.1,{month},"100,50"\n1.2,{month},10\n')
+        second = self._import(f'account,month,amount\n1.1,{month},100\n')
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(first.data['imported'], 2)
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Budget.objects.count(), 2)
+        self.assertEqual(Budget.objects.get(account__code='1.1').amount, Decimal('100.00'))
+
+    def test_invalid_rows_import_nothing(self):
+        """
+        Critério: com linhas inválidas nada é gravado e os erros trazem a linha.
+        """
+        response = self._import('account,month,amount\n1.1,2025-01,10\n1,2025-01,10\n9.9,2025-13,10\n')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([e['line'] for e in response.data['errors']], [3, 4])
+        self.assertFalse(Budget.objects.exists())
+
+    def test_budget_vs_actual_rolls_up_to_synthetic_accounts(self):
+        """
+        Critério: orçado x realizado por conta, com a sintética somando as filhas
+        e sem as contas de controle do outro lado dos lançamentos.
+        """
+        self._import(f'account,month,amount\n1.1,{self.today:%Y-%m},100\n')
+
+        response = self.client.get(self.report_url, {
+            'company': str(self.company.uuid),
+            'start': f'{self.today:%Y-%m}-01', 'end': self.today.isoformat(),
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = {r['code']: r for r in response.data['accounts']}
+        self.assertEqual(list(rows), ['1', '1.1', '1.2'])
+        self.assertEqual(Decimal(rows['1']['planned']), Decimal('100.00'))
+        self.assertEqual(Decimal(rows['1']['actual']), Decimal('150.00'))
+        self.assertEqual(Decimal(rows['1.1']['percent']), Decimal('120.00'))
+        self.assertIsNone(rows['1.2']['percent'])
+        self.assertEqual(Decimal(response.data['totals']['variance']), Decimal('50.00'))
+
+    def test_malformed_uuid_parameters_are_rejected(self):
+        """
+        Critério: company ou billing_plan que não são UUID retornam 400 na importação e no relatório.
+        """
+        csv_text = f'account,month,amount\n1.1,{self.today:%Y-%m},100\n'.encode('utf-8')
+        for query in ('?company=bad', f'?company={self.company.uuid}&billing_plan=bad'):
+            response = self.client.generic('POST', reverse('budget-import') + query, csv_text, content_type='text/csv')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, query)
+
+        response = self.client.get(self.report_url, {'company': 'bad', 'start': '2025-01-01', 'end': '2025-01-31'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Budget.objects.exists())
@@ -0,0 +1,82 @@
+from django.core.cache import caches
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from backend.reports import build_cash_flow
+from backend.tests.fixtures import LedgerFixture
+from datetime import date
+from decimal import Decimal
+
+class CashFlowReportTests(LedgerFixture, APITestCase):
+    def setUp(self):
+        """
+        Payload de configuração de teste
+        """
+        caches['reports'].clear()
+        self.authenticate()
+
+        self.create_ledger(root="Disponível")
+        preset = self.create_preset()
+        sale = self.create_title('1000.00', preset=preset)
+        rent = self.create_title('1000.00', 'expense', "Aluguel", preset=preset)
+        for title, amount, paid_at, method in (
+            (sale, '50.00', date(2024, 11, 20), 'cash'),
+            (sale, '100.00', date(2024, 12, 5), 'pix'),
+            (sale, '40.00', date(2024, 12, 20), 'credit'),
+            (rent, '30.00', date(2024, 12, 28), 'pix'),
+            (rent, '25.00', date(2025, 2, 10), 'debit'),
+        ):
+            self.create_entry(title, amount, paid_at, method)
+
+        self.url = reverse('cash-flow-report')
+
+    def test_monthly_flows_by_payment_method_and_account_group(self):
+        """
+        Critério: entradas e saídas por mês, forma de pagamento e conta; meses sem baixa ficam zerados.
+        """
+        response = self.client.get(self.url, {
+            'company': str(self.company.uuid), 'start': '2024-12-01', 'end': '2025-02-28',
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        periods = {p['period']: p for p in response.data['periods']}
+        self.assertEqual(list(periods), ['2024-12', '2025-01', '2025-02'])
+        december = periods['2024-12']
+        self.assertEqual(Decimal(december['inflows']), Decimal('140.00'))
+        self.assertEqual(Decimal(december['outflows']), Decimal('30.00'))
+        self.assertEqual(Decimal(december['by_payment_method']['pix']['inflows']), Decimal('100.00'))
+        self.assertEqual(Decimal(december['by_payment_method']['pix']['outflows']), Decimal('30.00'))
+        self.assertEqual(december['by_account_group'][0]['name'], 'Disponível')
+        self.assertEqual(Decimal(periods['2025-01']['net']), Decimal('0.00'))
+        self.assertEqual(Decimal(response.data['totals']['net']), Decimal('85.00'))
+
+    def test_cumulative_balances_start_from_opening_balance(self):
+        """
+        Critério: com cumulative, o saldo parte das baixas anteriores ao início e acumula por período.
+        """
+        with self.assertNumQueries(3):
+            result = build_cash_flow(self.company.uuid, date(2024, 12, 1), date(2025, 12, 31), 'quarter', cumulative=True)
+
+        self.assertEqual(Decimal(result['opening_balance']), Decimal('50.00'))
+        self.assertEqual(
+            [(p['period'], Decimal(p['closing_balance'])) for p in result['periods']],
+            [('2024-Q4', Decimal('160.00')), ('2025-Q1', Decimal('135.00')), ('2025-Q2', Decimal('135.00')),
+             ('2025-Q3', Decimal('135.00')), ('2025-Q4', Decimal('135.00'))],
+        )
+        self.assertEqual(Decimal(result['closing_balance']), Decimal('135.00'))
+
+    def test_invalid_granularity_is_rejected(self):
+        """
+        Critério: granularidade desconhecida retorna 400.
+        """
+        response = self.client.get(self.url, {
+            'company': str(self.company.uuid), 'start': '2024-12-01', 'end': '2025-02-28', 'granularity': 'week',
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_malformed_company_is_rejected(self):
+        """
+        Critério: company que não é UUID retorna 400.
+        """
+        response = self.client.get(self.url, {'company': 'bad', 'start': '2024-12-01', 'end': '2025-02-28'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,150 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from backend.models import BillingPlan, BillingAccount
+from backend.plans import ChartError, import_chart, tree_from_json
+from backend.tests.fixtures import ANALYTIC, LedgerFixture
+
+class ChartImportTests(LedgerFixture, APITestCase):
+    def setUp(self):
+        """
+        Payload de configuração de teste
+        """
+        self.authenticate()
+
+        self.tree = [
+            {'name': "Ativo", 'account_type': 'synthetic', 'children': [
+                {'name': "Circulante", 'account_type': 'synthetic', 'children': [
+                    {'name': "Disponível", 'account_type': 'synthetic', 'children': [
+                        {'name': "Caixa", 'account_type': 'analytic'},
+                        {'name': "Bancos", 'account_type': 'analytic', 'is_active': False},
+                    ]},
+                ]},
+            ]},
+            {'name': "Despesas", 'account_type': 'Sintética', 'children': [
+                {'name': "Aluguel", 'account_type': 'Analítica'},
+            ]},
+        ]
+
+    def test_json_tree_gets_model_codes(self):
+        """
+        Critério: códigos iguais aos do BillingAccount.save (três dígitos a partir do nível 4).
+        """
+        response = self.client.post(reverse('billing-plan-import'), {
+            'name': "Padrão", 'description': "Plano padrão", 'accounts': self.tree,
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['accounts'], 7)
+        codes = dict(BillingAccount.objects.filter(billing_plan_id=response.data['uuid']).values_list('name', 'code'))
+        self.assertEqual(codes, {
+            "Ativo": '1', "Circulante": '1.1', "Disponível": '1.1.1', "Caixa": '1.1.1.001',
+            "Bancos": '1.1.1.002', "Despesas": '2', "Aluguel": '2.1',
+        })
+        bancos = BillingAccount.objects.get(name="Bancos")
+        self.assertFalse(bancos.is_active)
+        self.assertEqual(bancos.parent.name, "Disponível")
+
+        # Nova conta pelo caminho normal continua a sequência
+        caixa_2 = BillingAccount.objects.create(
+            name="Caixa 2", billing_plan=bancos.billing_plan, parent=bancos.parent, account_type=ANALYTIC
+        )
+        self.assertEqual(caixa_2.code, '1.1.1.003')
+
+    def test_csv_uses_codes_for_hierarchy(self):
+        """
+        Critério: no CSV o código define o pai; a ordem do arquivo define a numeração.
+        """
+        csv_body = "code,name,account_type\n1,Receitas,synthetic\n1.5,Vendas,analytic\n1.2,Serviços,analytic\n"
+        response = self.client.post(
+            reverse('billing-plan-import') + '?name=CSV&description=Plano', csv_body, content_type='text/csv'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        codes = dict(BillingAccount.objects.filter(billing_plan_id=response.data['uuid']).values_list('name', 'code'))
+        self.assertEqual(codes, {"Receitas": '1', "Vendas": '1.1', "Serviços": '1.2'})
+
+    def test_rules_are_validated_before_writing(self):
+        """
+        Critério: analítica na raiz, analítica com filhas e profundidade acima de MAX_LEVEL são todas reportadas.
+        """
+        deep = {'name': "N5", 'account_type': 'synthetic', 'children': [{'name': "N6", 'account_type': 'analytic'}]}
+        for _ in range(4):
+            deep = {'name': "N", 'account_type': 'synthetic', 'children': [deep]}
+        tree = [
+            {'name': "Solta", 'account_type': 'analytic', 'children': [{'name': "Filha", 'account_type': 'analytic'}]},
+            deep,
+        ]
+
+        with self.assertRaises(ChartError) as ctx:
+            import_chart("Inválido", "Plano", tree_from_json(tree))
+
+        messages = [(e['ref'], e['error']) for e in ctx.exception.errors]
+        self.assertIn(('1', 'Conta analítica deve ter uma conta pai sintética.'), messages)
+        self.assertIn(('1', 'Conta analítica não pode possuir contas filhas.'), messages)
+        self.assertIn(('2.1.1.1.1.1', 'A profundidade máxima permitida é de 5 níveis.'), messages)
+        self.assertFalse(BillingPlan.objects.filter(name="Inválido").exists())
+
+    def test_large_chart_uses_one_insert_batch_per_level(self):
+        """
+        Critério: 2.000 contas gravadas em INSERTs em lote, sem consultas por conta.
+        """
+        tree = [{'name': f"Grupo {g}", 'account_type': 'synthetic', 'children': [
+            {'name': f"Subgrupo {g}.{s}", 'account_type': 'synthetic', 'children': [
+                {'name': f"Conta {g}.{s}.{a}", 'account_type': 'analytic'} for a in range(1, 40)
+            ]} for s in range(1, 11)
+        ]} for g in range(1, 6)]
+
+        with CaptureQueriesContext(connection) as queries:
+            plan, accounts = import_chart("Grande", "Plano grande", tree_from_json(tree))
+
+        selects = [q for q in queries.captured_queries if q['sql'].startswith('SELECT')]
+        self.assertLessEqual(len(selects), 2)  # só a validação do BillingPlan
+        self.assertLess(len(queries), 60)
+
+        self.assertEqual(len(accounts), 2005)
+        self.assertEqual(BillingAccount.objects.filter(billing_plan=plan).count(), 2005)
+
+    def test_clone_copies_tree_and_codes(self):
+        """
+        Critério: a cópia tem as mesmas contas, códigos e hierarquia, em outro plano.
+        """
+        source, _ = import_chart("Padrão", "Plano padrão", tree_from_json(self.tree))
+
+        response = self.client.post(reverse('billing-plan-clone', args=[source.pk]), {'name': "Filial"}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['name'], "Filial")
+        clone = BillingAccount.objects.filter(billing_plan_id=response.data['uuid'])
+        original = BillingAccount.objects.filter(billing_plan=source)
+        self.assertEqual(
+            sorted(clone.values_list('code', 'name', 'parent__code', 'account_type', 'is_active')),
+            sorted(original.values_list('code', 'name', 'parent__code', 'account_type', 'is_active')),
+        )
+        self.assertFalse(clone.filter(parent__billing_plan=source).exists())
+
+    def test_invalid_plan_fields_and_bodies_return_400(self):
+        """
+        Critério: nome acima de 255 caracteres e corpo JSON que não é objeto são rejeitados com 400.
+        """
+        source, _ = import_chart("Padrão", "Plano padrão", tree_from_json(self.tree))
+        long_name = "x" * 256
+        import_url = reverse('billing-plan-import')
+        clone_url = reverse('billing-plan-clone', args=[source.pk])
+
+        response = self.client.post(
+            import_url, {'name': long_name, 'description': "Plano", 'accounts': self.tree}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('name', response.data)
+
+        response = self.client.post(clone_url, {'name': long_name}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('name', response.data)
+
+        for url in (import_url, clone_url):
+            response = self.client.post(url, [{'name': "Lista"}], format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(BillingPlan.objects.count(), 1)
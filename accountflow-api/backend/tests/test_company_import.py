@@ -0,0 +1,130 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from backend.models import Address, Company
+from backend.importers import import_companies
+from backend.search import search
+from backend.tests.fixtures import LedgerFixture
+
+class CompanyImportTests(LedgerFixture, APITestCase):
+    def setUp(self):
+        """
+        Payload de configuração de teste
+        """
+        self.authenticate()
+
+        self.address = self.create_address(zip_code="85900-000", street="Rua São João")
+        self.company = self.create_company(self.address, cnpj="12.345.678/0001-99")
+        self.url = reverse('company-import')
+
+    def _row(self, cnpj, name, **overrides):
+        row = {
+            'cnpj': cnpj, 'fantasy_name': name, 'social_reason': f"{name} LTDA", 'opening_date': '2024-05-01',
+            'cnae': '4520-0/01', 'type_of': 'Supplier', 'email': 'contato@fornecedor.com', 'phone': '44988776655',
+            'tax_regime': 'simples_nacional', 'zip_code': '85900000', 'street': 'RUA SAO JOAO', 'number': '123',
+            'neighborhood': 'centro', 'city': 'Toledo', 'state': 'PR',
+        }
+        row.update(overrides)
+        return row
+
+    def test_import_upserts_by_cnpj_digits_and_reuses_addresses(self):
+        """
+        Critério: CNPJ só com dígitos atualiza a empresa existente; endereço igual a menos de acentos é reaproveitado.
+        """
+        response = self.client.post(self.url, [
+            self._row('12345678000199', "Beleza Rara Matriz"),
+            self._row('98.765.432/0001-55', "Oficina Central"),
+            self._row('11222333000144', "Auto Peças", street="Av. Brasil", number="10"),
+        ], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['summary'], {'created': 2, 'updated': 1, 'error': 0})
+        self.assertEqual([r['status'] for r in response.data['results']], ['updated', 'created', 'created'])
+        self.assertEqual([r['address'] for r in response.data['results']], ['existing', 'existing', 'created'])
+        self.assertEqual(response.data['results'][0]['company'], str(self.company.uuid))
+
+        self.company.refresh_from_db()
+        self.assertEqual(self.company.fantasy_name, "Beleza Rara Matriz")
+        self.assertEqual(self.company.cnpj, "12.345.678/0001-99")
+        self.assertEqual(Company.objects.count(), 3)
+        self.assertEqual(Address.objects.count(), 2)
+        self.assertEqual(Company.objects.get(cnpj_key='98765432000155').address_id, self.address.pk)
+        self.assertEqual([r['label'] for r in search('oficina')], ["Oficina Central"])
+
+    def test_invalid_and_repeated_rows_are_reported(self):
+        """
+        Critério: linhas inválidas ou com CNPJ repetido no lote voltam com erros sem bloquear as demais.
+        """
+        results = import_companies([
+            self._row('98765432000155', "Oficina Central"),
+            self._row('98.765.432/0001-55', "Oficina Repetida"),
+            self._row('123', "Curto"),
+            self._row('55444333000122', "Sem Data", opening_date='', email='x'),
+        ])
+
+        self.assertEqual([r['status'] for r in results], ['created', 'error', 'error', 'error'])
+        self.assertIn('linha 1', results[1]['errors']['cnpj'][0])
+        self.assertIn('cnpj', results[2]['errors'])
+        self.assertEqual(set(results[3]['errors']), {'opening_date', 'email'})
+        self.assertEqual(Company.objects.count(), 2)
+
+    def test_import_uses_a_fixed_number_of_queries(self):
+        """
+        Critério: o número de consultas não cresce com o número de linhas.
+        """
+        rows = [self._row(f'{i:014d}', f"Fornecedor {i}", number=str(i)) for i in range(1, 51)]
+        with self.assertNumQueries(7):
+            results = import_companies(rows)
+        self.assertTrue(all(r['status'] == 'created' for r in results))
+
+    def test_api_rejects_punctuated_duplicate_cnpj(self):
+        """
+        Critério: o cadastro individual também recusa CNPJ repetido com outra pontuação.
+        """
+        response = self.client.post(reverse('company-list'), {
+            'cnpj': '12345678000199', 'fantasy_name': "Outra", 'social_reason': "Outra LTDA",
+            'opening_date': '2024-01-01', 'cnae': '6201-5/01', 'address': str(self.address.pk),
+            'type_of': 'Client', 'email': 'outra@example.com', 'phone': '44999887766',
+            'tax_regime': 'simples_nacional',
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('cnpj', response.data)
+
+    def test_backfilled_duplicates_remain_editable(self):
+        """
+        Critério: duplicatas antigas ficam sem chave na migration e continuam editáveis.
+        """
+        from importlib import import_module
+        from django.apps import apps
+        from django.db import connection
+
+        legacy = self.create_company(
+            self.address, cnpj="11111111000111", fantasy_name="Beleza Rara Filial", email="filial@belezarara.com",
+        )
+        Company.objects.filter(pk=legacy.pk).update(cnpj="12345678000199", cnpj_key=None)
+        Company.objects.filter(pk=self.company.pk).update(cnpj_key=None)
+
+        migration = import_module('backend.migrations.0023_company_cnpj_key_address_normalized_key')
+        migration.backfill_keys(apps, type('SchemaEditor', (), {'connection': connection})())
+
+        self.assertEqual(Company.objects.get(pk=self.company.pk).cnpj_key, '12345678000199')
+        legacy = Company.objects.get(pk=legacy.pk)
+        self.assertIsNone(legacy.cnpj_key)
+
+        legacy.fantasy_name = "Filial Centro"
+        legacy.save()
+        self.assertIsNone(Company.objects.get(pk=legacy.pk).cnpj_key)
+
+        response = self.client.put(reverse('company-detail', args=[legacy.pk]), {
+            'cnpj': legacy.cnpj, 'fantasy_name': "Filial Norte", 'social_reason': legacy.social_reason,
+            'opening_date': '2024-01-01', 'cnae': legacy.cnae, 'address': str(self.address.pk),
+            'type_of': legacy.type_of, 'email': legacy.email, 'phone': legacy.phone,
+            'tax_regime': legacy.tax_regime,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # Trocar para um CNPJ livre passa a preencher a chave
+        legacy.cnpj = "22.333.444/0001-55"
+        legacy.save()
+        self.assertEqual(Company.objects.get(pk=legacy.pk).cnpj_key, '22333444000155')
@@ -0,0 +1,89 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from backend.models import BillingPlan
+from backend.tests.fixtures import SYNTHETIC, LedgerFixture
+
+class ConditionalGetTests(LedgerFixture, APITestCase):
+    def setUp(self):
+        """
+        Payload de configuração de teste
+        """
+        self.authenticate()
+
+        self.plan = BillingPlan.objects.create(name="Plano Teste", description="Este é um plano teste")
+
+        self.list_url = reverse('billing-plan-list')
+        self.detail_url = reverse('billing-plan-detail', kwargs={'pk': self.plan.uuid})
+
+    def test_list_returns_304_when_etag_matches(self):
+        """
+        Critério: a lista responde 304 quando o cliente envia o ETag atual.
+        """
+        first = self.client.get(self.list_url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', first)
+        # Last-Modified não percebe exclusões: listas validam só pelo ETag
+        self.assertNotIn('Last-Modified', first)
+
+        second = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(second.content, b'')
+
+    def test_list_etag_changes_after_delete(self):
+        """
+        Critério: a exclusão de um registro invalida o ETag da lista.
+        """
+        other = BillingPlan.objects.create(name="Outro", description="Outro plano")
+        first = self.client.get(self.list_url)
+
+        other.delete()
+        second = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(second['ETag'], first['ETag'])
+
+    def test_list_ignores_if_modified_since_after_delete(self):
+        """
+        Critério: excluir um registro mais antigo não deixa a lista responder 304 por If-Modified-Since.
+        """
+        older = BillingPlan.objects.create(name="Antigo", description="Plano antigo")
+        BillingPlan.objects.filter(pk=older.pk).update(updated_at=self.plan.updated_at.replace(year=2020))
+        first = self.client.get(self.list_url)
+        since = first.get('Last-Modified') or 'Wed, 01 Jan 2099 00:00:00 GMT'
+
+        older.delete()
+        response = self.client.get(self.list_url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_account_etag_follows_plan_name(self):
+        """
+        Critério: renomear o plano muda o ETag da lista e do detalhe das contas (billing_plan_name).
+        """
+        account = self.create_account("Ativo", account_type=SYNTHETIC)
+        urls = [reverse('billing-account-list'), reverse('billing-account-detail', kwargs={'pk': account.uuid})]
+        etags = [self.client.get(url)['ETag'] for url in urls]
+
+        self.plan.name = "Plano Renomeado"
+        self.plan.save()
+        for url, etag in zip(urls, etags):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+            self.assertIn("Plano Renomeado", response.content.decode())
+
+    def test_detail_returns_304_until_object_changes(self):
+        """
+        Critério: o detalhe responde 304 enquanto o updated_at do objeto não mudar.
+        """
+        first = self.client.get(self.detail_url)
+        etag = first['ETag']
+
+        self.assertEqual(
+            self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag).status_code,
+            status.HTTP_304_NOT_MODIFIED,
+        )
+
+        self.plan.description = "Descrição alterada"
+        self.plan.save()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['description'], "Descrição alterada")
@@ -0,0 +1,78 @@
+from django.core.cache import caches
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from backend.reports import build_dashboard
+from backend.tests.fixtures import LedgerFixture
+from datetime import date, timedelta
+from decimal import Decimal
+
+class DashboardTests(LedgerFixture, APITestCase):
+    def setUp(self):
+        """
+        Payload de configuração de teste
+        """
+        caches['reports'].clear()
+        self.authenticate()
+
+        self.create_ledger()
+        preset = self.create_preset()
+
+        self.today = date.today()
+        self.sale = self.create_title('100.00', expiration_date=self.today - timedelta(days=1), preset=preset)
+        self.create_title('50.00', 'expense', "Aluguel", self.today + timedelta(days=10), preset=preset)
+        self._pay('40.00', self.today)
+        self._pay('15.00', (self.today.replace(day=1) - timedelta(days=1)).replace(day=5))
+
+        self.url = reverse('dashboard')
+
+    def _pay(self, amount, paid_at):
+        return self.create_entry(self.sale, amount, paid_at, description="Recebimento")
+
+    def test_dashboard_returns_key_figures(self):
+        """
+        Critério: em aberto, vencidos, mês atual, tendência e principais contas numa resposta.
+        """
+        response = self.client.get(self.url, {'company': str(self.company.uuid)})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['company']['fantasy_name'], "Beleza Rara")
+        self.assertEqual(Decimal(response.data['receivables']['open']), Decimal('45.00'))
+        self.assertEqual(Decimal(response.data['receivables']['overdue']), Decimal('45.00'))
+        self.assertEqual(response.data['receivables']['overdue_count'], 1)
+        self.assertEqual(Decimal(response.data['payables']['open']), Decimal('50.00'))
+        self.assertEqual(Decimal(response.data['payables']['overdue']), Decimal('0.00'))
+        self.assertEqual(Decimal(response.data['current_month']['revenues']), Decimal('40.00'))
+        self.assertEqual(len(response.data['trend']), 12)
+        self.assertEqual(Decimal(response.data['trend'][-2]['revenues']), Decimal('15.00'))
+        self.assertEqual(response.data['top_accounts']['revenues'][0]['name'], "Caixa")
+        self.assertEqual(Decimal(response.data['top_accounts']['revenues'][0]['total']), Decimal('55.00'))
+
+    def test_dashboard_uses_a_few_aggregate_queries(self):
+        """
+        Critério: o resumo sai de um número fixo de consultas agregadas.
+        """
+        with self.assertNumQueries(5):
+            build_dashboard(self.company.uuid, self.today)
+
+    def test_dashboard_is_cached_until_entries_change(self):
+        """
+        Critério: segunda chamada vem do cache; uma nova baixa invalida o resumo.
+        """
+        params = {'company': str(self.company.uuid)}
+        self.assertEqual(self.client.get(self.url, params)['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(self.url, params)['X-Cache'], 'HIT')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._pay('5.00', self.today)
+
+        response = self.client.get(self.url, params)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(Decimal(response.data['current_month']['revenues']), Decimal('45.00'))
+
+    def test_unknown_company_is_not_found(self):
+        """
+        Critério: empresa inexistente retorna 404.
+        """
+        response = self.client.get(self.url, {'company': '00000000-0000-0000-0000-000000000000'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,42 @@
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from config.settings.database import database_profile
+from pathlib import Path
+
+class DatabaseProfileTests(SimpleTestCase):
+    def test_postgres_profile(self):
+        """
+        Critério: o perfil postgres usa conexões persistentes com health check.
+        """
+        db = database_profile({
+            'DB_PROFILE': 'postgres', 'POSTGRES_HOST': 'db', 'DB_CONN_MAX_AGE': '300', 'DB_POOLER': 'pgbouncer',
+        }, Path('/app'))
+
+        self.assertEqual(db['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual(db['HOST'], 'db')
+        self.assertEqual(db['CONN_MAX_AGE'], 300)
+        self.assertTrue(db['CONN_HEALTH_CHECKS'])
+        self.assertTrue(db['DISABLE_SERVER_SIDE_CURSORS'])
+
+    def test_sqlite_profile_is_default(self):
+        """
+        Critério: sem variáveis de ambiente o banco continua sendo o db.sqlite3 local.
+        """
+        db = database_profile({}, Path('/app'))
+        self.assertEqual(db['ENGINE'], 'django.db.backends.sqlite3')
+        self.assertEqual(db['NAME'], Path('/app') / 'db.sqlite3')
+
+    def test_invalid_profile(self):
+        with self.assertRaises(ValueError):
+            database_profile({'DB_PROFILE': 'oracle'}, Path('/app'))
+
+class SqlitePragmaTests(TestCase):
+    def test_pragmas_applied_on_connect(self):
+        """
+        Critério: as conexões SQLite abrem com synchronous=NORMAL e busy_timeout.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertGreater(cursor.fetchone()[0], 0)
@@ -0,0 +1,73 @@
+from django.core.cache import caches
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from backend.reports import build_dre_comparison, shift_period
+from backend.tests.fixtures import LedgerFixture
+from datetime import date
+from decimal import Decimal
+
+class DREComparisonTests(LedgerFixture, APITestCase):
+    def setUp(self):
+        """
+        Payload de configuração de teste
+        """
+        caches['reports'].clear()
+        self.authenticate()
+
+        self.create_ledger(root="Despesas", cash="Aluguel")
+        preset = self.create_preset()
+        sale = self.create_title('1000.00', expiration_date=date(2025, 3, 10), preset=preset)
+        rent = self.create_title('1000.00', 'expense', "Aluguel", date(2025, 3, 10), preset=preset)
+        for title, amount, paid_at in (
+            (sale, '100.00', date(2025, 3, 10)),
+            (rent, '30.00', date(2025, 3, 15)),
+            (sale, '80.00', date(2025, 2, 10)),
+            (rent, '20.00', date(2025, 2, 15)),
+            (sale, '50.00', date(2024, 3, 10)),
+        ):
+            self.create_entry(title, amount, paid_at)
+
+        self.url = reverse('dre-report')
+
+    def test_periods_are_compared_side_by_side(self):
+        """
+        Critério: mês atual, anterior e do ano passado, com variação absoluta e percentual.
+        """
+        response = self.client.get(self.url, {
+            'company': str(self.company.uuid), 'start': '2025-03-01', 'end': '2025-03-31',
+            'compare': 'previous,last_year',
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        periods = {p['label']: p for p in response.data['periods']}
+        self.assertEqual(periods['previous']['start'], '2025-02-01')
+        self.assertEqual(periods['previous']['end'], '2025-02-28')
+        self.assertEqual(Decimal(periods['current']['values']['result']), Decimal('70.00'))
+        self.assertEqual(Decimal(periods['previous']['values']['custos_fixos']), Decimal('20.00'))
+        self.assertEqual(Decimal(periods['last_year']['values']['revenues']), Decimal('50.00'))
+
+        comparisons = {c['against']: c['values'] for c in response.data['comparisons']}
+        self.assertEqual(Decimal(comparisons['previous']['revenues']['delta']), Decimal('20.00'))
+        self.assertEqual(Decimal(comparisons['previous']['revenues']['percent']), Decimal('25.00'))
+        self.assertEqual(Decimal(comparisons['last_year']['revenues']['percent']), Decimal('100.00'))
+        self.assertIsNone(comparisons['last_year']['expenses']['percent'])
+
+    def test_all_periods_come_from_one_query(self):
+        """
+        Critério: os períodos são calculados numa única consulta agregada.
+        """
+        start, end = date(2025, 3, 1), date(2025, 3, 31)
+        periods = [('current', start, end), ('previous', *shift_period(start, end, 'previous'))]
+        with self.assertNumQueries(1):
+            build_dre_comparison(self.company.uuid, periods)
+
+    def test_invalid_compare_period_is_rejected(self):
+        """
+        Critério: período de comparação inválido retorna 400.
+        """
+        response = self.client.get(self.url, {
+            'company': str(self.company.uuid), 'start': '2025-03-01', 'end': '2025-03-31',
+            'compare': '2025-02-30:2025-02-01',
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,81 @@
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from io import StringIO
+from unittest import mock
+from rest_framework import status
+from rest_framework.test import APITestCase
+from backend.models import Title, Entry, IdempotencyKey, JournalOutbox
+from backend.tests.fixtures import LedgerFixture
+from datetime import timedelta
+
+class IdempotencyKeyTests(LedgerFixture, APITestCase):
+    def setUp(self):
+        """
+        Payload de configuração de teste
+        """
+        self.authenticate()
+
+        self.create_ledger()
+        self.preset = self.create_preset()
+        self.payload = {
+            'description': 'Venda', 'amount': '100.00', 'expiration_date': '2025-01-10',
+            'company': str(self.company.pk), 'type_of': 'income', 'preset': str(self.preset.pk),
+        }
+
+    def test_retry_returns_stored_response(self):
+        """
+        Critério: a repetição com a mesma chave não cria outro título nem outro evento.
+        """
+        url = reverse('title-list')
+        first = self.client.post(url, self.payload, format='json', HTTP_IDEMPOTENCY_KEY='abc-1')
+        retry = self.client.post(url, self.payload, format='json', HTTP_IDEMPOTENCY_KEY='abc-1')
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.json()['uuid'], first.json()['uuid'])
+        self.assertEqual(Title.objects.count(), 1)
+        self.assertEqual(JournalOutbox.objects.count(), 1)
+
+    def test_unhandled_error_releases_key(self):
+        """
+        Critério: uma exceção não tratada libera a chave; a nova tentativa é executada (sem 409).
+        """
+        url = reverse('title-list')
+        self.client.raise_request_exception = False
+        with mock.patch('backend.views.TitleSerializer.is_valid', side_effect=RuntimeError('falha')):
+            first = self.client.post(url, self.payload, format='json', HTTP_IDEMPOTENCY_KEY='abc-2')
+        retry = self.client.post(url, self.payload, format='json', HTTP_IDEMPOTENCY_KEY='abc-2')
+
+        self.assertEqual(first.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Title.objects.count(), 1)
+
+    def test_entry_retry_and_key_reuse(self):
+        """
+        Critério: baixas repetidas não duplicam; a chave não vale para outro corpo.
+        """
+        title = self.create_title('100.00')
+        url = reverse('entry-list', args=[title.pk])
+        payload = {
+            'title': str(title.pk), 'description': 'Recebimento', 'amount': '40.00',
+            'paid_at': '2025-01-10', 'payment_method': 'pix', 'billing_account': str(self.cash.pk),
+        }
+        for _ in range(2):
+            self.client.post(url, payload, format='json', HTTP_IDEMPOTENCY_KEY='pay-1')
+        self.assertEqual(Entry.objects.count(), 1)
+
+        other = self.client.post(url, dict(payload, amount='10.00'), format='json', HTTP_IDEMPOTENCY_KEY='pay-1')
+        self.assertEqual(other.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Entry.objects.count(), 1)
+
+    def test_purge_expired_keys(self):
+        """
+        Critério: chaves expiradas são removidas pelo comando de limpeza.
+        """
+        self.client.post(reverse('title-list'), self.payload, format='json', HTTP_IDEMPOTENCY_KEY='abc-2')
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        call_command('purge_idempotency_keys', stdout=StringIO())
+        self.assertFalse(IdempotencyKey.objects.exists())
@@ -0,0 +1,228 @@
+from io import StringIO
+from threading import Barrier, Thread
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.urls import reverse
+from rest_framework.test import APIClient
+from backend.models import (
+    BillingPlan, JournalEntry, JournalLine, JournalOutbox
+)
+from backend.hashchain import verify_chain
+from backend.journal import entries_missing_journal, rebuild_title_journals, titles_missing_journal
+from backend.management.commands.rebuild_journals import plan_tasks
+from backend.ledger import deleted_without_reversal, is_clean, verify_ledger
+from backend.outbox import drain
+from backend.tests.fixtures import SYNTHETIC, LedgerFixture
+from decimal import Decimal
+
+class JournalFixture(LedgerFixture):
+    def setUp(self):
+        """
+        Payload de configuração de teste
+        """
+        self.company = self.create_company()
+        self.plan = BillingPlan.objects.create(name="Plano", description="Plano de testes")
+        income_root = self.create_account("Receitas", account_type=SYNTHETIC)
+        self.receivable = self.create_account("Recebimentos", income_root)
+        self.revenue = self.create_account("Serviços", income_root)
+        self.cash = self.create_account("Caixa", income_root)
+        preset = self.create_preset(
+            receivable_account=self.receivable, payable_account=self.receivable, revenue_account=self.revenue,
+        )
+        self.title = self.create_title('100.00', preset=preset)
+
+    def _pay(self, amount):
+        return self.create_entry(self.title, amount, description="Recebimento")
+
+class JournalOutboxTests(JournalFixture, TestCase):
+
+    def test_journals_are_posted_by_the_worker(self):
+        """
+        Critério: o save grava apenas o evento; o worker gera os lançamentos.
+        """
+        entry = self._pay('40.00')
+        self.assertEqual(JournalOutbox.objects.filter(status='pending').count(), 2)
+        self.assertFalse(JournalEntry.objects.exists())
+
+        self.assertEqual(drain(), (2, 0))
+
+        creation = JournalEntry.objects.get(reference_type='title_creation', reference_id=str(self.title.uuid))
+        settlement = JournalEntry.objects.get(reference_type='title_settlement', reference_id=str(entry.uuid))
+        self.assertEqual(creation.total_debits, Decimal('100.00'))
+        self.assertEqual(settlement.total_credits, Decimal('40.00'))
+        self.assertEqual(settlement.lines.count(), 2)
+        self.assertFalse(JournalOutbox.objects.exclude(status='done').exists())
+
+    def test_deleted_entry_is_reversed(self):
+        """
+        Critério: excluir uma baixa já lançada gera o estorno.
+        """
+        entry = self._pay('40.00')
+        drain()
+        entry_id = entry.uuid
+        entry.delete()
+
+        self.assertEqual(drain(), (1, 0))
+        reversal = JournalEntry.objects.get(reference_id=f'settle-rev:{entry_id}')
+        self.assertEqual(reversal.reference_type, JournalEntry.RefType.TITLE_SETTLEMENT_REVERSAL)
+        self.assertEqual(reversal.lines.get(account=self.cash).credit, Decimal('40.00'))
+
+    def test_legacy_reversals_are_recognized(self):
+        """
+        Critério: estornos gravados como 'title_settlement_reversal' (antes do outbox) contam na verificação.
+        """
+        entry = self._pay('40.00')
+        drain()
+        entry.delete()
+        drain()
+        JournalEntry.objects.filter(reference_type=JournalEntry.RefType.TITLE_SETTLEMENT_REVERSAL).update(
+            reference_type=JournalEntry.LEGACY_SETTLEMENT_REVERSAL
+        )
+
+        self.assertFalse(deleted_without_reversal(self.company.pk).exists())
+
+    def test_failed_events_are_retried_later(self):
+        """
+        Critério: uma falha devolve o evento para a fila com nova tentativa agendada.
+        """
+        with mock.patch('backend.outbox.post_journals', side_effect=RuntimeError('falha')):
+            self.assertEqual(drain(), (0, 1))
+
+        event = JournalOutbox.objects.get()
+        self.assertEqual(event.status, JournalOutbox.Status.PENDING)
+        self.assertEqual(event.attempts, 1)
+        self.assertIn('falha', event.last_error)
+        self.assertFalse(JournalEntry.objects.exists())
+
+    def test_rebuild_posts_missing_journals(self):
+        """
+        Critério: o comando de reconstrução lança o que falta e é idempotente.
+        """
+        self._pay('40.00')
+        out = StringIO()
+        call_command('rebuild_journals', '--dry-run', stdout=out)
+        self.assertIn('1 title(s), 1 entry(ies)', out.getvalue())
+        self.assertFalse(JournalEntry.objects.exists())
+
+        call_command('rebuild_journals', '--workers', '1', stdout=StringIO())
+        self.assertEqual(JournalEntry.objects.count(), 2)
+
+        out = StringIO()
+        call_command('rebuild_journals', '--dry-run', stdout=out)
+        self.assertIn('0 title(s), 0 entry(ies)', out.getvalue())
+        # O outbox pendente não duplica os lançamentos já reconstruídos
+        drain()
+        self.assertEqual(JournalEntry.objects.count(), 2)
+
+    def test_ledger_verification(self):
+        """
+        Critério: o verificador aponta baixas sem lançamento, estornos faltando e totais divergentes.
+        """
+        entry = self._pay('40.00')
+        report = verify_ledger(workers=1)[self.company.pk]
+        self.assertEqual(report['entries_without_settlement']['count'], 1)
+
+        drain()
+        self.assertTrue(is_clean(verify_ledger(workers=1)))
+
+        settlement = JournalEntry.objects.get(reference_type='title_settlement')
+        JournalEntry.objects.filter(pk=settlement.pk).update(total_debits=Decimal('41.00'))
+        entry.delete()  # estorno fica pendente no outbox
+
+        report = verify_ledger(workers=1)[self.company.pk]
+        self.assertEqual([r['uuid'] for r in report['totals_mismatch']['rows']], [settlement.pk])
+        self.assertEqual(report['unbalanced']['count'], 0)
+        self.assertEqual(report['deleted_without_reversal']['count'], 1)
+        with self.assertRaises(CommandError):
+            call_command('verify_ledger', '--workers', '1', stdout=StringIO())
+
+        client = APIClient()
+        client.force_authenticate(User.objects.create_superuser('auditor', 'auditor@example.com', 'senha'))
+        response = client.get(reverse('ledger-check'), {'company': str(self.company.pk)})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data['ok'])
+        self.assertIn(str(self.company.pk), response.data['companies'])
+        response = client.get(reverse('ledger-check'), {'company': 'nao-e-uuid'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_missing_journal_lookups_use_plain_columns(self):
+        """
+        Critério: as buscas de lançamento/baixa comparam ``reference_id`` e a chave sem função (índice utilizável).
+        """
+        for queryset in (titles_missing_journal(), entries_missing_journal()):
+            self.assertIn('U0."reference_id" = ', str(queryset.query))
+        self.assertIn('U0."uuid" = ', str(deleted_without_reversal(self.company.pk).query))
+
+    def test_hash_chain(self):
+        """
+        Critério: os lançamentos formam uma cadeia por empresa e alterações são detectadas.
+        """
+        self._pay('40.00')
+        self._pay('10.00')
+        drain()
+        chain = list(JournalEntry.objects.order_by('chain_seq').values_list('chain_seq', flat=True))
+        self.assertEqual(chain, [1, 2, 3])
+
+        result = verify_chain(self.company.pk, chunk_size=2)
+        self.assertTrue(result['ok'])
+        self.assertEqual(result['verified'], 3)
+        # Retoma do checkpoint: nada novo a recalcular
+        self.assertEqual(verify_chain(self.company.pk)['verified'], 0)
+
+        JournalLine.objects.filter(journal__chain_seq=2).update(memo='alterado')
+        self.assertTrue(verify_chain(self.company.pk)['ok'])
+        result = verify_chain(self.company.pk, full=True)
+        self.assertFalse(result['ok'])
+        self.assertEqual(result['broken_at'], 2)
+
+    def test_rebuild_keeps_each_company_in_one_task(self):
+        """
+        Critério: os blocos de uma empresa nunca são divididos entre processos.
+        """
+        missing = {
+            'title': [('a', 1), ('a', 2), ('a', 3), ('b', 4)],
+            'entry': [('a', 5), ('b', 6), ('b', 7)],
+        }
+        tasks = plan_tasks(missing, chunk_size=2)
+
+        self.assertEqual(len(tasks), 2)
+        self.assertIn([('title', [1, 2]), ('title', [3]), ('entry', [5])], tasks)
+        self.assertIn([('title', [4]), ('entry', [6, 7])], tasks)
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class ConcurrentChainTests(JournalFixture, TransactionTestCase):
+    def test_concurrent_chunks_of_one_company_extend_the_chain(self):
+        """
+        Critério: dois blocos da mesma empresa lançados ao mesmo tempo formam uma cadeia contínua.
+        """
+        titles = [self.title] + [
+            self.create_title('10.00', description=f"Venda {i}", preset=self.title.preset)
+            for i in range(3)
+        ]
+        barrier, errors = Barrier(2), []
+
+        def run(pks):
+            try:
+                barrier.wait()
+                rebuild_title_journals(pks)
+            except Exception as exc:  # pragma: no cover - só em caso de regressão
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [Thread(target=run, args=([t.pk for t in chunk],)) for chunk in (titles[:2], titles[2:])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(
+            sorted(JournalEntry.objects.values_list('chain_seq', flat=True)), [1, 2, 3, 4]
+        )
+        self.assertTrue(verify_chain(self.company.pk, full=True)['ok'])
@@ -0,0 +1,60 @@
+from django.db import connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITransactionTestCase
+from backend.models import Title
+from backend.routers import ReadReplicaRouter, activate_read_alias, current_read_alias, deactivate_read_alias
+from backend.tests.fixtures import LedgerFixture
+
+@override_settings(DATABASE_READ_ALIAS='replica')
+class ReadReplicaRoutingTests(LedgerFixture, APITransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        """
+        Payload de configuração de teste
+        """
+        self.authenticate()
+
+        self.company = self.create_company()
+        self.create_title('100.00')
+
+    def test_list_and_export_read_from_replica(self):
+        """
+        Critério: GET de listagens e exportações lê do alias de leitura.
+        """
+        with CaptureQueriesContext(connections['replica']) as replica:
+            response = self.client.get(reverse('title-list'))
+            export = self.client.get(reverse('title-export'))
+            content = b''.join(export.streaming_content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+        self.assertIn(b'Venda', content)
+        self.assertTrue(any('backend_title' in q['sql'] for q in replica.captured_queries))
+
+    def test_writes_and_details_stay_on_primary(self):
+        """
+        Critério: POST e views de detalhe não usam o alias de leitura.
+        """
+        title = Title.objects.get()
+        with CaptureQueriesContext(connections['replica']) as replica:
+            self.client.get(reverse('title-detail', args=[title.pk]))
+            self.client.patch(reverse('title-detail', args=[title.pk]), {'description': 'Nova'}, format='json')
+
+        self.assertEqual(replica.captured_queries, [])
+
+    def test_reads_after_write_are_sticky_to_primary(self):
+        """
+        Critério: depois de uma escrita, o resto da requisição lê do principal.
+        """
+        router = ReadReplicaRouter()
+        activate_read_alias('replica')
+        try:
+            self.assertEqual(router.db_for_read(Title), 'replica')
+            self.assertEqual(router.db_for_write(Title), 'default')
+            self.assertEqual(current_read_alias(), 'default')
+        finally:
+            deactivate_read_alias()
@@ -0,0 +1,87 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from backend.models import Company, BillingPlan, BillingAccount, Preset, Title, Entry
+from backend.serializers import (
+    CompanySerializer, BillingAccountSerializer, PresetSerializer, TitleSerializer, EntrySerializer,
+    CompanyReadSerializer, BillingAccountReadSerializer, PresetReadSerializer, TitleReadSerializer, EntryReadSerializer,
+)
+from backend.tests.fixtures import SYNTHETIC, LedgerFixture
+
+class ReadSerializerTests(LedgerFixture, APITestCase):
+    def setUp(self):
+        """
+        Payload de configuração de teste
+        """
+        self.authenticate()
+
+        self.company = self.create_company(logo="company_logos/logo.png")
+        self.plan = BillingPlan.objects.create(name="Plano", description="Plano de testes")
+        self.root = self.create_account("Ativo", account_type=SYNTHETIC)
+        self.cash = self.create_account("Caixa", self.create_account("Disponível", self.root, SYNTHETIC))
+        self.create_preset()
+        self.create_entry(self.create_title('100.00'), '40.00', description="Recebimento")
+
+    def test_matches_model_serializers(self):
+        """
+        Critério: a leitura via values() produz a mesma representação dos ModelSerializers.
+        """
+        pairs = [
+            (Company, CompanySerializer, CompanyReadSerializer),
+            (BillingAccount, BillingAccountSerializer, BillingAccountReadSerializer),
+            (Preset, PresetSerializer, PresetReadSerializer),
+            (Title, TitleSerializer, TitleReadSerializer),
+            (Entry, EntrySerializer, EntryReadSerializer),
+        ]
+        for model, full, read in pairs:
+            queryset = model.objects.order_by('pk')
+            reader = read()
+            self.assertEqual(
+                JSONRenderer().render(full(queryset, many=True).data),
+                JSONRenderer().render(reader.serialize(reader.values(queryset))),
+                model.__name__,
+            )
+
+    def test_sparse_fieldset(self):
+        """
+        Critério: ?fields= restringe os campos retornados e ignora nomes desconhecidos.
+        """
+        response = self.client.get(reverse('billing-account-list'), {'fields': 'code,level,unknown'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            sorted(response.data['results'], key=lambda r: r['code']),
+            [{'code': '1', 'level': 1}, {'code': '1.1', 'level': 2}, {'code': '1.1.1', 'level': 3}],
+        )
+
+    def test_level_follows_parent_after_update(self):
+        """
+        Critério: o nível lido segue a cadeia de pais, mesmo quando o código não é regerado.
+        """
+        response = self.client.put(
+            reverse('billing-account-detail', args=[self.cash.pk]),
+            {
+                'name': 'Caixa', 'account_type': BillingAccount.AccountType.ANALYTIC,
+                'parent': str(self.root.pk), 'billing_plan': str(self.cash.billing_plan_id),
+            },
+            format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        account = BillingAccount.objects.get(pk=self.cash.pk)
+        response = self.client.get(reverse('billing-account-list'), {'fields': 'uuid,code,level'})
+        row = next(r for r in response.data['results'] if r['uuid'] == str(account.pk))
+        self.assertEqual(row['code'], account.code)
+        self.assertEqual(row['level'], account.level)
+        self.assertEqual(row['level'], 2)
+
+    def test_csv_export(self):
+        """
+        Critério: a exportação transmite um CSV com cabeçalho e uma linha por registro.
+        """
+        response = self.client.get(reverse('entry-export'), {'fields': 'amount,payment_method'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        content = b''.join(response.streaming_content).decode('utf-8')
+        self.assertEqual(content.splitlines(), ['amount,payment_method', '40.00,pix'])
@@ -0,0 +1,64 @@
+import gzip
+import json
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from backend.middleware import CompressionMiddleware, negotiate_encoding
+from backend.renderers import FastJSONRenderer
+
+class FastJSONRendererTests(SimpleTestCase):
+    def test_native_types(self):
+        """
+        Critério: Decimal, UUID e datas são codificados sem conversão prévia.
+        """
+        pk = uuid.uuid4()
+        data = {
+            'amount': Decimal('10.50'),
+            'uuid': pk,
+            'paid_at': date(2025, 1, 10),
+            'created_at': datetime(2025, 1, 10, 12, 0, tzinfo=timezone.utc),
+        }
+
+        rendered = json.loads(FastJSONRenderer().render(data))
+
+        self.assertEqual(rendered, {
+            'amount': '10.50',
+            'uuid': str(pk),
+            'paid_at': '2025-01-10',
+            'created_at': '2025-01-10T12:00:00Z',
+        })
+
+@override_settings(RESPONSE_COMPRESSION_MIN_SIZE=100)
+class CompressionMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.body = b'{"details_by_day": "' + b'x' * 2000 + b'"}'
+
+    def _process(self, accept_encoding, body):
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING=accept_encoding)
+        middleware = CompressionMiddleware(lambda r: HttpResponse(body))
+        return middleware(request)
+
+    def test_gzip_above_threshold(self):
+        """
+        Critério: respostas acima do limite são comprimidas na codificação aceita.
+        """
+        response = self._process('gzip', self.body)
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), self.body)
+
+    def test_small_responses_are_not_compressed(self):
+        """
+        Critério: respostas abaixo do limite seguem sem compressão.
+        """
+        response = self._process('gzip, br', b'{}')
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_negotiation_respects_weights(self):
+        self.assertEqual(negotiate_encoding('gzip;q=0, deflate'), None)
+        self.assertEqual(negotiate_encoding('gzip;q=1.0, identity; q=0.5'), 'gzip')
@@ -0,0 +1,100 @@
+from django.core.cache import caches
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from backend.cache import report_cache
+from backend.models import Title
+from backend.tests.fixtures import LedgerFixture
+from datetime import date
+from decimal import Decimal
+
+class DREReportCacheTests(LedgerFixture, APITestCase):
+    def setUp(self):
+        """
+        Payload de configuração de teste
+        """
+        caches['reports'].clear()
+        report_cache.reset_stats()
+
+        self.authenticate()
+
+        self.create_ledger()
+        self.title = self.create_title('100.00', preset=self.create_preset())
+        self.create_entry(self.title, '40.00', description="Recebimento")
+
+        self.url = reverse('dre-report')
+        self.params = {'company': str(self.company.uuid), 'start': '2025-01-01', 'end': '2025-01-31'}
+
+    def test_second_request_is_served_from_cache(self):
+        """
+        Critério: a mesma DRE consultada duas vezes só é calculada uma vez.
+        """
+        first = self.client.get(self.url, self.params)
+        second = self.client.get(self.url, self.params)
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(report_cache.stats()['hits'], 1)
+        self.assertEqual(report_cache.stats()['misses'], 1)
+
+    def test_new_entry_invalidates_company_reports(self):
+        """
+        Critério: uma nova baixa na empresa faz a DRE ser recalculada.
+        """
+        self.client.get(self.url, self.params)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_entry(self.title, '10.00', date(2025, 1, 15), 'cash', description="Recebimento")
+
+        response = self.client.get(self.url, self.params)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(Decimal(response.data['totals']['revenues']), Decimal('50.00'))
+
+    def test_title_moved_to_other_company_invalidates_both(self):
+        """
+        Critério: ao trocar a empresa do título, a DRE da empresa anterior também é recalculada.
+        """
+        other = self.create_company(
+            self.company.address, cnpj="98765432000199", fantasy_name="Outra", social_reason="Outra LTDA",
+            email="contato@outra.com",
+        )
+        other_params = {**self.params, 'company': str(other.uuid)}
+        self.client.get(self.url, self.params)
+        self.client.get(self.url, other_params)
+
+        title = Title.objects.get(pk=self.title.pk)
+        title.company = other
+        with self.captureOnCommitCallbacks(execute=True):
+            title.save()
+
+        response = self.client.get(self.url, self.params)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(Decimal(response.data['totals']['revenues']), Decimal('0'))
+        self.assertEqual(self.client.get(self.url, other_params)['X-Cache'], 'MISS')
+
+    def test_detail_amounts_are_strings(self):
+        """
+        Critério: os valores do detalhamento por dia são strings decimais, com ou sem cache.
+        """
+        for expected_cache in ('MISS', 'HIT'):
+            response = self.client.get(self.url, self.params)
+            self.assertEqual(response['X-Cache'], expected_cache)
+            self.assertEqual(response.data['details_by_day']['2025-01-10'][0]['amount'], '40.00')
+
+    def test_uuid_spelling_shares_version(self):
+        """
+        Critério: o UUID em maiúsculas ou sem hífens usa a mesma versão e também é invalidado.
+        """
+        spellings = [str(self.company.uuid).upper(), self.company.uuid.hex]
+        for company in spellings:
+            self.client.get(self.url, {**self.params, 'company': company})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_entry(self.title, '10.00', date(2025, 1, 15), 'cash', description="Recebimento")
+
+        responses = [self.client.get(self.url, {**self.params, 'company': company}) for company in spellings]
+        self.assertEqual([r['X-Cache'] for r in responses], ['MISS', 'HIT'])
+        for response in responses:
+            self.assertEqual(Decimal(response.data['totals']['revenues']), Decimal('50.00'))
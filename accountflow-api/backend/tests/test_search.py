@@ -0,0 +1,129 @@
+from django.contrib import admin
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from backend.models import Company, BillingAccount, SearchDocument, Title
+from backend.search import rebuild, search
+from backend.tests.fixtures import LedgerFixture
+from datetime import date
+from decimal import Decimal
+
+class SearchTests(LedgerFixture, APITestCase):
+    def setUp(self):
+        """
+        Payload de configuração de teste
+        """
+        self.authenticate()
+
+        self.create_ledger(root="Despesas", cash="Manutenção de Equipamentos", cnpj="12.345.678/0001-99")
+        self.other = self.create_company(
+            self.company.address, cnpj="98765432000155", fantasy_name="Oficina Central",
+            social_reason="Oficina Central ME", cnae="4520-0/01", type_of="Supplier", email="contato@oficina.com",
+            phone="44988776655",
+        )
+        self.account = self.cash
+        self.preset = self.create_preset()
+        self.title = self._title("Manutenção preventiva do ar-condicionado", self.company)
+        self._title("Manutenção da manutenção mensal", self.other)
+
+        self.url = reverse('search')
+
+    def _title(self, description, company):
+        return self.create_title('100.00', 'expense', description, company=company, preset=self.preset)
+
+    def test_prefix_search_ignores_accents_and_ranks(self):
+        """
+        Critério: "manut" casa com "Manutenção" e o documento com mais ocorrências vem primeiro.
+        """
+        response = self.client.get(self.url, {'q': 'manut', 'kind': 'title'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        labels = [r['label'] for r in response.data['results']]
+        self.assertEqual(labels, ["Manutenção da manutenção mensal", "Manutenção preventiva do ar-condicionado"])
+
+    def test_all_terms_and_filters_are_applied(self):
+        """
+        Critério: todos os termos precisam casar; empresa e tipo restringem o resultado.
+        """
+        results = search('manutencao preventiva', company_id=self.company.uuid)
+        self.assertEqual([(r['kind'], r['id']) for r in results], [('title', str(self.title.uuid))])
+
+        kinds = {r['kind'] for r in search('manutencao', kinds=['account', 'company'])}
+        self.assertEqual(kinds, {'account'})
+
+        company = search('12345678')
+        self.assertEqual([r['id'] for r in company], [str(self.company.uuid)])
+
+    def test_index_follows_saves_and_deletes(self):
+        """
+        Critério: alterações e exclusões atualizam o índice sem reconstrução.
+        """
+        self.title.description = "Conserto do compressor"
+        self.title.save()
+        self.assertEqual([r['label'] for r in search('compressor')], ["Conserto do compressor"])
+        self.assertFalse(search('preventiva'))
+
+        self.title.delete()
+        self.assertFalse(search('compressor'))
+
+    def test_rebuild_restores_missing_documents(self):
+        """
+        Critério: a reconstrução recria documentos apagados e descarta órfãos.
+        """
+        SearchDocument.objects.filter(kind='title').delete()
+        SearchDocument.objects.create(kind='title', object_id='orfao', label="Órfão", content="orfao")
+
+        counts = rebuild(['title'])
+
+        self.assertEqual(counts, {'title': 2})
+        self.assertEqual(len(search('manutencao', kinds=['title'])), 2)
+        self.assertFalse(search('orfao'))
+
+    def test_invalid_parameters_are_rejected(self):
+        """
+        Critério: q é obrigatório e kind precisa ser válido.
+        """
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {'q': 'x', 'kind': 'entry'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_out_of_range_limit_is_clamped(self):
+        """
+        Critério: limit zero ou negativo devolve ao menos um resultado, sem erro.
+        """
+        for limit in ('0', '-5'):
+            response = self.client.get(self.url, {'q': 'manut', 'limit': limit})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data['count'], 1)
+
+    def test_admin_search_uses_index(self):
+        """
+        Critério: a busca do admin de títulos, empresas e contas usa o índice (sem acento, por prefixo).
+        """
+        cases = [
+            (Title, 'manutencao preventiva', [self.title.pk]),
+            (Company, 'oficina', [self.other.pk]),
+            (BillingAccount, 'manutencao equip', [self.account.pk]),
+        ]
+        for model, term, expected in cases:
+            model_admin = admin.site._registry[model]
+            queryset, may_have_duplicates = model_admin.get_search_results(None, model.objects.all(), term)
+            self.assertEqual([obj.pk for obj in queryset], expected)
+            self.assertFalse(may_have_duplicates)
+
+    def test_admin_search_keeps_default_fields_and_has_no_cap(self):
+        """
+        Critério: o admin soma aos resultados do índice os de ``search_fields`` (ex.: data), sem teto de 1000.
+        """
+        model_admin = admin.site._registry[Title]
+        queryset, _ = model_admin.get_search_results(None, Title.objects.all(), '2025-01-10')
+        self.assertEqual(queryset.count(), 2)
+
+        Title.objects.bulk_create([
+            Title(description=f"Manutenção extra {n}", amount=Decimal('1.00'), expiration_date=date(2025, 2, 1),
+                  company=self.company, type_of='expense')
+            for n in range(1100)
+        ])
+        rebuild(['title'])
+        queryset, _ = model_admin.get_search_results(None, Title.objects.all(), 'manutencao extra')
+        self.assertEqual(queryset.count(), 1100)
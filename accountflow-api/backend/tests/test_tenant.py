@@ -0,0 +1,79 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from backend.models import Title, Entry
+from backend.tests.fixtures import LedgerFixture
+
+class TenantScopingTests(LedgerFixture, TestCase):
+    def setUp(self):
+        """
+        Payload de configuração de teste
+        """
+        self.create_ledger(root="Ativo", fantasy_name="Empresa A", social_reason="Empresa A")
+        self.other = self.create_company(
+            self.company.address, cnpj="98765432000199", fantasy_name="Empresa B", social_reason="Empresa B",
+        )
+        self.title = self.create_title('100.00')
+        self.entry = self.create_entry(self.title, '40.00', description="Recebimento")
+
+    def test_entry_inherits_title_company(self):
+        """
+        Critério: a baixa carrega a empresa do título e é encontrada sem join.
+        """
+        self.assertEqual(self.entry.company_id, self.company.pk)
+        self.assertEqual(list(Entry.objects.for_company(self.company.pk)), [self.entry])
+        self.assertFalse(Entry.objects.for_company(self.other.pk).exists())
+
+    def test_title_company_change_moves_entries(self):
+        """
+        Critério: ao trocar a empresa do título, as baixas acompanham.
+        """
+        self.title.company = self.other
+        self.title.save()
+
+        self.entry.refresh_from_db()
+        self.assertEqual(self.entry.company_id, self.other.pk)
+
+    def test_title_company_change_touches_entries(self):
+        """
+        Critério: as baixas movidas com o título têm ``updated_at`` atualizado (ETag/Last-Modified).
+        """
+        before = self.entry.updated_at
+        self.title.company = self.other
+        self.title.save()
+
+        self.entry.refresh_from_db()
+        self.assertGreater(self.entry.updated_at, before)
+
+    def test_rebuild_active_flags(self):
+        """
+        Critério: o recálculo em lote corrige apenas os flags divergentes.
+        """
+        paid = self.create_title('40.00', description="Quitado")
+        self.create_entry(paid, '40.00', description="Recebimento")
+        Title.objects.filter(pk=paid.pk).update(active=True)
+        Title.objects.filter(pk=self.title.pk).update(active=False)
+        untouched = self.create_title('10.00', 'expense', "Outro", company=self.other)
+
+        changed, companies = Title.objects.rebuild_active_flags()
+
+        self.assertEqual(changed, 2)
+        self.assertEqual(companies, {self.company.pk})
+        self.assertFalse(Title.objects.get(pk=paid.pk).active)
+        self.assertTrue(Title.objects.get(pk=self.title.pk).active)
+        self.assertTrue(Title.objects.get(pk=untouched.pk).active)
+        self.assertEqual(Title.objects.for_company(self.company.pk).rebuild_active_flags(), (0, set()))
+
+    def test_malformed_company_filter_is_rejected(self):
+        """
+        Critério: ``?company=`` que não é UUID retorna 400 nas listagens e exportações.
+        """
+        client = APIClient()
+        client.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        urls = [reverse(name) for name in ('title-list', 'title-export', 'entry-export')]
+        for url in urls + [reverse('entry-list', args=[self.title.pk])]:
+            response = client.get(url, {'company': 'bad'})
+            self.assertEqual(response.status_code, 400, url)
+        response = client.get(reverse('title-list'), {'company': str(self.company.pk).upper()})
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,89 @@
+from django.core.cache import caches
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from backend.reports import TIME_SERIES_MAX_POINTS, build_cash_flow, build_time_series
+from backend.tests.fixtures import LedgerFixture
+from datetime import date
+from decimal import Decimal
+
+class TimeSeriesTests(LedgerFixture, APITestCase):
+    def setUp(self):
+        """
+        Payload de configuração de teste
+        """
+        caches['reports'].clear()
+        self.authenticate()
+
+        self.create_ledger()
+        preset = self.create_preset()
+        sale = self.create_title('1000.00', preset=preset)
+        rent = self.create_title('1000.00', 'expense', "Aluguel", preset=preset)
+        for title, amount, paid_at in (
+            (sale, '10.00', date(2025, 1, 6)),
+            (sale, '20.00', date(2025, 1, 8)),
+            (rent, '5.00', date(2025, 1, 14)),
+            (sale, '30.00', date(2025, 3, 3)),
+            (sale, '40.00', date(2026, 2, 2)),
+        ):
+            self.create_entry(title, amount, paid_at)
+
+        self.url = reverse('time-series')
+
+    def test_weekly_series_are_bucketed_and_zero_filled(self):
+        """
+        Critério: receita, despesa e saldo por semana, com semanas sem baixas zeradas.
+        """
+        response = self.client.get(self.url, {
+            'company': str(self.company.uuid), 'start': '2025-01-06', 'end': '2025-01-26', 'bucket': 'week',
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['labels'], ['2025-01-06', '2025-01-13', '2025-01-20'])
+        self.assertEqual([Decimal(v) for v in response.data['revenue']], [Decimal('30'), Decimal('0'), Decimal('0')])
+        self.assertEqual([Decimal(v) for v in response.data['net']], [Decimal('30'), Decimal('-5'), Decimal('0')])
+
+    def test_max_points_coarsens_the_bucket(self):
+        """
+        Critério: com max_points, a granularidade sobe até a série caber.
+        """
+        with self.assertNumQueries(1):
+            result = build_time_series(self.company.uuid, date(2025, 1, 1), date(2026, 12, 31), 'day', max_points=30)
+
+        self.assertEqual(result['bucket'], 'month')
+        self.assertEqual(len(result['labels']), 24)
+        self.assertEqual(Decimal(result['revenue'][2]), Decimal('30.00'))
+
+    def test_max_points_merges_neighbouring_buckets(self):
+        """
+        Critério: se nem o ano cabe em max_points, intervalos vizinhos são somados.
+        """
+        result = build_time_series(self.company.uuid, date(2020, 1, 1), date(2026, 12, 31), 'year', max_points=3)
+
+        self.assertEqual(result['merged'], 3)
+        self.assertEqual(result['labels'], ['2020-01-01', '2023-01-01', '2026-01-01'])
+        self.assertEqual([Decimal(v) for v in result['revenue']], [Decimal('0'), Decimal('60'), Decimal('40')])
+
+    def test_unbounded_ranges_are_capped(self):
+        """
+        Critério: sem max_points, um intervalo de milênios até 9999-12-31 é limitado e não estoura o calendário.
+        """
+        response = self.client.get(self.url, {
+            'company': str(self.company.uuid), 'start': '0001-01-01', 'end': '9999-12-31', 'bucket': 'day',
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertLessEqual(len(response.data['labels']), TIME_SERIES_MAX_POINTS)
+        self.assertEqual(response.data['bucket'], 'year')
+
+        result = build_time_series(self.company.uuid, date(9999, 12, 25), date(9999, 12, 31), 'week')
+        self.assertEqual(result['labels'], ['9999-12-20', '9999-12-27'])
+        cash_flow = build_cash_flow(self.company.uuid, date(9998, 1, 1), date(9999, 12, 31), 'year')
+        self.assertEqual([p['period'] for p in cash_flow['periods']], ['9998', '9999'])
+
+    def test_malformed_company_is_rejected(self):
+        """
+        Critério: company que não é UUID retorna 400.
+        """
+        response = self.client.get(self.url, {'company': 'bad', 'start': '2025-01-01', 'end': '2025-01-31'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,97 @@
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from backend.models import BillingAccount, Budget
+from backend.tests.fixtures import LedgerFixture
+from backend.validation import validation_scope
+from datetime import date
+from decimal import Decimal
+
+class ValidationContextTests(LedgerFixture, APITestCase):
+    def setUp(self):
+        """
+        Payload de configuração de teste
+        """
+        self.authenticate()
+
+        self.create_ledger(root="Ativo")
+        self.preset = self.create_preset(revenue_account=self.cash, expense_account=self.cash)
+        self.title = self.create_title('100.00', preset=self.preset)
+
+    def _entry_payload(self, amount):
+        return {
+            'title': str(self.title.pk), 'description': "Recebimento", 'amount': amount,
+            'paid_at': '2025-01-10', 'payment_method': 'pix', 'billing_account': str(self.cash.pk),
+        }
+
+    def test_entry_post_shares_queries_between_serializer_and_model(self):
+        """
+        Critério: título, preset, contas e planos em uma consulta; total baixado lido uma vez.
+        """
+        with self.assertNumQueries(12):
+            response = self.client.post(
+                reverse('entry-list', args=[self.title.pk]), self._entry_payload('10.00'), format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_title_put_loads_preset_graph_once(self):
+        """
+        Critério: preset com as quatro contas numa consulta, sem checar de novo as FKs já carregadas.
+        """
+        with self.assertNumQueries(9):
+            response = self.client.put(reverse('title-detail', args=[self.title.pk]), {
+                'description': "Venda ajustada", 'amount': '100.00', 'expiration_date': '2025-02-01',
+                'company': str(self.company.pk), 'type_of': 'income', 'preset': str(self.preset.pk),
+            }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_overpayment_is_still_rejected(self):
+        """
+        Critério: as regras continuam valendo com o cache compartilhado.
+        """
+        url = reverse('entry-list', args=[self.title.pk])
+        self.assertEqual(self.client.post(url, self._entry_payload('60.00'), format='json').status_code, 201)
+        response = self.client.post(url, self._entry_payload('50.00'), format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('Restante: R$ 40.00', str(response.data['amount']))
+
+    def test_scope_totals_follow_writes(self):
+        """
+        Critério: no mesmo escopo, o total é recalculado após cada baixa gravada.
+        """
+        with validation_scope():
+            for amount in ('60.00', '40.00'):
+                self.create_entry(self.title, amount)
+            with self.assertRaises(ValidationError):
+                self.create_entry(self.title, '0.01', description="Excedente")
+
+        self.title.refresh_from_db()
+        self.assertFalse(self.title.active)
+
+    def test_unique_checks_still_cover_loaded_relations(self):
+        """
+        Critério: no escopo, conta com código repetido no plano é ValidationError, não IntegrityError.
+        """
+        with validation_scope():
+            duplicate = BillingAccount(
+                name="Caixa repetido", billing_plan=self.cash.billing_plan, parent=self.cash.parent,
+                account_type=BillingAccount.AccountType.ANALYTIC, code=self.cash.code,
+            )
+            with self.assertRaises(ValidationError) as ctx:
+                duplicate.save()
+
+        self.assertIn('__all__', ctx.exception.message_dict)
+
+    def test_unique_constraints_still_cover_loaded_relations(self):
+        """
+        Critério: no escopo, orçamento repetido (empresa, conta, mês) é ValidationError, não IntegrityError.
+        """
+        Budget.objects.create(company=self.company, account=self.cash, month=date(2025, 1, 1), amount=Decimal('10'))
+
+        with validation_scope():
+            with self.assertRaises(ValidationError):
+                Budget.objects.create(
+                    company=self.company, account=self.cash, month=date(2025, 1, 1), amount=Decimal('20')
+                )
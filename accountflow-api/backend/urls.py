@@ -18,23 +18,45 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from backend.views import (
-  AddressList,
-  AddressDetail,
-  CompanyList,
-  CompanyDetail,
-  BillingPlanList,
-  BillingPlanDetail,
-  BillingAccountList,
-  BillingAccountDetail,
-  BillingAccountListDetail,
-  PresetList,
-  PresetDetail,
-  TitleList,
-  TitleDetail,
-  EntryList,
-  EntryDetail,
-  LogoutView,
+    AddressList,
+    AddressDetail,
+    CompanyList,
+    CompanyDetail,
+    BillingPlanList,
+    BillingPlanDetail,
+    BillingAccountList,
+    BillingAccountDetail,
+    BillingAccountListDetail,
+    PresetList,
+    PresetDetail,
+    TitleList,
+    TitleDetail,
+    EntryList,
+    EntryDetail,
+    CompanyExport,
+    BillingAccountExport,
+    PresetExport,
+    TitleExport,
+    EntryExport,
+    LogoutView,
     DREReportView,
+    BalanceSheetView,
+    CashFlowReportView,
+    DashboardView,
+    SearchView,
+    TimeSeriesView,
+    BudgetImportView,
+    CompanyImportView,
+    BillingPlanImportView,
+    BillingPlanCloneView,
+    BudgetReportView,
+    LedgerVerifyView,
+    DREReportAsyncView,
+    CompanyExportAsync,
+    BillingAccountExportAsync,
+    PresetExportAsync,
+    TitleExportAsync,
+    EntryExportAsync,
 )
 from rest_framework.authtoken import views as authtoken_views
 
@@ -48,6 +70,8 @@ urlpatterns = [
     path('company/<uuid:pk>/', CompanyDetail.as_view(), name='company-detail'),
     path('billing-plan/', BillingPlanList.as_view(), name='billing-plan-list'),
     path('billing-plan/<uuid:pk>/', BillingPlanDetail.as_view(), name='billing-plan-detail'),
+    path('billing-plan/import/', BillingPlanImportView.as_view(), name='billing-plan-import'),
+    path('billing-plan/<uuid:pk>/clone/', BillingPlanCloneView.as_view(), name='billing-plan-clone'),
     path('billing-account/', BillingAccountList.as_view(), name='billing-account-list'),
     path('billing-account/<uuid:pk>/', BillingAccountDetail.as_view(), name='billing-account-detail'),
     path(
@@ -63,4 +87,24 @@ urlpatterns = [
     path('entries/<uuid:pk>/', EntryDetail.as_view(), name='entry-detail')
     ,
     path('reports/dre/', DREReportView.as_view(), name='dre-report'),
+    path('search/', SearchView.as_view(), name='search'),
+    path('reports/dashboard/', DashboardView.as_view(), name='dashboard'),
+    path('reports/time-series/', TimeSeriesView.as_view(), name='time-series'),
+    path('reports/cash-flow/', CashFlowReportView.as_view(), name='cash-flow-report'),
+    path('company/import/', CompanyImportView.as_view(), name='company-import'),
+    path('budget/import/', BudgetImportView.as_view(), name='budget-import'),
+    path('reports/budget-vs-actual/', BudgetReportView.as_view(), name='budget-report'),
+    path('reports/balance-sheet/', BalanceSheetView.as_view(), name='balance-sheet'),
+    path('reports/ledger-check/', LedgerVerifyView.as_view(), name='ledger-check'),
+    path('company/export/', CompanyExport.as_view(), name='company-export'),
+    path('billing-account/export/', BillingAccountExport.as_view(), name='billing-account-export'),
+    path('preset/export/', PresetExport.as_view(), name='preset-export'),
+    path('title/export/', TitleExport.as_view(), name='title-export'),
+    path('entries/export/', EntryExport.as_view(), name='entry-export'),
+    path('reports/dre/async/', DREReportAsyncView.as_view(), name='dre-report-async'),
+    path('company/export/async/', CompanyExportAsync.as_view(), name='company-export-async'),
+    path('billing-account/export/async/', BillingAccountExportAsync.as_view(), name='billing-account-export-async'),
+    path('preset/export/async/', PresetExportAsync.as_view(), name='preset-export-async'),
+    path('title/export/async/', TitleExportAsync.as_view(), name='title-export-async'),
+    path('entries/export/async/', EntryExportAsync.as_view(), name='entry-export-async'),
 ]
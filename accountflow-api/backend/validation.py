@@ -0,0 +1,95 @@
+"""
+Contexto de validação por requisição.
+
+Numa escrita pela API as mesmas regras rodam duas vezes: no ``validate`` do
+serializer e no ``clean`` do modelo (``ModelBasedMixin.save`` chama
+``full_clean``). Para não repetir consultas entre as duas passadas:
+
+- os serializers carregam título, preset, contas e planos com ``select_related``
+  (``TITLE_GRAPH``/``PRESET_GRAPH``), e o modelo recebe as mesmas instâncias;
+- dentro de ``validation_scope()`` (aberto pelo ValidationContextMiddleware), os
+  totais baixados por título são calculados uma vez e compartilhados. O
+  ``full_clean`` também não confere de novo a existência de FKs cujo objeto já
+  foi lido do banco. A constraint do banco continua garantindo a integridade.
+
+Fora de um escopo tudo funciona como antes, sem cache.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from decimal import Decimal
+
+from django.db.models import Count, Sum
+
+PRESET_ACCOUNTS = ('payable_account', 'receivable_account', 'revenue_account', 'expense_account')
+PRESET_GRAPH = tuple(f'{account}__billing_plan' for account in PRESET_ACCOUNTS)
+TITLE_GRAPH = tuple(f'preset__{path}' for path in PRESET_GRAPH)
+
+_scope = ContextVar('validation_scope', default=None)
+
+
+@contextmanager
+def validation_scope():
+    """Abre (ou reaproveita) o cache de validação do contexto atual."""
+    if _scope.get() is not None:
+        yield
+        return
+    token = _scope.set({})
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+def in_scope():
+    return _scope.get() is not None
+
+def _cached(key, compute):
+    cache = _scope.get()
+    if cache is None:
+        return compute()
+    if key not in cache:
+        cache[key] = compute()
+    return cache[key]
+
+def forget_title(title_id):
+    """Descarta os totais do título (depois de gravar ou remover uma baixa)."""
+    cache = _scope.get()
+    if cache:
+        for key in [k for k in cache if k[0] == 'payments' and k[1] == title_id]:
+            del cache[key]
+
+def title_payments(title_id, exclude_entry=None):
+    """``(quantidade, total)`` das baixas do título, sem ``exclude_entry``."""
+    def compute():
+        from .models import Entry
+
+        queryset = Entry.objects.filter(title_id=title_id)
+        if exclude_entry is not None:
+            queryset = queryset.exclude(pk=exclude_entry)
+        row = queryset.aggregate(count=Count('pk'), total=Sum('amount'))
+        return row['count'], row['total'] or Decimal('0')
+
+    return _cached(('payments', title_id, exclude_entry), compute)
+
+def paid_total(title_id, exclude_entry=None):
+    return title_payments(title_id, exclude_entry)[1]
+
+def cached_paid_total(title_id, exclude_entry=None):
+    """Total já calculado neste escopo, ou None (sem nova consulta)."""
+    cached = (_scope.get() or {}).get(('payments', title_id, exclude_entry))
+    return cached[1] if cached else None
+
+def loaded_relations(instance):
+    """
+    FKs de ``instance`` cujo objeto relacionado já veio do banco nesta requisição;
+    ``clean_fields`` pode pular a consulta de existência delas.
+    """
+    if not in_scope():
+        return []
+    loaded = []
+    for field in instance._meta.concrete_fields:
+        if not field.is_relation or not field.many_to_one or not field.is_cached(instance):
+            continue
+        related = field.get_cached_value(instance)
+        if related is not None and not related._state.adding and related.pk == getattr(instance, field.attname):
+            loaded.append(field.name)
+    return loaded
@@ -1,18 +1,41 @@
-from django.http import Http404
+import csv
+import uuid
+from datetime import date
+
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from django.views import View
+from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated, ParseError
 from rest_framework.generics import GenericAPIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.pagination import PageNumberPagination
-from django.db.models import Sum, F
-from django.db.models.functions import TruncMonth
+from rest_framework.parsers import JSONParser, MultiPartParser
 
-from rest_framework.authentication import TokenAuthentication
-from rest_framework.permissions import DjangoModelPermissions, IsAuthenticated
+from rest_framework.permissions import DjangoModelPermissions, IsAdminUser, IsAuthenticated
 from django.core.exceptions import ValidationError
 # Modelos Personalizados
-from .models import Address, Company, BillingPlan, BillingAccount, Preset, Title, Entry
+from .mixins import ConditionalGetMixin, IdempotencyMixin
+from .models import Address, Company, BillingPlan, BillingAccount, Budget, Preset, SearchDocument, Title, Entry
 
 from .serializers import AddressSerializer, CompanySerializer, BillingPlanSerializer, BillingAccountSerializer, PresetSerializer, TitleSerializer, EntrySerializer
+from .serializers import CompanyReadSerializer, BillingAccountReadSerializer, PresetReadSerializer, TitleReadSerializer, EntryReadSerializer
+from .reports import (
+    CASH_FLOW_GRANULARITIES, TIME_SERIES_BUCKETS, abuild_dre, build_cash_flow, build_dashboard, build_dre,
+    TIME_SERIES_MAX_POINTS, build_dre_comparison, build_time_series, shift_period,
+)
+from .balance import build_balance_sheet
+from .search import search
+from .budget import BUDGET_BASES, build_budget_report, import_budget_csv
+from .importers import import_companies, parse_company_csv
+from .plans import ChartError, clone_plan, import_chart, tree_from_csv, tree_from_json
+from .renderers import FastJSONRenderer
+from .parsers import CSVTextParser
+from .cache import report_cache
+from .authentication import CachedTokenAuthentication
+from .ledger import is_clean, verify_ledger
+from .routers import current_read_alias
 
 def get_object_by_pk(model, pk):
     try:
@@ -20,13 +43,24 @@ def get_object_by_pk(model, pk):
     except model.DoesNotExist:
         raise Http404
 
+def uuid_param(params, name='company'):
+    """UUID do parâmetro ``name`` da query string, ou None se ausente; ParseError (400) se malformado."""
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        raise ParseError(f'{name} deve ser um UUID')
+
 class StandardResultsSetPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 100
 
-class AddressList(GenericAPIView):
-    authentication_classes = [TokenAuthentication]
+class AddressList(ConditionalGetMixin, GenericAPIView):
+    read_replica = True
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [DjangoModelPermissions]
     queryset = Address.objects.all()
     serializer_class = AddressSerializer
@@ -34,6 +68,9 @@ class AddressList(GenericAPIView):
 
     def get(self, request, format=None):
         items = self.get_queryset()
+        not_modified = self.check_not_modified(request, queryset=items)
+        if not_modified is not None:
+            return not_modified
         page = self.paginate_queryset(items)
         if page is not None:
             serializer = self.serializer_class(page, many=True)
@@ -47,14 +84,17 @@ class AddressList(GenericAPIView):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class AddressDetail(GenericAPIView):
-    authentication_classes = [TokenAuthentication]
+class AddressDetail(ConditionalGetMixin, GenericAPIView):
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [DjangoModelPermissions]
     queryset = Address.objects.all()
     serializer_class = AddressSerializer
 
     def get(self, request, pk, format=None):
         item = get_object_by_pk(Address, pk)
+        not_modified = self.check_not_modified(request, obj=item)
+        if not_modified is not None:
+            return not_modified
         serializer = self.serializer_class(item)
         return Response(serializer.data)
     def put(self, request, pk, format=None):
@@ -69,11 +109,13 @@ class AddressDetail(GenericAPIView):
         item.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
-class CompanyList(GenericAPIView):
-    authentication_classes = [TokenAuthentication]
+class CompanyList(ConditionalGetMixin, GenericAPIView):
+    read_replica = True
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [DjangoModelPermissions]
     queryset = Company.objects.all()
     serializer_class = CompanySerializer
+    read_serializer_class = CompanyReadSerializer
     pagination_class = StandardResultsSetPagination
 
     def get_queryset(self):
@@ -81,18 +123,20 @@ class CompanyList(GenericAPIView):
 
     def get(self, request, format=None):
         items = self.get_queryset()
+        not_modified = self.check_not_modified(request, queryset=items)
+        if not_modified is not None:
+            return not_modified
+        reader = self.read_serializer_class(fields=request.query_params.get('fields'))
+        rows = reader.values(items)
         # Se o parâmetro 'no_pagination' estiver presente, retorna lista completa
         if request.query_params.get('no_pagination') == 'true':
-            serializer = self.serializer_class(items, many=True)
-            return Response(serializer.data)
+            return Response(reader.serialize(rows))
         
         # Caso contrário, retorna paginado
-        page = self.paginate_queryset(items)
+        page = self.paginate_queryset(rows)
         if page is not None:
-            serializer = self.serializer_class(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        serializer = self.serializer_class(items, many=True)
-        return Response(serializer.data)
+            return self.get_paginated_response(reader.serialize(page))
+        return Response(reader.serialize(rows))
     def post(self, request, format=None):
         serializer = self.serializer_class(data=request.data)
         if serializer.is_valid():
@@ -100,14 +144,17 @@ class CompanyList(GenericAPIView):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class CompanyDetail(GenericAPIView):
-    authentication_classes = [TokenAuthentication]
+class CompanyDetail(ConditionalGetMixin, GenericAPIView):
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [DjangoModelPermissions]
     queryset = Company.objects.all()
     serializer_class = CompanySerializer
 
     def get(self, request, pk, format=None):
         item = get_object_by_pk(Company, pk)
+        not_modified = self.check_not_modified(request, obj=item)
+        if not_modified is not None:
+            return not_modified
         serializer = self.serializer_class(item)
         return Response(serializer.data)
     def put(self, request, pk, format=None):
@@ -122,8 +169,9 @@ class CompanyDetail(GenericAPIView):
         item.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
-class BillingPlanList(GenericAPIView):
-    authentication_classes = [TokenAuthentication]
+class BillingPlanList(ConditionalGetMixin, GenericAPIView):
+    read_replica = True
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [DjangoModelPermissions]
     queryset = BillingPlan.objects.all()
     serializer_class = BillingPlanSerializer
@@ -131,6 +179,9 @@ class BillingPlanList(GenericAPIView):
     
     def get(self, request, format=None):
         items = self.get_queryset().order_by('name')
+        not_modified = self.check_not_modified(request, queryset=items)
+        if not_modified is not None:
+            return not_modified
         page = self.paginate_queryset(items)
         if page is not None:
             serializer = self.serializer_class(page, many=True)
@@ -144,14 +195,17 @@ class BillingPlanList(GenericAPIView):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class BillingPlanDetail(GenericAPIView):
-    authentication_classes = [TokenAuthentication]
+class BillingPlanDetail(ConditionalGetMixin, GenericAPIView):
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [DjangoModelPermissions]
     queryset = BillingPlan.objects.all()
     serializer_class = BillingPlanSerializer
 
     def get(self, request, pk, format=None):
         item = get_object_by_pk(BillingPlan, pk)
+        not_modified = self.check_not_modified(request, obj=item)
+        if not_modified is not None:
+            return not_modified
         serializer = self.serializer_class(item)
         return Response(serializer.data)
     def put(self, request, pk, format=None):
@@ -170,21 +224,28 @@ class BillingPlanDetail(GenericAPIView):
         except ProtectedError as e:
             return Response({"error": "Registro possui dependências e não pode ser excluído."}, status=400)
 
-class BillingAccountList(GenericAPIView):
-    authentication_classes = [TokenAuthentication]
+class BillingAccountList(ConditionalGetMixin, GenericAPIView):
+    read_replica = True
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [DjangoModelPermissions]
     queryset = BillingAccount.objects.all()
     serializer_class = BillingAccountSerializer
+    read_serializer_class = BillingAccountReadSerializer
     pagination_class = StandardResultsSetPagination
+    # parent_name e billing_plan_name vêm dessas tabelas
+    conditional_related = ('billing_plan', 'parent')
     
     def get(self, request, format=None):
         items = self.get_queryset().select_related('billing_plan', 'parent').order_by('code')
-        page = self.paginate_queryset(items)
+        not_modified = self.check_not_modified(request, queryset=items)
+        if not_modified is not None:
+            return not_modified
+        reader = self.read_serializer_class(fields=request.query_params.get('fields'))
+        rows = reader.values(items)
+        page = self.paginate_queryset(rows)
         if page is not None:
-            serializer = self.serializer_class(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        serializer = self.serializer_class(items, many=True)
-        return Response(serializer.data)
+            return self.get_paginated_response(reader.serialize(page))
+        return Response(reader.serialize(rows))
     def post(self, request, format=None):
         serializer = self.serializer_class(data=request.data)
         if serializer.is_valid():
@@ -192,14 +253,19 @@ class BillingAccountList(GenericAPIView):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class BillingAccountDetail(GenericAPIView):
-    authentication_classes = [TokenAuthentication]
+class BillingAccountDetail(ConditionalGetMixin, GenericAPIView):
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [DjangoModelPermissions]
     queryset = BillingAccount.objects.all()
     serializer_class = BillingAccountSerializer
+    # parent_name e billing_plan_name vêm dessas tabelas
+    conditional_related = ('billing_plan', 'parent')
 
     def get(self, request, pk, format=None):
         item = get_object_by_pk(BillingAccount, pk)
+        not_modified = self.check_not_modified(request, obj=item)
+        if not_modified is not None:
+            return not_modified
         serializer = self.serializer_class(item)
         return Response(serializer.data)
     def put(self, request, pk, format=None):
@@ -218,23 +284,30 @@ class BillingAccountDetail(GenericAPIView):
         except ProtectedError as e:
             return Response({"error": "Registro possui dependências e não pode ser excluído."}, status=400)
 
-class BillingAccountListDetail(GenericAPIView):
-    authentication_classes = [TokenAuthentication]
+class BillingAccountListDetail(ConditionalGetMixin, GenericAPIView):
+    read_replica = True
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [DjangoModelPermissions]
     queryset = BillingAccount.objects.all()
     serializer_class = BillingAccountSerializer
+    read_serializer_class = BillingAccountReadSerializer
     pagination_class=  None
 
     def get(self, request, pk, format=None):
         items = self.get_queryset().filter(billing_plan_id=pk).select_related('billing_plan', 'parent').order_by('code')
-        serializer = self.serializer_class(items, many=True)
-        return Response(serializer.data)
+        not_modified = self.check_not_modified(request, queryset=items)
+        if not_modified is not None:
+            return not_modified
+        reader = self.read_serializer_class(fields=request.query_params.get('fields'))
+        return Response(reader.serialize(reader.values(items)))
 
-class PresetList(GenericAPIView):
-    authentication_classes = [TokenAuthentication]
+class PresetList(ConditionalGetMixin, GenericAPIView):
+    read_replica = True
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [DjangoModelPermissions]
     queryset = Preset.objects.all()
     serializer_class = PresetSerializer
+    read_serializer_class = PresetReadSerializer
     pagination_class = StandardResultsSetPagination
 
     def get_queryset(self):
@@ -247,12 +320,15 @@ class PresetList(GenericAPIView):
 
     def get(self, request, format=None):
         items = self.get_queryset().order_by('-created_at')
-        page = self.paginate_queryset(items)
+        not_modified = self.check_not_modified(request, queryset=items)
+        if not_modified is not None:
+            return not_modified
+        reader = self.read_serializer_class(fields=request.query_params.get('fields'))
+        rows = reader.values(items)
+        page = self.paginate_queryset(rows)
         if page is not None:
-            serializer = self.serializer_class(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        serializer = self.serializer_class(items, many=True)
-        return Response(serializer.data)
+            return self.get_paginated_response(reader.serialize(page))
+        return Response(reader.serialize(rows))
     def post(self, request, format=None):
         serializer = self.serializer_class(data=request.data)
         if serializer.is_valid():
@@ -260,14 +336,17 @@ class PresetList(GenericAPIView):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class PresetDetail(GenericAPIView):
-    authentication_classes = [TokenAuthentication]
+class PresetDetail(ConditionalGetMixin, GenericAPIView):
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [DjangoModelPermissions]
     queryset = Preset.objects.all()
     serializer_class = PresetSerializer
 
     def get(self, request, pk, format=None):
         item = get_object_by_pk(Preset, pk)
+        not_modified = self.check_not_modified(request, obj=item)
+        if not_modified is not None:
+            return not_modified
         serializer = self.serializer_class(item)
         return Response(serializer.data)
     def put(self, request, pk, format=None):
@@ -286,27 +365,36 @@ class PresetDetail(GenericAPIView):
         except ProtectedError as e:
             return Response({"error": "Registro possui dependências e não pode ser excluído."}, status=400)
 
-class TitleList(GenericAPIView):
-    authentication_classes = [TokenAuthentication]
+class TitleList(IdempotencyMixin, ConditionalGetMixin, GenericAPIView):
+    read_replica = True
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [DjangoModelPermissions]
     queryset = Title.objects.all()
     serializer_class = TitleSerializer
+    read_serializer_class = TitleReadSerializer
     pagination_class = StandardResultsSetPagination
 
     def get_queryset(self):
-        return super().get_queryset().select_related(
+        queryset = super().get_queryset().select_related(
             'preset',
             'company',
         )
+        company_id = uuid_param(self.request.query_params)
+        if company_id:
+            queryset = queryset.for_company(company_id)
+        return queryset
 
     def get(self, request, format=None):
         items = self.get_queryset().order_by('-created_at') 
-        page = self.paginate_queryset(items)
+        not_modified = self.check_not_modified(request, queryset=items)
+        if not_modified is not None:
+            return not_modified
+        reader = self.read_serializer_class(fields=request.query_params.get('fields'))
+        rows = reader.values(items)
+        page = self.paginate_queryset(rows)
         if page is not None:
-            serializer = self.serializer_class(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        serializer = self.serializer_class(items, many=True)
-        return Response(serializer.data)
+            return self.get_paginated_response(reader.serialize(page))
+        return Response(reader.serialize(rows))
     def post(self, request, format=None):
         serializer = self.serializer_class(data=request.data)
         if serializer.is_valid():
@@ -320,14 +408,17 @@ class TitleList(GenericAPIView):
             return Response(self.serializer_class(instance).data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class TitleDetail(GenericAPIView):
-    authentication_classes = [TokenAuthentication]
+class TitleDetail(ConditionalGetMixin, GenericAPIView):
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [DjangoModelPermissions]
     queryset = Title.objects.all()
     serializer_class = TitleSerializer
 
     def get(self, request, pk, format=None):
         item = get_object_by_pk(Title, pk)
+        not_modified = self.check_not_modified(request, obj=item)
+        if not_modified is not None:
+            return not_modified
         serializer = self.serializer_class(item)
         return Response(serializer.data)
     def put(self, request, pk, format=None):
@@ -346,11 +437,13 @@ class TitleDetail(GenericAPIView):
         except ProtectedError as e:
             return Response({"error": "Registro possui dependências e não pode ser excluído."}, status=400)
 
-class EntryList(GenericAPIView):
-    authentication_classes = [TokenAuthentication]
+class EntryList(IdempotencyMixin, ConditionalGetMixin, GenericAPIView):
+    read_replica = True
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [DjangoModelPermissions]
     queryset = Entry.objects.all()
     serializer_class = EntrySerializer
+    read_serializer_class = EntryReadSerializer
     pagination_class = StandardResultsSetPagination
 
     def get_queryset(self):
@@ -358,18 +451,23 @@ class EntryList(GenericAPIView):
         title_id = self.kwargs.get('title_id')
         if title_id:
             queryset = queryset.filter(title_id=title_id)
+        company_id = uuid_param(self.request.query_params)
+        if company_id:
+            queryset = queryset.for_company(company_id)
         return queryset
 
     def get(self, request, title_id=None, format=None):
         qs = self.get_queryset()
         items = qs.order_by('-paid_at')
-        page = self.paginate_queryset(items)
+        not_modified = self.check_not_modified(request, queryset=items)
+        if not_modified is not None:
+            return not_modified
+        reader = self.read_serializer_class(fields=request.query_params.get('fields'))
+        rows = reader.values(items)
+        page = self.paginate_queryset(rows)
         if page is not None:
-            serializer = self.serializer_class(page, many=True)
-            return self.get_paginated_response(serializer.data)
-            
-        serializer = self.serializer_class(items, many=True)
-        return Response(serializer.data)
+            return self.get_paginated_response(reader.serialize(page))
+        return Response(reader.serialize(rows))
     
     def post(self, request, title_id=None, format=None):
         serializer = self.serializer_class(data=request.data)
@@ -382,8 +480,8 @@ class EntryList(GenericAPIView):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class EntryDetail(GenericAPIView):
-    authentication_classes = [TokenAuthentication]
+class EntryDetail(ConditionalGetMixin, GenericAPIView):
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [DjangoModelPermissions]
     queryset = Entry.objects.all()
     serializer_class = EntrySerializer
@@ -397,6 +495,9 @@ class EntryDetail(GenericAPIView):
 
     def get(self, request, pk, title_id=None, format=None):
         entry = self.get_object()
+        not_modified = self.check_not_modified(request, obj=entry)
+        if not_modified is not None:
+            return not_modified
         serializer = self.serializer_class(entry)
         return Response(serializer.data)
     
@@ -423,11 +524,87 @@ class EntryDetail(GenericAPIView):
         entry.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+class _Echo:
+    """Buffer mínimo para o csv.writer devolver cada linha em vez de gravá-la."""
+    def write(self, value):
+        return value
+
+class CSVExportView(GenericAPIView):
+    """
+    Exportação em CSV, transmitida linha a linha a partir do values() do modelo.
+    GET /api/v1/<recurso>/export/?fields=a,b
+    """
+    read_replica = True
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [DjangoModelPermissions]
+    read_serializer_class = None
+    filename = 'export.csv'
+    chunk_size = 2000
+    # Parâmetro da query string -> campo filtrado
+    query_filters = {}
+
+    @classmethod
+    def filter_export(cls, queryset, params):
+        # Os filtros são todos FKs por UUID
+        for param, field in cls.query_filters.items():
+            value = uuid_param(params, param)
+            if value:
+                queryset = queryset.filter(**{field: value})
+        return queryset
+
+    def get_queryset(self):
+        return self.filter_export(super().get_queryset(), self.request.query_params)
+
+    def get(self, request, format=None):
+        reader = self.read_serializer_class(fields=request.query_params.get('fields'))
+        # O corpo é gerado depois que a view retorna: fixa agora o banco de leitura
+        queryset = self.get_queryset().using(current_read_alias())
+        rows = reader.values(queryset).iterator(chunk_size=self.chunk_size)
+        writer = csv.writer(_Echo())
+
+        def stream():
+            yield writer.writerow(reader.selected)
+            for row in rows:
+                data = reader.to_representation(row)
+                yield writer.writerow([data[name] for name in reader.selected])
+
+        response = StreamingHttpResponse(stream(), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{self.filename}"'
+        return response
+
+class CompanyExport(CSVExportView):
+    queryset = Company.objects.order_by('fantasy_name')
+    read_serializer_class = CompanyReadSerializer
+    filename = 'companies.csv'
+
+class BillingAccountExport(CSVExportView):
+    queryset = BillingAccount.objects.order_by('billing_plan', 'code')
+    read_serializer_class = BillingAccountReadSerializer
+    filename = 'billing_accounts.csv'
+    query_filters = {'billing_plan': 'billing_plan_id'}
+
+class PresetExport(CSVExportView):
+    queryset = Preset.objects.order_by('-created_at')
+    read_serializer_class = PresetReadSerializer
+    filename = 'presets.csv'
+
+class TitleExport(CSVExportView):
+    queryset = Title.objects.order_by('-created_at')
+    read_serializer_class = TitleReadSerializer
+    filename = 'titles.csv'
+    query_filters = {'company': 'company_id'}
+
+class EntryExport(CSVExportView):
+    queryset = Entry.objects.order_by('-paid_at')
+    read_serializer_class = EntryReadSerializer
+    filename = 'entries.csv'
+    query_filters = {'company': 'company_id'}
+
 class LogoutView(GenericAPIView):
     """
     View para fazer logout e invalidar o token do usuário.
     """
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def post(self, request, format=None):
@@ -443,12 +620,18 @@ class DREReportView(GenericAPIView):
     GET /api/v1/reports/dre/?company=<uuid>&start=YYYY-MM-DD&end=YYYY-MM-DD&group=<account|month>
 
     Base: entradas (Entry) liquidadas no período (paid_at), classificadas por Title.type_of (income/expense).
+    As respostas ficam em cache (backend.cache) até que a empresa tenha títulos, baixas ou lançamentos alterados.
+
+    Modo comparativo: &compare=previous,last_year,YYYY-MM-DD:YYYY-MM-DD
+    Compara start/end com os períodos pedidos numa única consulta (build_dre_comparison).
     """
-    authentication_classes = [TokenAuthentication]
+    read_replica = True
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    max_compare_periods = 12
 
     def get(self, request, format=None):
-        company_id = request.query_params.get('company')
+        company_id = uuid_param(request.query_params)
         start = request.query_params.get('start')
         end = request.query_params.get('end')
         group = request.query_params.get('group')  # 'account' | 'month'
@@ -459,166 +642,557 @@ class DREReportView(GenericAPIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        qs = (
-            Entry.objects.select_related('title', 'billing_account')
-            .filter(title__company_id=company_id, paid_at__gte=start, paid_at__lte=end)
-        )
+        if request.query_params.get('compare'):
+            return self.compare(request, company_id, start, end)
 
-        # Totais por tipo (income/expense)
-        totals_by_type = (
-            qs.values('title__type_of')
-            .annotate(total=Sum('amount'))
+        params = {'start': start, 'end': end, 'group': group}
+        result, hit = report_cache.get_or_build(
+            'dre', company_id, params,
+            lambda: build_dre(company_id, start, end, group),
         )
-        income_total = sum(x['total'] or 0 for x in totals_by_type if x['title__type_of'] == 'income')
-        expense_total = sum(x['total'] or 0 for x in totals_by_type if x['title__type_of'] == 'expense')
-        result_total = (income_total or 0) - (expense_total or 0)
-
-        result = {
-            'company': str(company_id),
-            'start': start,
-            'end': end,
-            'totals': {
-                'revenues': str(income_total),
-                'expenses': str(expense_total),
-                'result': str(result_total),
-            },
-        }
-
-        # Detalhamento por dia (lista de entradas pagas com contexto)
-        # Estrutura: { 'YYYY-MM-DD': [ { paid_at, type, amount, payment_method, account_code, account_name, top_level, title_desc } ] }
-        details = {}
-        for e in qs.values(
-            'paid_at',
-            'amount',
-            'payment_method',
-            'billing_account__code',
-            'billing_account__name',
-            'title__type_of',
-            'title__description',
-        ).order_by('paid_at'):
-            d = e['paid_at'].strftime('%Y-%m-%d')
-            if d not in details:
-                details[d] = []
-            code = e['billing_account__code'] or ''
-            top_level = code.split('.')[0] if code else ''
-            details[d].append({
-                'paid_at': d,
-                'type': e['title__type_of'],
-                'amount': str(e['amount']),
-                'payment_method': e['payment_method'],
-                'account_code': code,
-                'account_name': e['billing_account__name'] or '',
-                'top_level': top_level,
-                'title_desc': e['title__description'] or '',
-            })
-        result['details_by_day'] = details
-
-        # Estrutura clássica DRE (heurística baseada em nomes/códigos de contas)
-        # Identificação simples: variáveis (CMV/CMA, impostos, taxas), fixos (salários, aluguel, energia, internet, manutenção etc),
-        # investimentos e amortizações por nomes de conta.
-        def normalize(s):
-            return (s or '').lower()
-
-        variable_keywords = [
-            'cmv', 'cma', 'custo de mercadoria', 'custo de matéria', 'simples', 'imposto', 'taxa', 'cartão', 'administracao de cartoes', 'administracao de cartões'
-        ]
-        fixed_keywords = [
-            'salário', 'salarios', 'encargo', 'pró-labore', 'pro-labore', 'contador', 'energia', 'água', 'agua', 'aluguel', 'juros', 'manutenção', 'segurança', 'telefone', 'internet', 'vale transporte'
-        ]
-        invest_keywords = ['investimento', 'imobilizado', 'equipamento', 'veículo', 'veiculo']
-        amort_keywords = ['amortização', 'amortizacao', 'depreciação', 'depreciacao']
-
-        receita_total = float(income_total or 0)
-        custos_variaveis = 0.0
-        custos_fixos = 0.0
-        investimentos = 0.0
-        amortizacoes = 0.0
-
-        # Percorre entradas de despesas para classificar
-        for e in qs.values('amount', 'billing_account__name', 'billing_account__code', 'title__type_of'):
-            if e['title__type_of'] != 'expense':
-                continue
-            name = normalize(e['billing_account__name'])
-            code = normalize(e['billing_account__code'])
-            val = float(e['amount'] or 0)
-
-            if any(k in name for k in variable_keywords) or any(k in code for k in variable_keywords):
-                custos_variaveis += val
-            elif any(k in name for k in fixed_keywords) or any(k in code for k in fixed_keywords):
-                custos_fixos += val
-            elif any(k in name for k in invest_keywords) or any(k in code for k in invest_keywords):
-                investimentos += val
-            elif any(k in name for k in amort_keywords) or any(k in code for k in amort_keywords):
-                amortizacoes += val
-            else:
-                # Default: considera como fixo para não perder controle
-                custos_fixos += val
-
-        margem_contribuicao = receita_total - custos_variaveis
-        resultado_operacional = margem_contribuicao - custos_fixos
-        resultado_final = resultado_operacional - investimentos - amortizacoes
-
-        result['classic'] = {
-            'receita_total': str(receita_total),
-            'custos_variaveis': str(custos_variaveis),
-            'margem_contribuicao': str(margem_contribuicao),
-            'custos_fixos': str(custos_fixos),
-            'resultado_operacional_liquido': str(resultado_operacional),
-            'investimentos': str(investimentos),
-            'amortizacoes': str(amortizacoes),
-            'resultado_final': str(resultado_final),
-        }
-
-        # Quebra opcional por conta (usa o primeiro nível do código, se existir)
-        if group == 'account':
-            breakdown = {}
-            for e in qs.values('billing_account__code', 'billing_account__name', 'title__type_of').annotate(total=Sum('amount')):
-                code = e['billing_account__code'] or 'N/A'
-                top_level = code.split('.')[0] if code else 'N/A'
-                key = f"{top_level}"
-                if key not in breakdown:
-                    breakdown[key] = {
-                        'code': top_level,
-                        'name': e['billing_account__name'] if e['billing_account__name'] else 'Sem conta',
-                        'income': '0',
-                        'expense': '0',
-                        'total': '0',
-                    }
-                if e['title__type_of'] == 'income':
-                    breakdown[key]['income'] = str((float(breakdown[key]['income']) if breakdown[key]['income'] else 0) + float(e['total'] or 0))
+
+        response = Response(result)
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
+
+    def compare(self, request, company_id, start, end):
+        try:
+            periods = [('current', parse_date(start), parse_date(end))]
+            for item in request.query_params['compare'].split(','):
+                item = item.strip()
+                if item in ('previous', 'last_year'):
+                    periods.append((item, *shift_period(periods[0][1], periods[0][2], item)))
                 else:
-                    breakdown[key]['expense'] = str((float(breakdown[key]['expense']) if breakdown[key]['expense'] else 0) + float(e['total'] or 0))
-                breakdown[key]['total'] = str(float(breakdown[key]['income']) - float(breakdown[key]['expense']))
-            result['by_account'] = list(breakdown.values())
-
-        # Quebra opcional por mês
-        if group == 'month':
-            monthly = (
-                qs.annotate(month=TruncMonth('paid_at'))
-                .values('month', 'title__type_of')
-                .annotate(total=Sum('amount'))
-                .order_by('month')
+                    period_start, _, period_end = item.partition(':')
+                    periods.append((item, parse_date(period_start), parse_date(period_end)))
+        except (TypeError, ValueError):
+            periods = None
+        if not periods or any(s is None or e is None or s > e for _, s, e in periods):
+            return Response(
+                {"detail": "compare deve listar previous, last_year ou períodos YYYY-MM-DD:YYYY-MM-DD válidos"},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-            # Agrega em linhas mês a mês
-            from collections import OrderedDict
-            agg = OrderedDict()
-            for row in monthly:
-                m = row['month'].strftime('%Y-%m') if row['month'] else 'unknown'
-                if m not in agg:
-                    agg[m] = {'month': m, 'revenues': 0.0, 'expenses': 0.0, 'result': 0.0}
-                if row['title__type_of'] == 'income':
-                    agg[m]['revenues'] += float(row['total'] or 0)
-                else:
-                    agg[m]['expenses'] += float(row['total'] or 0)
-                agg[m]['result'] = agg[m]['revenues'] - agg[m]['expenses']
-            result['monthly'] = [
-                {
-                    'month': v['month'],
-                    'revenues': str(v['revenues']),
-                    'expenses': str(v['expenses']),
-                    'result': str(v['result']),
-                }
-                for v in agg.values()
-            ]
-
-        return Response(result)
+        if len(periods) > self.max_compare_periods:
+            return Response(
+                {"detail": f"No máximo {self.max_compare_periods} períodos por comparação"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        params = {'periods': [(label, s.isoformat(), e.isoformat()) for label, s, e in periods]}
+        result, hit = report_cache.get_or_build(
+            'dre-compare', company_id, params,
+            lambda: build_dre_comparison(company_id, periods),
+        )
+
+        response = Response(result)
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
+
+
+class SearchView(GenericAPIView):
+    """
+    Busca unificada em títulos, empresas e contas
+    GET /api/v1/search/?q=<texto>&company=<uuid>&kind=<title|company|account>&limit=<n>
+
+    Sem acentos e por prefixo de cada termo, ordenada por relevância (backend.search).
+    ``kind`` pode ser repetido ou separado por vírgulas.
+    """
+    read_replica = True
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    max_limit = 100
+
+    def get(self, request, format=None):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({"detail": "Parâmetro obrigatório: q"}, status=status.HTTP_400_BAD_REQUEST)
+
+        kinds = [k for value in request.query_params.getlist('kind') for k in value.split(',') if k]
+        if any(k not in SearchDocument.Kind.values for k in kinds):
+            return Response(
+                {"detail": f"kind deve ser um de: {', '.join(SearchDocument.Kind.values)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 20)), self.max_limit))
+        except ValueError:
+            return Response({"detail": "limit deve ser um número inteiro"}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = search(query, company_id=uuid_param(request.query_params), kinds=kinds, limit=limit)
+        return Response({'query': query, 'count': len(results), 'results': results})
+
+
+class DashboardView(GenericAPIView):
+    """
+    Resumo da tela inicial
+    GET /api/v1/reports/dashboard/?company=<uuid>
+
+    Empresa, recebíveis e pagáveis em aberto e vencidos, receitas e despesas do mês,
+    tendência dos últimos 12 meses e principais contas numa única resposta.
+    Fica em cache até que a empresa tenha títulos, baixas ou lançamentos alterados.
+    """
+    read_replica = True
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, format=None):
+        company_id = uuid_param(request.query_params)
+        if not company_id:
+            return Response({"detail": "Parâmetro obrigatório: company"}, status=status.HTTP_400_BAD_REQUEST)
+
+        today = date.today()
+
+        def build():
+            # Empresa inexistente não vai para o cache
+            result = build_dashboard(company_id, today)
+            if result is None:
+                raise Http404
+            return result
+
+        result, hit = report_cache.get_or_build('dashboard', company_id, {'date': today.isoformat()}, build)
+
+        response = Response(result)
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
+
+
+class TimeSeriesView(GenericAPIView):
+    """
+    Séries temporais de receita, despesa e saldo
+    GET /api/v1/reports/time-series/?company=<uuid>&start=YYYY-MM-DD&end=YYYY-MM-DD&bucket=<day|week|month|quarter|year>&max_points=<n>
+
+    Agrupadas no banco por intervalo; com ``max_points`` a série é reduzida para
+    no máximo esse número de pontos (backend.reports.build_time_series).
+    """
+    read_replica = True
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    max_points_limit = TIME_SERIES_MAX_POINTS
+
+    def get(self, request, format=None):
+        company_id = uuid_param(request.query_params)
+        start = request.query_params.get('start')
+        end = request.query_params.get('end')
+        bucket = request.query_params.get('bucket', 'day')
+
+        if not company_id or not start or not end:
+            return Response(
+                {"detail": "Parâmetros obrigatórios: company, start, end"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            start, end = parse_date(start), parse_date(end)
+        except ValueError:
+            start = end = None
+        if start is None or end is None or start > end:
+            return Response(
+                {"detail": "start e end devem ser datas YYYY-MM-DD, com start <= end"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if bucket not in TIME_SERIES_BUCKETS:
+            return Response(
+                {"detail": f"bucket deve ser um de: {', '.join(TIME_SERIES_BUCKETS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            max_points = int(request.query_params['max_points']) if request.query_params.get('max_points') else None
+        except ValueError:
+            max_points = 0
+        if max_points is not None and not 2 <= max_points <= self.max_points_limit:
+            return Response(
+                {"detail": f"max_points deve ser um inteiro entre 2 e {self.max_points_limit}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        params = {'start': start.isoformat(), 'end': end.isoformat(), 'bucket': bucket, 'max_points': max_points}
+        result, hit = report_cache.get_or_build(
+            'time-series', company_id, params,
+            lambda: build_time_series(company_id, start, end, bucket, max_points),
+        )
+
+        response = Response(result)
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
+
+
+class CashFlowReportView(GenericAPIView):
+    """
+    Demonstração dos Fluxos de Caixa (DFC, método direto)
+    GET /api/v1/reports/cash-flow/?company=<uuid>&start=YYYY-MM-DD&end=YYYY-MM-DD&granularity=<month|quarter|year>&cumulative=1
+
+    Entradas e saídas das baixas (Entry) por período, forma de pagamento e conta de primeiro nível.
+    """
+    read_replica = True
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, format=None):
+        company_id = uuid_param(request.query_params)
+        start = request.query_params.get('start')
+        end = request.query_params.get('end')
+        granularity = request.query_params.get('granularity', 'month')
+        cumulative = request.query_params.get('cumulative', '').lower() in ('1', 'true', 'yes')
+
+        if not company_id or not start or not end:
+            return Response(
+                {"detail": "Parâmetros obrigatórios: company, start, end"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            start, end = parse_date(start), parse_date(end)
+        except ValueError:
+            start = end = None
+        if start is None or end is None or start > end:
+            return Response(
+                {"detail": "start e end devem ser datas YYYY-MM-DD, com start <= end"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if granularity not in CASH_FLOW_GRANULARITIES:
+            return Response(
+                {"detail": f"granularity deve ser um de: {', '.join(CASH_FLOW_GRANULARITIES)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        params = {'start': start.isoformat(), 'end': end.isoformat(), 'granularity': granularity, 'cumulative': cumulative}
+        result, hit = report_cache.get_or_build(
+            'cash-flow', company_id, params,
+            lambda: build_cash_flow(company_id, start, end, granularity, cumulative),
+        )
+
+        response = Response(result)
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
+
+
+class BillingPlanImportView(GenericAPIView):
+    """
+    Criação de um plano de contas completo
+    POST /api/v1/billing-plan/import/
+
+    JSON ``{name, description, accounts: [{name, account_type, is_active?, children?}]}``
+    ou ``text/csv`` (code, name, account_type[, is_active]) com name e description na
+    query string. Os códigos são gerados pela posição; nada é gravado se houver erros.
+    """
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [DjangoModelPermissions]
+    parser_classes = [JSONParser, CSVTextParser]
+    queryset = BillingAccount.objects.all()
+
+    def post(self, request, format=None):
+        if isinstance(request.data, str):
+            params = request.query_params
+        elif isinstance(request.data, dict):
+            params = request.data
+        else:
+            return Response({"detail": "Envie um objeto JSON ou um CSV"}, status=status.HTTP_400_BAD_REQUEST)
+        name, description = params.get('name'), params.get('description')
+        if not name or not description:
+            return Response({"detail": "Parâmetros obrigatórios: name, description"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            roots = tree_from_csv(request.data) if isinstance(request.data, str) else tree_from_json(request.data.get('accounts'))
+            plan, accounts = import_chart(name, description, roots)
+        except ChartError as e:
+            return Response({'errors': e.errors}, status=status.HTTP_400_BAD_REQUEST)
+        except ValidationError as e:
+            return Response(getattr(e, 'message_dict', None) or {'detail': e.messages}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({**BillingPlanSerializer(plan).data, 'accounts': len(accounts)}, status=status.HTTP_201_CREATED)
+
+
+class BillingPlanCloneView(GenericAPIView):
+    """
+    Cópia de um plano de contas com todas as contas (mesmos códigos)
+    POST /api/v1/billing-plan/<uuid>/clone/   {name?, description?}
+    """
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [DjangoModelPermissions]
+    queryset = BillingAccount.objects.all()
+
+    def post(self, request, pk, format=None):
+        if not isinstance(request.data, dict):
+            return Response({"detail": "Envie um objeto JSON"}, status=status.HTTP_400_BAD_REQUEST)
+        source = get_object_by_pk(BillingPlan, pk)
+        try:
+            plan, accounts = clone_plan(source, request.data.get('name'), request.data.get('description'))
+        except ValidationError as e:
+            return Response(getattr(e, 'message_dict', None) or {'detail': e.messages}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({**BillingPlanSerializer(plan).data, 'accounts': len(accounts)}, status=status.HTTP_201_CREATED)
+
+
+class CompanyImportView(GenericAPIView):
+    """
+    Importação em lote de empresas e endereços
+    POST /api/v1/company/import/
+
+    Corpo JSON (lista de objetos) ou ``text/csv``, com os campos da empresa e do
+    endereço em cada linha. Empresas com o mesmo CNPJ (só dígitos) são atualizadas
+    e endereços iguais reaproveitados. Retorna o resultado de cada linha.
+    """
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [DjangoModelPermissions]
+    parser_classes = [JSONParser, CSVTextParser]
+    queryset = Company.objects.all()
+    max_rows = 10000
+
+    def post(self, request, format=None):
+        rows = parse_company_csv(request.data) if isinstance(request.data, str) else request.data
+        if not isinstance(rows, list) or not rows:
+            return Response({"detail": "Envie uma lista de empresas (JSON) ou um CSV"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > self.max_rows:
+            return Response({"detail": f"No máximo {self.max_rows} linhas por importação"}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = import_companies(rows)
+        summary = {key: sum(1 for r in results if r['status'] == key) for key in ('created', 'updated', 'error')}
+        code = status.HTTP_400_BAD_REQUEST if summary['error'] == len(results) else status.HTTP_200_OK
+        return Response({'summary': summary, 'results': results}, status=code)
+
+
+class BudgetImportView(GenericAPIView):
+    """
+    Importação do orçamento em CSV (colunas account, month, amount)
+    POST /api/v1/budget/import/?company=<uuid>&billing_plan=<uuid>
+
+    Corpo ``text/csv`` ou multipart com o campo ``file``. ``account`` é o UUID da
+    conta ou, com ``billing_plan``, o código no plano. Nada é gravado se houver erros.
+    """
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [DjangoModelPermissions]
+    parser_classes = [CSVTextParser, MultiPartParser]
+    queryset = Budget.objects.all()
+
+    def post(self, request, format=None):
+        company_id = uuid_param(request.query_params)
+        if not company_id or not Company.objects.filter(pk=company_id).exists():
+            return Response({"detail": "Parâmetro company ausente ou inválido"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if isinstance(request.data, str):
+            text = request.data
+        elif request.FILES.get('file'):
+            text = request.FILES['file'].read().decode('utf-8-sig')
+        else:
+            return Response({"detail": "Envie o CSV no corpo (text/csv) ou no campo file"}, status=status.HTTP_400_BAD_REQUEST)
+
+        imported, errors = import_budget_csv(company_id, text, uuid_param(request.query_params, 'billing_plan'))
+        if errors:
+            return Response({'imported': 0, 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'imported': imported, 'errors': []}, status=status.HTTP_201_CREATED)
+
+
+class BudgetReportView(GenericAPIView):
+    """
+    Orçado x realizado
+    GET /api/v1/reports/budget-vs-actual/?company=<uuid>&start=YYYY-MM-DD&end=YYYY-MM-DD&basis=<accrual|cash>
+
+    Realizado pelo razão (accrual, padrão) ou pelas baixas (cash); as contas
+    sintéticas somam as filhas (backend.budget).
+    """
+    read_replica = True
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, format=None):
+        company_id = uuid_param(request.query_params)
+        start = request.query_params.get('start')
+        end = request.query_params.get('end')
+        basis = request.query_params.get('basis', 'accrual')
+
+        if not company_id or not start or not end:
+            return Response(
+                {"detail": "Parâmetros obrigatórios: company, start, end"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            start, end = parse_date(start), parse_date(end)
+        except ValueError:
+            start = end = None
+        if start is None or end is None or start > end:
+            return Response(
+                {"detail": "start e end devem ser datas YYYY-MM-DD, com start <= end"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if basis not in BUDGET_BASES:
+            return Response(
+                {"detail": f"basis deve ser um de: {', '.join(BUDGET_BASES)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        params = {'start': start.isoformat(), 'end': end.isoformat(), 'basis': basis}
+        result, hit = report_cache.get_or_build(
+            'budget-vs-actual', company_id, params,
+            lambda: build_budget_report(company_id, start, end, basis),
+        )
+
+        response = Response(result)
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
+
+
+class BalanceSheetView(GenericAPIView):
+    """
+    Balanço patrimonial
+    GET /api/v1/reports/balance-sheet/?company=<uuid>&as_of=YYYY-MM-DD
+
+    Saldos do razão (JournalLine) até ``as_of`` (padrão: hoje), agrupados em ativo,
+    passivo e patrimônio líquido pela hierarquia do plano de contas (backend.balance).
+    """
+    read_replica = True
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, format=None):
+        company_id = uuid_param(request.query_params)
+        if not company_id:
+            return Response({"detail": "Parâmetro obrigatório: company"}, status=status.HTTP_400_BAD_REQUEST)
+
+        raw_as_of = request.query_params.get('as_of')
+        try:
+            as_of = parse_date(raw_as_of) if raw_as_of else date.today()
+        except ValueError:
+            as_of = None
+        if as_of is None:
+            return Response({"detail": "as_of deve estar no formato YYYY-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
+
+        result, hit = report_cache.get_or_build(
+            'balance-sheet', company_id, {'as_of': as_of.isoformat()},
+            lambda: build_balance_sheet(company_id, as_of),
+        )
+
+        response = Response(result)
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
+
+
+class LedgerVerifyView(GenericAPIView):
+    """
+    Verificação das invariantes do razão
+    GET /api/v1/reports/ledger-check/?company=<uuid>&limit=<n>
+
+    Sem ``company`` verifica todas as empresas, em paralelo (backend.ledger).
+    Cada verificação traz a contagem e até ``limit`` linhas com problema.
+    """
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, format=None):
+        company_id = uuid_param(request.query_params)
+        try:
+            limit = int(request.query_params.get('limit', 100))
+        except ValueError:
+            return Response({"detail": "limit deve ser um número inteiro"}, status=status.HTTP_400_BAD_REQUEST)
+
+        report = verify_ledger([company_id] if company_id else None, limit=limit)
+        return Response({
+            'ok': is_clean(report),
+            'companies': {str(cid): checks for cid, checks in report.items()},
+        })
+
+
+# ------------------------------------------------------------
+# Views assíncronas (ASGI)
+# ------------------------------------------------------------
+# Relatórios e exportações sem prender uma thread do worker: as consultas
+# independentes rodam ao mesmo tempo e o CSV é lido em blocos (aiterator).
+
+class AsyncAPIView(View):
+    authentication_classes = [CachedTokenAuthentication]
+
+    async def authenticate(self, request):
+        """Retorna ``(usuário, None)`` ou ``(None, resposta 401)``."""
+        for authenticator in self.authentication_classes:
+            try:
+                result = await sync_to_async(authenticator().authenticate)(request)
+            except AuthenticationFailed as exc:
+                return None, self.render({'detail': exc.detail}, status.HTTP_401_UNAUTHORIZED)
+            if result is not None:
+                return result[0], None
+        return None, self.render(
+            {'detail': NotAuthenticated.default_detail}, status.HTTP_401_UNAUTHORIZED
+        )
+
+    def render(self, data, status_code=status.HTTP_200_OK):
+        return HttpResponse(
+            FastJSONRenderer().render(data), status=status_code, content_type='application/json'
+        )
+
+class DREReportAsyncView(AsyncAPIView):
+    """
+    DRE assíncrona: mesmos parâmetros e resposta de DREReportView.
+    GET /api/v1/reports/dre/async/?company=<uuid>&start=YYYY-MM-DD&end=YYYY-MM-DD&group=<account|month>
+    """
+    read_replica = True
+
+    async def get(self, request):
+        user, error = await self.authenticate(request)
+        if error:
+            return error
+
+        try:
+            company_id = uuid_param(request.GET)
+        except ParseError as exc:
+            return self.render({'detail': exc.detail}, status.HTTP_400_BAD_REQUEST)
+        start = request.GET.get('start')
+        end = request.GET.get('end')
+        group = request.GET.get('group')
+
+        if not company_id or not start or not end:
+            return self.render(
+                {"detail": "Parâmetros obrigatórios: company, start, end"},
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        params = {'start': start, 'end': end, 'group': group}
+        result, hit = await report_cache.aget_or_build(
+            'dre', company_id, params,
+            lambda: abuild_dre(company_id, start, end, group),
+        )
+
+        response = self.render(result)
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
+
+class AsyncCSVExportView(AsyncAPIView):
+    """
+    Exportação CSV assíncrona, com a configuração da view síncrona ``export_view``.
+    GET /api/v1/<recurso>/export/async/?fields=a,b
+    """
+    read_replica = True
+    export_view = None
+
+    async def get(self, request):
+        user, error = await self.authenticate(request)
+        if error:
+            return error
+
+        export = self.export_view
+        reader = export.read_serializer_class(fields=request.GET.get('fields'))
+        try:
+            queryset = export.filter_export(export.queryset.all(), request.GET).using(current_read_alias())
+        except ParseError as exc:
+            return self.render({'detail': exc.detail}, status.HTTP_400_BAD_REQUEST)
+        rows = reader.values(queryset)
+        writer = csv.writer(_Echo())
+
+        async def stream():
+            yield writer.writerow(reader.selected)
+            async for row in rows.aiterator(chunk_size=export.chunk_size):
+                data = reader.to_representation(row)
+                yield writer.writerow([data[name] for name in reader.selected])
+
+        response = StreamingHttpResponse(stream(), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{export.filename}"'
+        return response
+
+class CompanyExportAsync(AsyncCSVExportView):
+    export_view = CompanyExport
+
+class BillingAccountExportAsync(AsyncCSVExportView):
+    export_view = BillingAccountExport
+
+class PresetExportAsync(AsyncCSVExportView):
+    export_view = PresetExport
+
+class TitleExportAsync(AsyncCSVExportView):
+    export_view = TitleExport
+
+class EntryExportAsync(AsyncCSVExportView):
+    export_view = EntryExport
@@ -0,0 +1,73 @@
+"""
+Perfis de banco de dados escolhidos por variáveis de ambiente.
+
+DB_PROFILE=sqlite (padrão)
+    Arquivo local (SQLITE_PATH) para desenvolvimento e instalações de um nó.
+    As PRAGMAs de SQLITE_PRAGMAS são aplicadas a cada conexão (backend.db).
+
+DB_PROFILE=postgres
+    POSTGRES_DB, POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_HOST, POSTGRES_PORT.
+    Conexões persistentes (DB_CONN_MAX_AGE, em segundos) com health check.
+    O Django 4.2 não tem pool de conexões próprio; para pool use um PgBouncer
+    em modo transaction e DB_POOLER=pgbouncer, que desliga os cursores do
+    lado do servidor (incompatíveis com esse modo).
+
+Réplica de leitura (alias "replica")
+    POSTGRES_REPLICA_HOST/POSTGRES_REPLICA_PORT apontam para a réplica; sem
+    elas, e no SQLite, o alias é uma segunda conexão ao mesmo banco. O
+    roteamento só é ativado com DB_READ_ALIAS=replica (backend.routers).
+"""
+
+
+def _int(environ, name, default):
+    return int(environ.get(name) or default)
+
+
+def database_profile(environ, base_dir):
+    profile = environ.get("DB_PROFILE", "sqlite").lower()
+
+    if profile == "postgres":
+        return {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": environ.get("POSTGRES_DB", "accountflow"),
+            "USER": environ.get("POSTGRES_USER", "accountflow"),
+            "PASSWORD": environ.get("POSTGRES_PASSWORD", ""),
+            "HOST": environ.get("POSTGRES_HOST", "localhost"),
+            "PORT": environ.get("POSTGRES_PORT", "5432"),
+            "CONN_MAX_AGE": _int(environ, "DB_CONN_MAX_AGE", 60),
+            "CONN_HEALTH_CHECKS": True,
+            "DISABLE_SERVER_SIDE_CURSORS": environ.get("DB_POOLER", "").lower() == "pgbouncer",
+            "OPTIONS": {
+                "connect_timeout": _int(environ, "DB_CONNECT_TIMEOUT", 5),
+                "application_name": environ.get("DB_APPLICATION_NAME", "accountflow-api"),
+            },
+        }
+
+    if profile == "sqlite":
+        return {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": environ.get("SQLITE_PATH") or base_dir / "db.sqlite3",
+            # Tempo (s) que uma escrita espera pelo lock antes de "database is locked"
+            "OPTIONS": {"timeout": _int(environ, "SQLITE_BUSY_TIMEOUT", 20)},
+        }
+
+    raise ValueError(f"DB_PROFILE inválido: {profile!r} (use sqlite ou postgres)")
+
+
+def replica_profile(environ, primary):
+    replica = dict(primary, OPTIONS=dict(primary.get("OPTIONS", {})))
+    if primary["ENGINE"] == "django.db.backends.postgresql" and environ.get("POSTGRES_REPLICA_HOST"):
+        replica["HOST"] = environ["POSTGRES_REPLICA_HOST"]
+        replica["PORT"] = environ.get("POSTGRES_REPLICA_PORT", primary["PORT"])
+    # Nos testes a réplica usa o próprio banco de teste do alias default
+    replica["TEST"] = {"MIRROR": "default"}
+    return replica
+
+
+def sqlite_pragmas(environ):
+    return {
+        "journal_mode": environ.get("SQLITE_JOURNAL_MODE", "wal"),
+        "synchronous": environ.get("SQLITE_SYNCHRONOUS", "normal"),
+        "busy_timeout": _int(environ, "SQLITE_BUSY_TIMEOUT", 20) * 1000,
+        "foreign_keys": "on",
+    }
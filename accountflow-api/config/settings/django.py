@@ -10,11 +10,19 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
+from datetime import timedelta
 from pathlib import Path
 
+from dotenv import load_dotenv
+
+from .database import database_profile, replica_profile, sqlite_pragmas
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
+load_dotenv(BASE_DIR / ".env")
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.1/howto/deployment/checklist/
@@ -47,6 +55,9 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "backend.middleware.CompressionMiddleware",
+    "backend.middleware.ReadReplicaMiddleware",
+    "backend.middleware.ValidationContextMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -83,12 +94,53 @@ ASGI_APPLICATION = "config.asgi.application"
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
+# Perfil escolhido por DB_PROFILE (sqlite | postgres); ver config/settings/database.py
 
 DATABASES = {
+    "default": database_profile(os.environ, BASE_DIR),
+}
+DATABASES["replica"] = replica_profile(os.environ, DATABASES["default"])
+
+# Listagens, exportações e relatórios leem do alias abaixo quando definido
+DATABASE_ROUTERS = ["backend.routers.ReadReplicaRouter"]
+DATABASE_READ_ALIAS = os.environ.get("DB_READ_ALIAS") or None
+
+# Aplicadas a toda conexão SQLite (backend.db)
+SQLITE_PRAGMAS = sqlite_pragmas(os.environ)
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# O alias "reports" guarda as respostas dos relatórios (backend.cache). Com
+# CULL_FREQUENCY igual a MAX_ENTRIES o LocMemCache descarta apenas a entrada
+# menos usada quando o limite é atingido (LRU).
+
+REPORT_CACHE_MAX_ENTRIES = 500
+AUTH_CACHE_MAX_ENTRIES = 5000
+
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "accountflow-default",
+    },
+    "reports": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "accountflow-reports",
+        "TIMEOUT": 60 * 60,
+        "OPTIONS": {
+            "MAX_ENTRIES": REPORT_CACHE_MAX_ENTRIES,
+            "CULL_FREQUENCY": REPORT_CACHE_MAX_ENTRIES,
+        },
+    },
+    # Usuário e permissões resolvidos por token (backend.authentication)
+    "auth": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "accountflow-auth",
+        "TIMEOUT": 5 * 60,
+        "OPTIONS": {
+            "MAX_ENTRIES": AUTH_CACHE_MAX_ENTRIES,
+            "CULL_FREQUENCY": AUTH_CACHE_MAX_ENTRIES,
+        },
+    },
 }
 
 
@@ -143,13 +195,24 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        # Define TokenAuthentication como o padrão global
-        'rest_framework.authentication.TokenAuthentication',
+        # TokenAuthentication com usuário e permissões em cache
+        'backend.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         # Exige que todos os usuários estejam logados por padrão
         'rest_framework.permissions.IsAuthenticated',
-    ]
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        # orjson quando disponível, com Decimal/UUID/date nativos
+        'backend.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
+# Respostas acima deste tamanho (bytes) são comprimidas com gzip/brotli
+RESPONSE_COMPRESSION_MIN_SIZE = 1024
+
+# Validade das respostas guardadas por Idempotency-Key (purge_idempotency_keys)
+IDEMPOTENCY_KEY_TTL = timedelta(hours=24)
+
 from .jazzmin import *
\ No newline at end of file